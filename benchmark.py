@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# git.py fica na mesma pasta deste script
+PASTA_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PASTA_SCRIPTS)
+import estrutura  # noqa: E402
+import git as git_automate  # noqa: E402
+
+# ===========================================
+# Utilitários de fixture
+# ===========================================
+def _git(args, cwd):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+def criar_repositorio_sintetico(pasta, arquivos=100, commits=10, pastas=0, tamanho=0):
+    """
+    Cria um repositório com 'arquivos' arquivos e 'commits' commits.
+    Com 'pastas', os arquivos são distribuídos em pasta_0..N-1; 'tamanho' é a
+    quantidade de bytes aleatórios (pouco compressíveis) de cada versão de arquivo,
+    e cada commit reescreve um arquivo (o histórico não se resume a deltas pequenos).
+    """
+    os.makedirs(pasta, exist_ok=True)
+    _git(["init", "-q"], pasta)
+    _git(["config", "user.name", "benchmark"], pasta)
+    _git(["config", "user.email", "benchmark@localhost"], pasta)
+    caminhos = []
+    for i in range(arquivos):
+        subpasta = f"pasta_{i % pastas}" if pastas else ""
+        os.makedirs(os.path.join(pasta, subpasta), exist_ok=True)
+        caminhos.append(os.path.join(pasta, subpasta, f"arquivo_{i}.txt"))
+        with open(caminhos[-1], "w", encoding="utf-8") as f:
+            f.write(f"conteudo {i}\n" + os.urandom(tamanho).hex())
+    _git(["add", "."], pasta)
+    _git(["commit", "-q", "-m", "commit 0"], pasta)
+    for c in range(1, commits):
+        with open(caminhos[c % arquivos], "w" if tamanho else "a", encoding="utf-8") as f:
+            f.write(f"commit {c}\n" + os.urandom(tamanho).hex())
+        _git(["commit", "-q", "-a", "-m", f"commit {c}"], pasta)
+    return pasta
+
+def criar_remoto_bare(origem, destino):
+    """Cria um clone bare de 'origem' que aceita clones parciais (uploadpack.allowFilter)."""
+    _git(["clone", "-q", "--bare", origem, destino], os.path.dirname(destino))
+    _git(["config", "uploadpack.allowFilter", "true"], destino)
+    _git(["config", "uploadpack.allowAnySHA1InWant", "true"], destino)
+    return destino
+
+def tamanho_pasta(pasta):
+    total = 0
+    for raiz, _, arquivos in os.walk(pasta):
+        for nome in arquivos:
+            total += os.lstat(os.path.join(raiz, nome)).st_size
+    return total
+
+def imprimir_tabela(cabecalho, linhas):
+    larguras = [max(len(str(x)) for x in coluna) for coluna in zip(cabecalho, *linhas)]
+    print("  ".join(str(c).ljust(l) for c, l in zip(cabecalho, larguras)))
+    print("  ".join("-" * l for l in larguras))
+    for linha in linhas:
+        print("  ".join(str(c).ljust(l) for c, l in zip(linha, larguras)))
+
+# ===========================================
+# Benchmark: backends de execução do git
+# ===========================================
+# Comandos do git.py comparados entre os backends (somente leitura ou sem alterações)
+COMANDOS_BACKEND = [
+    ("status", ["status"]),
+    ("status --json", ["status", "--json"]),
+    ("log", ["log"]),
+    ("log --remoto", ["log", "--remoto"]),
+    ("commit (nada)", ["commit", "-m", "benchmark"]),
+]
+
+def benchmark_backend(repeticoes=10):
+    """
+    Compara os backends de consulta (subprocess x persistente) executando os
+    comandos do git.py como o usuário (um processo novo por execução): tempo de
+    parede (mediana) e processos git criados por comando.
+    """
+    git_py = os.path.join(PASTA_SCRIPTS, "git.py")
+    linhas = []
+    with tempfile.TemporaryDirectory() as tmp:
+        origem = criar_repositorio_sintetico(os.path.join(tmp, "origem"))
+        url = "file://" + criar_remoto_bare(origem, os.path.join(tmp, "remoto.git"))
+        repo = os.path.join(tmp, "repo")
+        _git(["clone", "-q", url, repo], tmp)
+        metricas = os.path.join(tmp, "metricas.jsonl")
+        for nome_comando, comando in COMANDOS_BACKEND:
+            for nome_backend in sorted(git_automate.BACKENDS):
+                tempos = []
+                for _ in range(repeticoes):
+                    if os.path.exists(metricas):
+                        os.remove(metricas)
+                    segundos, _ = executar_medindo([sys.executable, git_py, "--backend", nome_backend,
+                                                    "--metricas", metricas, *comando, "--caminho", repo])
+                    tempos.append(segundos)
+                linhas.append((nome_comando, nome_backend, _processos_das_metricas(metricas),
+                               f"{statistics.median(tempos) * 1000:.1f}"))
+    imprimir_tabela(("comando", "backend", "processos", "ms (mediana)"), linhas)
+    return linhas
+
+def _branch_atual(repo):
+    result = subprocess.run(["git", "symbolic-ref", "--short", "HEAD"], cwd=repo,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+# ===========================================
+# Benchmark: geração de projetos (estrutura.py)
+# ===========================================
+def benchmark_estrutura(projetos=100, template=None, workers=None):
+    """Mede projetos/s gerados: um a um (sem cache) x em lote (cópia e hardlink)."""
+    compilado = estrutura.carregar_template(template)
+    nomes = [f"projeto_{i:04d}" for i in range(projetos)]
+    linhas = []
+    with tempfile.TemporaryDirectory() as tmp:
+        inicio = time.perf_counter()
+        for nome in nomes:
+            estrutura.gerar_projeto(compilado, os.path.join(tmp, "serial", nome), {"nome": nome})
+        linhas.append(("serial", projetos, time.perf_counter() - inicio))
+
+        for modo, hardlink in (("lote (cópia)", False), ("lote (hardlink)", True)):
+            inicio = time.perf_counter()
+            estrutura.gerar_em_lote(compilado, os.path.join(tmp, modo.split()[-1].strip("()")),
+                                    nomes, workers=workers, hardlink=hardlink)
+            linhas.append((modo, projetos, time.perf_counter() - inicio))
+    imprimir_tabela(("modo", "projetos", "total (s)", "projetos/s"),
+                    [(m, n, f"{s:.3f}", f"{n / s:.1f}") for m, n, s in linhas])
+    return linhas
+
+# ===========================================
+# Benchmark: modos de clone (git_clone)
+# ===========================================
+MODOS_CLONE = [
+    ("completo", {}),
+    ("raso (--depth 1)", {"profundidade": 1}),
+    ("parcial (blob:none)", {"filtro": "blob:none"}),
+    ("parcial (tree:0)", {"filtro": "tree:0"}),
+    ("esparso + blob:none", {"filtro": "blob:none", "esparso": ["pasta_0"]}),
+    ("referência", {"referencia": None}),
+]
+
+def benchmark_clone(arquivos=400, commits=200, tamanho=4096, pastas=8, repeticoes=3):
+    """
+    Clona um repositório bare local (via file://, que usa o mesmo protocolo de
+    transferência de um remoto) em cada modo e compara o tamanho dos objetos
+    recebidos (.git/objects) e o tempo de parede (mediana das repetições).
+    O modo 'referência' reaproveita os objetos de um clone completo já existente.
+    """
+    linhas = []
+    with tempfile.TemporaryDirectory() as tmp:
+        origem = criar_repositorio_sintetico(os.path.join(tmp, "origem"), arquivos, commits, pastas, tamanho)
+        url = "file://" + criar_remoto_bare(origem, os.path.join(tmp, "remoto.git"))
+        referencia = os.path.join(tmp, "referencia")
+        git_automate.git_clone(url, referencia, silencioso=True)
+        for modo, opcoes in MODOS_CLONE:
+            if "referencia" in opcoes:
+                opcoes = dict(opcoes, referencia=referencia)
+            tempos = []
+            for r in range(repeticoes):
+                destino = os.path.join(tmp, f"clone_{len(linhas)}_{r}")
+                inicio = time.perf_counter()
+                git_automate.git_clone(url, destino, silencioso=True, **opcoes)
+                tempos.append(time.perf_counter() - inicio)
+            objetos = tamanho_pasta(os.path.join(destino, ".git", "objects"))
+            arvore = tamanho_pasta(destino) - tamanho_pasta(os.path.join(destino, ".git"))
+            linhas.append((modo, f"{objetos / 1024:.0f}", f"{arvore / 1024:.0f}",
+                           f"{sorted(tempos)[len(tempos) // 2]:.3f}"))
+    imprimir_tabela(("modo", "objetos (KiB)", "árvore (KiB)", "tempo (s)"), linhas)
+    return linhas
+
+# ===========================================
+# Suíte de regressão (subcomandos em processos separados)
+# ===========================================
+VERSAO_RESULTADOS = 1
+
+def executar_medindo(comando, cwd=None, env=None):
+    """
+    Executa 'comando' e retorna (segundos, pico de RSS em KiB).
+    O pico vem do wait4 (processo e os filhos que ele esperou, ex.: os processos git);
+    onde não há wait4 (Windows) o RSS fica None.
+    O stderr vai para um arquivo temporário: com um pipe, o processo travaria
+    ao encher o buffer enquanto o wait4 espera que ele termine.
+    """
+    with tempfile.TemporaryFile() as arquivo_erros:
+        inicio = time.perf_counter()
+        processo = subprocess.Popen(comando, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=arquivo_erros)
+        if hasattr(os, "wait4"):
+            _, status, uso = os.wait4(processo.pid, 0)
+            processo.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss: KiB no Linux, bytes no macOS
+            rss = uso.ru_maxrss // 1024 if sys.platform == "darwin" else uso.ru_maxrss
+        else:
+            processo.wait()
+            rss = None
+        segundos = time.perf_counter() - inicio
+        arquivo_erros.seek(0)
+        erros = arquivo_erros.read()
+    if processo.returncode != 0:
+        raise subprocess.CalledProcessError(processo.returncode, comando, stderr=erros)
+    return segundos, rss
+
+def _processos_das_metricas(caminho_metricas):
+    """Soma os processos git das etapas de nível 0 gravadas pelo 'git.py --metricas'."""
+    total = 0
+    try:
+        with open(caminho_metricas, encoding="utf-8") as f:
+            for linha in f:
+                registro = json.loads(linha)
+                if registro.get("nivel") == 0:
+                    total += registro.get("processos", 0)
+    except FileNotFoundError:
+        return None
+    return total
+
+def _alterar_arquivos(pasta, quantidade, rodada):
+    """Reescreve os primeiros 'quantidade' arquivos .txt da árvore (fora do .git)."""
+    alterados = 0
+    for raiz, pastas, arquivos in os.walk(pasta):
+        pastas[:] = sorted(p for p in pastas if p != ".git")
+        for nome in sorted(arquivos):
+            if alterados >= quantidade:
+                return
+            if nome.endswith(".txt"):
+                with open(os.path.join(raiz, nome), "a", encoding="utf-8") as f:
+                    f.write(f"rodada {rodada}\n")
+                alterados += 1
+
+def criar_arvore_sintetica(pasta, arquivos, pastas=10):
+    """Árvore para o replicar_estrutura: arquivos pequenos em várias pastas e alguns requirements.txt."""
+    for i in range(arquivos):
+        subpasta = os.path.join(pasta, f"modulo_{i % pastas}", f"sub_{i % 3}")
+        os.makedirs(subpasta, exist_ok=True)
+        nome = "requirements.txt" if i % 50 == 0 else f"arquivo_{i}.py"
+        with open(os.path.join(subpasta, nome), "w", encoding="utf-8") as f:
+            f.write(f"# arquivo {i}\n" * 20)
+    return pasta
+
+def executar_suite(tamanhos=(100, 1000), commits=20, repeticoes=3):
+    """
+    Para cada tamanho (quantidade de arquivos) cria um repositório sintético com
+    'commits' commits e um remoto bare local, e mede cada subcomando do git.py
+    (clone, status, log, adicionar, commit, pushfull) e os scripts estrutura.py e
+    replicar_estrutura.py, sempre em um processo novo, como o usuário os executa.
+    Retorna a lista de resultados (caso, tamanho, tempos, mediana, processos, RSS).
+    """
+    git_py = os.path.join(PASTA_SCRIPTS, "git.py")
+    resultados = []
+
+    def medir(caso, tamanho, preparar, comando, cwd=None, metricas=None, env=None):
+        tempos, rss, processos = [], [], None
+        for rodada in range(repeticoes):
+            if preparar:
+                preparar(rodada)
+            if metricas and os.path.exists(metricas):
+                os.remove(metricas)
+            segundos, pico = executar_medindo(comando(rodada), cwd=cwd, env=env)
+            tempos.append(segundos)
+            rss.append(pico)
+            if metricas:
+                processos = _processos_das_metricas(metricas)
+        resultado = {"caso": caso, "tamanho": tamanho, "tempo_s": statistics.median(tempos), "tempos_s": tempos,
+                     "processos": processos, "rss_kib": max(rss) if None not in rss else None}
+        resultados.append(resultado)
+        print(f"  {caso:<20} {tamanho:>7}  {resultado['tempo_s']:.3f}s", file=sys.stderr)
+
+    for tamanho in tamanhos:
+        with tempfile.TemporaryDirectory() as tmp:
+            origem = criar_repositorio_sintetico(os.path.join(tmp, "origem"), tamanho, commits,
+                                                 pastas=max(1, tamanho // 100))
+            url = "file://" + criar_remoto_bare(origem, os.path.join(tmp, "remoto.git"))
+            trabalho = os.path.join(tmp, "trabalho")
+            _git(["clone", "-q", url, trabalho], tmp)
+            _git(["config", "user.name", "benchmark"], trabalho)
+            _git(["config", "user.email", "benchmark@localhost"], trabalho)
+            metricas = os.path.join(tmp, "metricas.jsonl")
+            base = [sys.executable, git_py, "--metricas", metricas]
+            env = dict(os.environ, GIT_AUTOMATE_GIT_BRANCH=_branch_atual(trabalho))
+            alterar = max(1, tamanho // 10)
+
+            medir("clone", tamanho, None, lambda r: base + ["clone", url, "--destino", os.path.join(tmp, f"clone_{r}")],
+                  metricas=metricas)
+            medir("status", tamanho, lambda r: _alterar_arquivos(trabalho, alterar, f"s{r}"),
+                  lambda r: base + ["status", "--caminho", trabalho], metricas=metricas)
+            medir("log", tamanho, None, lambda r: base + ["log", "--caminho", trabalho, "--limit", "0", "--ndjson"],
+                  metricas=metricas)
+            medir("adicionar", tamanho, lambda r: _alterar_arquivos(trabalho, alterar, f"a{r}"),
+                  lambda r: base + ["adicionar", "--caminho", trabalho], metricas=metricas)
+            medir("commit", tamanho, lambda r: _git(["add", "."], trabalho),
+                  lambda r: base + ["commit", "--caminho", trabalho, "-m", f"benchmark {r}"], metricas=metricas)
+            medir("pushfull", tamanho, lambda r: _alterar_arquivos(trabalho, alterar, f"p{r}"),
+                  lambda r: base + ["pushfull", "--caminho", trabalho, "-m", f"pushfull {r}"],
+                  cwd=trabalho, metricas=metricas, env=env)
+
+            arvore = criar_arvore_sintetica(os.path.join(tmp, "arvore"), tamanho)
+            medir("replicar_estrutura", tamanho, None,
+                  lambda r: [sys.executable, os.path.join(PASTA_SCRIPTS, "replicar_estrutura.py"),
+                             arvore, os.path.join(tmp, f"replica_{r}")])
+            projetos = max(1, tamanho // 10)
+            medir("estrutura", tamanho, None,
+                  lambda r: [sys.executable, os.path.join(PASTA_SCRIPTS, "estrutura.py"), "--quantidade", str(projetos),
+                             "--destino", os.path.join(tmp, f"projetos_{r}")])
+    return resultados
+
+def _versao_git():
+    result = subprocess.run(["git", "--version"], capture_output=True, text=True)
+    return result.stdout.strip()
+
+def salvar_resultados(resultados, caminho, parametros):
+    dados = {
+        "versao": VERSAO_RESULTADOS,
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "git": _versao_git(),
+        "plataforma": platform.platform(),
+        "parametros": parametros,
+        "resultados": resultados,
+    }
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+
+def comparar_resultados(caminho_base, caminho_atual, limite=10.0):
+    """
+    Compara dois arquivos de resultados (mesmo caso e tamanho). É regressão quando a
+    mediana de tempo ou o pico de RSS passa de 'limite' % da base, ou quando o número
+    de processos git aumenta. Imprime a tabela e retorna a lista de regressões.
+    """
+    with open(caminho_base, encoding="utf-8") as f:
+        base = {(r["caso"], r["tamanho"]): r for r in json.load(f)["resultados"]}
+    with open(caminho_atual, encoding="utf-8") as f:
+        atual = json.load(f)["resultados"]
+
+    def variacao(antes, depois):
+        return (depois - antes) / antes * 100 if antes else 0.0
+
+    linhas, regressoes = [], []
+    for resultado in atual:
+        anterior = base.get((resultado["caso"], resultado["tamanho"]))
+        if anterior is None:
+            linhas.append((resultado["caso"], resultado["tamanho"], "-", f"{resultado['tempo_s']:.3f}", "-", "-", "novo"))
+            continue
+        motivos = []
+        tempo = variacao(anterior["tempo_s"], resultado["tempo_s"])
+        if tempo > limite:
+            motivos.append(f"tempo +{tempo:.0f}%")
+        if anterior.get("rss_kib") and resultado.get("rss_kib"):
+            rss = variacao(anterior["rss_kib"], resultado["rss_kib"])
+            if rss > limite:
+                motivos.append(f"RSS +{rss:.0f}%")
+        if (anterior.get("processos") or 0) < (resultado.get("processos") or 0):
+            motivos.append(f"processos {anterior['processos']} -> {resultado['processos']}")
+        if motivos:
+            regressoes.append((resultado["caso"], resultado["tamanho"], motivos))
+        linhas.append((resultado["caso"], resultado["tamanho"], f"{anterior['tempo_s']:.3f}",
+                       f"{resultado['tempo_s']:.3f}", f"{tempo:+.1f}%",
+                       "-" if resultado.get("processos") is None else
+                       f"{anterior.get('processos')} -> {resultado['processos']}",
+                       "REGRESSÃO: " + ", ".join(motivos) if motivos else "ok"))
+    imprimir_tabela(("caso", "tamanho", "base (s)", "atual (s)", "variação", "processos", "resultado"), linhas)
+    return regressoes
+
+# ===========================================
+# main() - argparse
+# ===========================================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do git_automate.")
+    subparsers = parser.add_subparsers(dest="acao", help="Escolha qual benchmark executar.")
+
+    p_backend = subparsers.add_parser("backend", help="Compara os backends de execução do git.")
+    p_backend.add_argument("--repeticoes", default=10, type=int, help="Execuções por comando e backend (padrão: 10).")
+
+    p_estrutura = subparsers.add_parser("estrutura", help="Mede projetos/s gerados pelo estrutura.py.")
+    p_estrutura.add_argument("--projetos", default=100, type=int, help="Quantidade de projetos (padrão: 100).")
+    p_estrutura.add_argument("--template", help="Template JSON/TOML/YAML (padrão: estrutura embutida).")
+    p_estrutura.add_argument("--workers", type=int, help="Threads usadas no modo em lote.")
+
+    p_clone = subparsers.add_parser("clone", help="Compara os modos de clone (completo, raso, parcial, esparso, referência).")
+    p_clone.add_argument("--arquivos", default=400, type=int, help="Arquivos no repositório sintético (padrão: 400).")
+    p_clone.add_argument("--commits", default=200, type=int, help="Commits no repositório sintético (padrão: 200).")
+    p_clone.add_argument("--tamanho", default=4096, type=int, help="Bytes aleatórios por arquivo/commit (padrão: 4096).")
+    p_clone.add_argument("--repeticoes", default=3, type=int, help="Repetições por modo (padrão: 3).")
+
+    p_suite = subparsers.add_parser("suite", help="Mede os subcomandos do git.py, estrutura.py e replicar_estrutura.py.")
+    p_suite.add_argument("--tamanhos", nargs="+", default=[100, 1000], type=int,
+                         help="Quantidades de arquivos dos repositórios/árvores sintéticos (padrão: 100 1000).")
+    p_suite.add_argument("--commits", default=20, type=int, help="Commits no repositório sintético (padrão: 20).")
+    p_suite.add_argument("--repeticoes", default=3, type=int, help="Repetições por caso; vale a mediana (padrão: 3).")
+    p_suite.add_argument("--saida", default="benchmark_resultados.json", help="Arquivo JSON com os resultados.")
+    p_suite.add_argument("--comparar-com", help="Resultados anteriores (JSON) para comparar ao final.")
+    p_suite.add_argument("--limite", default=10.0, type=float, help="Variação (%%) considerada regressão (padrão: 10).")
+
+    p_comparar = subparsers.add_parser("comparar", help="Compara dois arquivos de resultados da suíte.")
+    p_comparar.add_argument("base", help="Resultados de referência (JSON).")
+    p_comparar.add_argument("atual", help="Resultados novos (JSON).")
+    p_comparar.add_argument("--limite", default=10.0, type=float, help="Variação (%%) considerada regressão (padrão: 10).")
+
+    args = parser.parse_args()
+
+    if args.acao == "backend":
+        benchmark_backend(args.repeticoes)
+    elif args.acao == "estrutura":
+        benchmark_estrutura(args.projetos, args.template, args.workers)
+    elif args.acao == "clone":
+        benchmark_clone(args.arquivos, args.commits, args.tamanho, repeticoes=args.repeticoes)
+    elif args.acao == "suite":
+        resultados = executar_suite(args.tamanhos, args.commits, args.repeticoes)
+        salvar_resultados(resultados, args.saida, {"tamanhos": args.tamanhos, "commits": args.commits,
+                                                   "repeticoes": args.repeticoes})
+        print(f"[OK] Resultados gravados em '{args.saida}'.")
+        if args.comparar_com and comparar_resultados(args.comparar_com, args.saida, args.limite):
+            sys.exit(1)
+    elif args.acao == "comparar":
+        if comparar_resultados(args.base, args.atual, args.limite):
+            sys.exit(1)
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
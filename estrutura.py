@@ -1,4 +1,14 @@
+import argparse
+import functools
+import hashlib
+import json
 import os
+import shutil
+import string
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Conteúdo padrão para alguns arquivos especiais
 CONTEUDO_GITIGNORE = """# Python
@@ -31,104 +41,253 @@ cryptography
 SQLAlchemy
 """
 
+# Template padrão (a mesma estrutura que antes ficava fixa no main):
+#  - "estrutura": chave = pasta relativa ("" é a raiz), valor = lista de arquivos
+#  - "conteudos": chave = caminho relativo ou nome do arquivo, valor = conteúdo
+#  - "variaveis": valores padrão para ${variavel} em caminhos e conteúdos
+TEMPLATE_PADRAO = {
+    "variaveis": {"nome": "name"},
+    "conteudos": {
+        ".gitignore": CONTEUDO_GITIGNORE,
+        "readme.md": CONTEUDO_README,
+        "main.py": CONTEUDO_MAIN,
+        "requirements.txt": CONTEUDO_REQUIREMENTS,
+    },
+    "estrutura": {
+        # Raiz do projeto
+        "": [".gitignore", "README.md", "main.py", "requirements.txt"],
+        "src": ["__init__.py"],
+        "src/db": ["__init__.py", "conexao.py"],
+        "src/cadastro": ["__init__.py", "cadastro_usuario.py"],
+        "src/captura": ["__init__.py", "captura_api.py", "processador_eventos.py"],
+        "src/captura/tipos_eventos": [
+            "__init__.py",
+            "evento_a.py",
+            "evento_b.py",
+            "evento_c.py",
+            "evento_default.py",
+        ],
+        "src/utils": ["__init__.py", "funcoes_auxiliares.py"],
+        "src/services": ["__init__.py", "exemplo_service.py"],
+        "tests": [
+            "__init__.py",
+            "test_conexao.py",
+            "test_cadastro_usuario.py",
+            "test_captura_api.py",
+        ],
+    },
+}
+
 def criar_arquivo(caminho_arquivo):
     """
     Cria um arquivo com conteúdo padrão para alguns nomes específicos
     ou vazio, caso contrário.
     """
     nome = os.path.basename(caminho_arquivo).lower()
+    conteudo = TEMPLATE_PADRAO["conteudos"].get(nome, "")  # Vazio para qualquer outro arquivo
+
+    with open(caminho_arquivo, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
 
-    # Define conteúdo com base no nome do arquivo
-    if nome == ".gitignore":
-        conteudo = CONTEUDO_GITIGNORE
-    elif nome == "readme.md":
-        conteudo = CONTEUDO_README
-    elif nome == "main.py":
-        conteudo = CONTEUDO_MAIN
-    elif nome == "requirements.txt":
-        conteudo = CONTEUDO_REQUIREMENTS
-    else:
-        conteudo = ""  # Vazio para qualquer outro arquivo
+# ===========================================
+# Templates (carregamento + compilação com cache)
+# ===========================================
+def ler_template(caminho_template):
+    """Lê um template em JSON, TOML ou YAML (YAML exige o pacote PyYAML)."""
+    extensao = os.path.splitext(caminho_template)[1].lower()
+    if extensao == ".json":
+        with open(caminho_template, encoding="utf-8") as f:
+            return json.load(f)
+    if extensao == ".toml":
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(caminho_template, "rb") as f:
+            return tomllib.load(f)
+    if extensao in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError("Templates YAML exigem o pacote PyYAML (pip install pyyaml).")
+        with open(caminho_template, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    raise ValueError(f"Formato de template não suportado: '{caminho_template}' (use .json, .toml ou .yaml).")
 
+def compilar_template(template):
+    """
+    Pré-processa um template (dicionário) uma única vez:
+    - resolve o conteúdo de cada arquivo (caminho relativo exato, senão nome em minúsculas);
+    - separa os conteúdos fixos (compartilhados por todos os projetos) dos que
+      usam ${variavel} e precisam de substituição por projeto.
+    Retorna {"variaveis", "pastas", "arquivos"}, com arquivos = [(caminho, conteudo, compartilhado)].
+    """
+    conteudos = template.get("conteudos", {})
+    por_nome = {chave.lower(): valor for chave, valor in conteudos.items() if "/" not in chave}
+    pastas = []
+    arquivos = []
+    for pasta, nomes in template.get("estrutura", {}).items():
+        pasta = pasta.strip("/")
+        pastas.append(string.Template(pasta))
+        for nome in nomes:
+            rel = f"{pasta}/{nome}" if pasta else nome
+            conteudo = conteudos.get(rel, por_nome.get(nome.lower(), ""))
+            modelo = string.Template(conteudo)
+            compartilhado = not _usa_variaveis(modelo)
+            arquivos.append((string.Template(rel), conteudo if compartilhado else modelo, compartilhado))
+    return {"variaveis": dict(template.get("variaveis", {})), "pastas": pastas, "arquivos": arquivos}
+
+def _usa_variaveis(modelo):
+    """Verifica se um string.Template tem algum ${variavel}/$variavel."""
+    for correspondencia in modelo.pattern.finditer(modelo.template):
+        if correspondencia.group("named") or correspondencia.group("braced"):
+            return True
+    return False
+
+@functools.lru_cache(maxsize=32)
+def _template_em_cache(caminho_absoluto, mtime_ns, tamanho):
+    return compilar_template(ler_template(caminho_absoluto))
+
+def carregar_template(caminho_template=None):
+    """
+    Retorna o template compilado. Sem caminho, usa o TEMPLATE_PADRAO.
+    O resultado fica em cache enquanto o arquivo não mudar (mtime/tamanho).
+    """
+    if caminho_template is None:
+        return _template_padrao_compilado()
+    caminho_absoluto = os.path.abspath(caminho_template)
+    info = os.stat(caminho_absoluto)
+    return _template_em_cache(caminho_absoluto, info.st_mtime_ns, info.st_size)
+
+@functools.lru_cache(maxsize=1)
+def _template_padrao_compilado():
+    return compilar_template(TEMPLATE_PADRAO)
+
+# ===========================================
+# Geração de projetos
+# ===========================================
+def gerar_projeto(template, raiz_projeto, variaveis=None, cache_compartilhado=None, hardlink=False):
+    """
+    Cria as pastas e arquivos de um projeto a partir de um template compilado.
+    - 'variaveis' completa/sobrescreve as variáveis padrão do template.
+    - 'cache_compartilhado' (dicionário conteúdo -> arquivo já gravado) permite
+      gravar cada conteúdo fixo uma única vez e apenas copiá-lo (ou criar um
+      hardlink, com 'hardlink=True') nos demais projetos. Atenção: com hardlink,
+      editar o arquivo em um projeto altera todos.
+    Retorna a lista de caminhos relativos (com '/') dos arquivos criados.
+    """
+    valores = dict(template["variaveis"])
+    valores.update(variaveis or {})
+
+    os.makedirs(raiz_projeto, exist_ok=True)
+    for pasta in template["pastas"]:
+        os.makedirs(os.path.join(raiz_projeto, pasta.safe_substitute(valores)), exist_ok=True)
+
+    criados = []
+    for rel, conteudo, compartilhado in template["arquivos"]:
+        criados.append(rel.safe_substitute(valores))
+        caminho_arquivo = os.path.join(raiz_projeto, criados[-1])
+        if not compartilhado:
+            _gravar(caminho_arquivo, conteudo.safe_substitute(valores))
+        elif cache_compartilhado is None or not conteudo:
+            _gravar(caminho_arquivo, conteudo)
+        else:
+            _replicar_compartilhado(cache_compartilhado[conteudo], caminho_arquivo, hardlink)
+    return criados
+
+def _gravar(caminho_arquivo, conteudo):
     with open(caminho_arquivo, 'w', encoding='utf-8') as f:
         f.write(conteudo)
 
+def _replicar_compartilhado(origem, destino, hardlink):
+    if hardlink:
+        try:
+            if os.path.lexists(destino):
+                os.remove(destino)
+            os.link(origem, destino)
+            return
+        except OSError:
+            pass  # Ex.: sistema de arquivos sem suporte. Copia normalmente.
+    shutil.copyfile(origem, destino)
+
+def preparar_cache_compartilhado(template, pasta_cache):
+    """Grava uma única vez cada conteúdo fixo (não vazio) do template em 'pasta_cache'."""
+    cache = {}
+    for _, conteudo, compartilhado in template["arquivos"]:
+        if compartilhado and conteudo and conteudo not in cache:
+            caminho = os.path.join(pasta_cache, hashlib.sha1(conteudo.encode("utf-8")).hexdigest())
+            _gravar(caminho, conteudo)
+            cache[conteudo] = caminho
+    return cache
+
+def gerar_em_lote(template, diretorio_base, nomes, variaveis=None, workers=None, hardlink=False):
+    """
+    Cria vários projetos (um por nome, em diretorio_base/<nome>) em paralelo.
+    Cada projeto recebe a variável ${nome}; os conteúdos fixos são gravados uma
+    vez e copiados (ou ligados com hardlink) para cada projeto.
+    Retorna a quantidade de arquivos criados.
+    """
+    os.makedirs(diretorio_base, exist_ok=True)
+    # O cache fica no mesmo sistema de arquivos dos projetos (necessário para hardlink)
+    pasta_cache = tempfile.mkdtemp(prefix=".estrutura_cache_", dir=diretorio_base)
+    try:
+        cache = preparar_cache_compartilhado(template, pasta_cache)
+
+        def gerar(nome):
+            valores = dict(variaveis or {}, nome=nome)
+            return len(gerar_projeto(template, os.path.join(diretorio_base, nome), valores, cache, hardlink))
+
+        with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4)) as executor:
+            return sum(executor.map(gerar, nomes))
+    finally:
+        shutil.rmtree(pasta_cache, ignore_errors=True)
+
+def _interpretar_variaveis(pares):
+    variaveis = {}
+    for par in pares:
+        chave, sep, valor = par.partition("=")
+        if not sep or not chave:
+            raise ValueError(f"Variável inválida '{par}'. Use chave=valor.")
+        variaveis[chave] = valor
+    return variaveis
+
 def main():
+    parser = argparse.ArgumentParser(description="Cria a estrutura de pastas/arquivos de um ou mais projetos.")
     # Diretório base onde ficam todos os projetos
-    diretorio_base = r"C:\vscode"
+    parser.add_argument("nomes", nargs="*", default=["name"], help="Nome(s) do sistema (pasta do projeto). Padrão: name.")
+    parser.add_argument("--destino", default=r"C:\vscode", help=r"Diretório base dos projetos (padrão: C:\vscode).")
+    parser.add_argument("--template", help="Template em JSON, TOML ou YAML (padrão: estrutura embutida).")
+    parser.add_argument("--var", action="append", default=[], help="Variável do template (chave=valor); pode ser repetida.")
+    parser.add_argument("--quantidade", type=int, help="Gera N projetos <prefixo>_001..N em vez de usar os nomes.")
+    parser.add_argument("--prefixo", default="projeto", help="Prefixo dos nomes com --quantidade (padrão: projeto).")
+    parser.add_argument("--workers", type=int, help="Threads usadas no modo em lote.")
+    parser.add_argument("--hardlink", action="store_true",
+                        help="No modo em lote, liga os arquivos de conteúdo fixo com hardlink em vez de copiar.")
+    args = parser.parse_args()
 
-    # Nome do sistema (pasta do sistema)
-    nome_sistema = "name"
+    try:
+        template = carregar_template(args.template)
+        variaveis = _interpretar_variaveis(args.var)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"[ERRO] {e}")
+        sys.exit(1)
 
-    # Caminho raiz do projeto: ex. C:\vscode\
-    raiz_projeto = os.path.join(diretorio_base, nome_sistema)
-
-    # Estrutura de pastas e arquivos (dicionário):
-    #  - chave = pasta
-    #  - valor = lista de arquivos
-    estrutura = {
-        # Raiz do projeto
-        raiz_projeto: [
-            ".gitignore",
-            "README.md",
-            "main.py",
-            "requirements.txt",
-        ],
-        # Pasta src/
-        os.path.join(raiz_projeto, "src"): [
-            "__init__.py",
-        ],
-        # Pasta src/db/
-        os.path.join(raiz_projeto, "src", "db"): [
-            "__init__.py",
-            "conexao.py",
-        ],
-        # Pasta src/cadastro/
-        os.path.join(raiz_projeto, "src", "cadastro"): [
-            "__init__.py",
-            "cadastro_usuario.py",
-        ],
-        # Pasta src/captura/
-        os.path.join(raiz_projeto, "src", "captura"): [
-            "__init__.py",
-            "captura_api.py",
-            "processador_eventos.py",
-        ],
-        # Subpasta src/captura/tipos_eventos/
-        os.path.join(raiz_projeto, "src", "captura", "tipos_eventos"): [
-            "__init__.py",
-            "evento_a.py",
-            "evento_b.py",
-            "evento_c.py",
-            "evento_default.py",
-        ],
-        # Pasta src/utils/
-        os.path.join(raiz_projeto, "src", "utils"): [
-            "__init__.py",
-            "funcoes_auxiliares.py",
-        ],
-        # Pasta src/services/
-        os.path.join(raiz_projeto, "src", "services"): [
-            "__init__.py",
-            "exemplo_service.py",
-        ],
-        # Pasta tests/
-        os.path.join(raiz_projeto, "tests"): [
-            "__init__.py",
-            "test_conexao.py",
-            "test_cadastro_usuario.py",
-            "test_captura_api.py",
-        ],
-    }
+    nomes = args.nomes
+    if args.quantidade:
+        nomes = [f"{args.prefixo}_{i:03d}" for i in range(1, args.quantidade + 1)]
 
-    # Cria as pastas e arquivos
-    for pasta, arquivos in estrutura.items():
-        os.makedirs(pasta, exist_ok=True)  # Cria a pasta se não existir
-        for arquivo in arquivos:
-            caminho_arquivo = os.path.join(pasta, arquivo)
-            criar_arquivo(caminho_arquivo)
+    if len(nomes) == 1:
+        # Caminho raiz do projeto: ex. C:\vscode\name
+        raiz_projeto = os.path.join(args.destino, nomes[0])
+        gerar_projeto(template, raiz_projeto, dict(variaveis, nome=nomes[0]))
+        print(f"Estrutura de diretórios e arquivos criada em '{raiz_projeto}' com sucesso.")
+        return
 
-    print(f"Estrutura de diretórios e arquivos criada em '{raiz_projeto}' com sucesso.")
+    inicio = time.perf_counter()
+    arquivos = gerar_em_lote(template, args.destino, nomes, variaveis, args.workers, args.hardlink)
+    segundos = max(time.perf_counter() - inicio, 1e-9)
+    print(f"{len(nomes)} projetos ({arquivos} arquivos) criados em '{args.destino}' em {segundos:.2f}s "
+          f"({len(nomes) / segundos:.1f} projetos/s).")
 
 if __name__ == "__main__":
     main()
@@ -2,67 +2,708 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import asyncio
+import atexit
 import configparser
+import contextlib
+import contextvars
+import fnmatch
+import functools
+import hashlib
+import json
 import os
+import random
+import shutil
+import stat
+import struct
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# ===========================================
+# Execução do git (backends)
+# ===========================================
+# Contador de processos git criados (usado pelo benchmark)
+ESTATISTICAS = {"processos": 0}
+_trava_estatisticas = threading.Lock()
+
+def _contar_processo():
+    with _trava_estatisticas:
+        ESTATISTICAS["processos"] += 1
+    for registro in _etapas_em_andamento():
+        registro["processos"] += 1
+
+class OperacaoCancelada(BaseException):
+    """
+    A operação síncrona foi cancelada pela API assíncrona (cancelamento da tarefa ou timeout).
+    Deriva de BaseException, como o asyncio.CancelledError, para não ser tratada como falha do git.
+    """
+
+class Cancelamento:
+    """
+    Cancelamento de uma operação síncrona executada em uma thread pela API assíncrona:
+    cancelar() encerra o processo git em andamento e impede que outros sejam criados.
+    """
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self._processos = set()
+        self._trava = threading.Lock()
+
+    def cancelar(self):
+        with self._trava:
+            self.evento.set()
+            for processo in self._processos:
+                processo.kill()
+
+    def verificar(self):
+        if self.evento.is_set():
+            raise OperacaoCancelada()
+
+    def executar(self, comando, cwd=None, input=None, capture_output=False, check=False, **kwargs):
+        """Como subprocess.run, com o processo registrado para ser encerrado por cancelar()."""
+        if capture_output:
+            kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+        if input is not None:
+            kwargs["stdin"] = subprocess.PIPE
+        with self._trava:
+            self.verificar()
+            processo = subprocess.Popen(comando, cwd=cwd, **kwargs)
+            self._processos.add(processo)
+        try:
+            stdout, stderr = processo.communicate(input)
+        finally:
+            with self._trava:
+                self._processos.discard(processo)
+        self.verificar()
+        result = subprocess.CompletedProcess(comando, processo.returncode, stdout, stderr)
+        if check:
+            result.check_returncode()
+        return result
+
+# Cancelamento da operação em andamento (definido só nas threads da API assíncrona)
+_cancelamento_atual = contextvars.ContextVar("git_automate_cancelamento", default=None)
+
+def esperar(segundos):
+    """time.sleep que termina antes (com OperacaoCancelada) se a operação for cancelada."""
+    cancelamento = _cancelamento_atual.get()
+    if cancelamento is None:
+        time.sleep(segundos)
+        return
+    cancelamento.evento.wait(segundos)
+    cancelamento.verificar()
+
+def executar_git(args, cwd=None, **kwargs):
+    """Executa 'git <args>' com subprocess.run (mesmos parâmetros), contabilizando o processo."""
+    _contar_processo()
+    cancelamento = _cancelamento_atual.get()
+    try:
+        if cancelamento is None:
+            result = subprocess.run(["git", *args], cwd=cwd, **kwargs)
+        else:
+            result = cancelamento.executar(["git", *args], cwd=cwd, **kwargs)
+    except subprocess.CalledProcessError as e:
+        _registrar_saida(e.stdout, e.stderr)
+        raise
+    _registrar_saida(result.stdout, result.stderr)
+    return result
+
+def abrir_git(args, cwd=None, **kwargs):
+    """Abre 'git <args>' com subprocess.Popen (processo de longa duração), contabilizando o processo."""
+    _contar_processo()
+    return subprocess.Popen(["git", *args], cwd=cwd, **kwargs)
+
+# Formato explícito: a linha de um objeto encontrado não inclui o nome consultado
+# (que pode ter espaços, ex.: ':pasta/meu arquivo.txt')
+ARGS_BATCH_CHECK = ["cat-file", "--batch-check=%(objectname) %(objecttype) %(objectsize)"]
+
+def _interpretar_batch_check(linha):
+    """Converte uma linha do 'git cat-file --batch-check' em (sha, tipo, tamanho) ou None."""
+    linha = linha.rstrip("\n")
+    # Nomes inexistentes voltam como '<nome> missing' (ou 'ambiguous'), com o nome como foi enviado
+    if not linha or linha.endswith((" missing", " ambiguous")):
+        return None
+    sha, tipo, tamanho = linha.split(" ")
+    return sha, tipo, int(tamanho)
+
+class BackendSubprocess:
+    """
+    Backend padrão: cada consulta somente-leitura cria um novo processo git.
+    """
+    nome = "subprocess"
+
+    def consultar_objetos(self, caminho_projeto, nomes):
+        """
+        Resolve vários nomes (HEAD, refs/heads/main, :arquivo no índice, ...)
+        e retorna uma lista de (sha, tipo, tamanho) ou None para os inexistentes.
+        """
+        entrada = "".join(f"{nome}\n" for nome in nomes)
+        result = executar_git(ARGS_BATCH_CHECK, cwd=caminho_projeto,
+                              input=entrada, capture_output=True, text=True)
+        return [_interpretar_batch_check(linha) for linha in result.stdout.splitlines()]
+
+    def consultar_objeto(self, caminho_projeto, nome):
+        """Resolve um único nome; retorna (sha, tipo, tamanho) ou None."""
+        return self.consultar_objetos(caminho_projeto, [nome])[0]
+
+    def branch_atual(self, caminho_projeto):
+        """Nome curto da branch atual ou None (HEAD destacado)."""
+        result = executar_git(["symbolic-ref", "-q", "--short", "HEAD"], cwd=caminho_projeto,
+                              capture_output=True, text=True)
+        return result.stdout.strip() or None
+
+    def fechar(self):
+        pass
+
+class BackendPersistente(BackendSubprocess):
+    """
+    Mantém um 'git cat-file --batch-check' aberto por repositório e envia
+    as consultas somente-leitura por ele, sem criar um processo por chamada.
+    O processo é reaberto quando o índice (.git/index) muda, pois o git
+    carrega o índice uma única vez e as consultas ':arquivo' ficariam desatualizadas.
+    """
+    nome = "persistente"
+
+    def __init__(self):
+        self._processos = {}
+        self._trava = threading.Lock()
+
+    @staticmethod
+    def _assinatura_index(caminho_projeto):
+        try:
+            info = os.stat(os.path.join(caminho_projeto, ".git", "index"))
+            return info.st_mtime_ns, info.st_size
+        except OSError:
+            return None
+
+    def _processo(self, caminho_projeto):
+        chave = os.path.realpath(caminho_projeto)
+        assinatura = self._assinatura_index(chave)
+        atual = self._processos.get(chave)
+        if atual is not None:
+            processo, assinatura_antiga, trava = atual
+            if processo.poll() is None and assinatura == assinatura_antiga:
+                return processo, trava
+            self._encerrar(processo)
+        processo = abrir_git(ARGS_BATCH_CHECK, cwd=chave,
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                             stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        trava = threading.Lock()
+        self._processos[chave] = (processo, assinatura, trava)
+        return processo, trava
+
+    def consultar_objetos(self, caminho_projeto, nomes):
+        with self._trava:
+            processo, trava = self._processo(caminho_projeto)
+        with trava:
+            processo.stdin.write("".join(f"{nome}\n" for nome in nomes))
+            processo.stdin.flush()
+            linhas = [processo.stdout.readline() for _ in nomes]
+        _registrar_bytes(sum(len(linha) for linha in linhas))
+        return [_interpretar_batch_check(linha) for linha in linhas]
+
+    def branch_atual(self, caminho_projeto):
+        """Lê o .git/HEAD direto, sem criar processo (worktrees e submódulos usam o git)."""
+        try:
+            with open(os.path.join(caminho_projeto, ".git", "HEAD"), encoding="utf-8") as f:
+                conteudo = f.read().strip()
+        except OSError:
+            return super().branch_atual(caminho_projeto)
+        if conteudo.startswith("ref: refs/heads/"):
+            return conteudo[len("ref: refs/heads/"):]
+        return None
+
+    @staticmethod
+    def _encerrar(processo):
+        try:
+            processo.stdin.close()
+            processo.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            processo.kill()
+
+    def fechar(self):
+        with self._trava:
+            for processo, _, _ in self._processos.values():
+                self._encerrar(processo)
+            self._processos.clear()
+
+BACKENDS = {
+    BackendSubprocess.nome: BackendSubprocess,
+    BackendPersistente.nome: BackendPersistente,
+}
+_backend = BackendSubprocess()
+
+def definir_backend(nome):
+    """Troca o backend usado nas consultas somente-leitura ('subprocess' ou 'persistente')."""
+    global _backend
+    _backend.fechar()
+    _backend = BACKENDS[nome]()
+    return _backend
+
+def backend_atual():
+    return _backend
+
+atexit.register(lambda: _backend.fechar())
+
+# ===========================================
+# Instrumentação (--profile / métricas)
+# ===========================================
+# Registros das etapas medidas (só coletados com o perfil ativo)
+PERFIL = {"ativo": False, "trace_id": None, "registros": []}
+_trava_perfil = threading.Lock()
+# Pilha (tupla) das etapas em andamento; contextvars isola threads e tarefas asyncio
+_etapas_atuais = contextvars.ContextVar("git_automate_etapas", default=())
+
+def ativar_perfil():
+    """Passa a medir as etapas (tempo, processos, bytes de saída, código de saída)."""
+    PERFIL["ativo"] = True
+    PERFIL["trace_id"] = os.urandom(16).hex()
+    PERFIL["registros"] = []
+
+def _etapas_em_andamento():
+    return _etapas_atuais.get() if PERFIL["ativo"] else ()
+
+def _registrar_bytes(quantidade):
+    for registro in _etapas_em_andamento():
+        registro["bytes_saida"] += quantidade
+
+def _registrar_saida(*saidas):
+    """Soma os bytes capturados pelo processo git nas etapas em andamento."""
+    _registrar_bytes(sum(len(saida) for saida in saidas if saida))
+
+def medir_etapa(func):
+    """
+    Decorador das funções git_*: com o perfil ativo, registra tempo de parede,
+    processos git criados, bytes de saída capturados e código de saída.
+    Etapas chamadas dentro de outras (ex.: git_add dentro do git_pushfull)
+    ficam ligadas à etapa pai e também somam nos contadores dela.
+    """
+    def iniciar(args):
+        pilha = _etapas_atuais.get()
+        registro = {
+            "etapa": func.__name__,
+            "repo": str(getattr(args[0], "caminho", args[0])) if args else "",
+            "span_id": os.urandom(8).hex(),
+            "pai": pilha[-1]["span_id"] if pilha else None,
+            "nivel": len(pilha),
+            "inicio_ns": time.time_ns(),
+            "processos": 0,
+            "bytes_saida": 0,
+            "codigo_saida": 0,
+        }
+        return registro, _etapas_atuais.set(pilha + (registro,)), time.perf_counter()
+
+    def finalizar(registro, token, inicio, erro):
+        # O código de saída é o da etapa (0 se terminou sem erro), não o do último
+        # processo git: sondagens como 'merge-base --is-ancestor' saem com 1 normalmente
+        if isinstance(erro, subprocess.CalledProcessError):
+            registro["codigo_saida"] = erro.returncode
+        elif isinstance(erro, SystemExit):
+            registro["codigo_saida"] = erro.code if isinstance(erro.code, int) else 1
+        elif erro is not None:
+            registro["codigo_saida"] = 1
+        registro["duracao_s"] = time.perf_counter() - inicio
+        _etapas_atuais.reset(token)
+        with _trava_perfil:
+            PERFIL["registros"].append(registro)
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not PERFIL["ativo"]:
+                return await func(*args, **kwargs)
+            registro, token, inicio = iniciar(args)
+            erro = None
+            try:
+                return await func(*args, **kwargs)
+            except BaseException as e:
+                erro = e
+                raise
+            finally:
+                finalizar(registro, token, inicio, erro)
+        return wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not PERFIL["ativo"]:
+            return func(*args, **kwargs)
+        registro, token, inicio = iniciar(args)
+        erro = None
+        try:
+            return func(*args, **kwargs)
+        except BaseException as e:
+            erro = e
+            raise
+        finally:
+            finalizar(registro, token, inicio, erro)
+    return wrapper
+
+def imprimir_perfil(registros=None):
+    """Imprime a tabela de etapas (ordem de início, com recuo para as etapas internas)."""
+    registros = sorted(PERFIL["registros"] if registros is None else registros, key=lambda r: r["inicio_ns"])
+    if not registros:
+        return
+    linhas = [("  " * r["nivel"] + r["etapa"], f"{r['duracao_s'] * 1000:.1f}", str(r["processos"]),
+               str(r["bytes_saida"]), str(r["codigo_saida"]), r["repo"]) for r in registros]
+    cabecalho = ("Etapa", "Tempo (ms)", "Processos", "Bytes", "Código", "Repositório")
+    print("\n*** Perfil de execução ***", file=sys.stderr)
+    imprimir_tabela(cabecalho, linhas, sys.stderr)
+
+def imprimir_tabela(cabecalho, linhas, saida=None):
+    """Imprime uma tabela de texto com colunas alinhadas (cabeçalho + separador + linhas)."""
+    larguras = [max(len(c) for c in coluna) for coluna in zip(cabecalho, *linhas)]
+    for linha in [cabecalho, tuple("-" * l for l in larguras)] + list(linhas):
+        print("  ".join(c.ljust(l) for c, l in zip(linha, larguras)).rstrip(), file=saida or sys.stdout)
+
+def _registro_para_span(registro):
+    """Converte um registro em um span no formato JSON do OpenTelemetry (OTLP)."""
+    fim = registro["inicio_ns"] + int(registro["duracao_s"] * 1e9)
+    atributos = [
+        {"key": "git_automate.repo", "value": {"stringValue": registro["repo"]}},
+        {"key": "git_automate.processos", "value": {"intValue": str(registro["processos"])}},
+        {"key": "git_automate.bytes_saida", "value": {"intValue": str(registro["bytes_saida"])}},
+        {"key": "process.exit_code", "value": {"intValue": str(registro["codigo_saida"])}},
+    ]
+    span = {
+        "traceId": PERFIL["trace_id"],
+        "spanId": registro["span_id"],
+        "name": registro["etapa"],
+        "kind": 1,
+        "startTimeUnixNano": str(registro["inicio_ns"]),
+        "endTimeUnixNano": str(fim),
+        "attributes": atributos,
+        # 1 = OK, 2 = ERROR
+        "status": {"code": 2 if registro["codigo_saida"] else 1},
+    }
+    if registro["pai"]:
+        span["parentSpanId"] = registro["pai"]
+    return span
+
+def gravar_metricas(caminho_arquivo, formato="jsonl"):
+    """
+    Acrescenta os registros em 'caminho_arquivo', um JSON por linha:
+    - 'jsonl': os registros como estão (etapa, repo, duracao_s, processos, ...);
+    - 'otel': spans no formato JSON do OpenTelemetry.
+    """
+    with _trava_perfil:
+        registros = sorted(PERFIL["registros"], key=lambda r: r["inicio_ns"])
+    with open(caminho_arquivo, "a", encoding="utf-8") as f:
+        for registro in registros:
+            if formato == "otel":
+                dados = _registro_para_span(registro)
+            else:
+                dados = dict(registro, trace_id=PERFIL["trace_id"])
+            f.write(json.dumps(dados, ensure_ascii=False) + "\n")
 
 # ===========================================
 # Utilitários de config.ini
 # ===========================================
+# Arquivos locais do git.py que não devem ir para o repositório
+ARQUIVOS_LOCAIS = ["config.ini", ".gitignore", "git.py"]
+
+# Opções conhecidas: seção -> chave -> (tipo, padrão)
+ESQUEMA_CONFIG = {
+    "git": {"url": (str, None), "branch": (str, "main"), "username": (str, None), "token": (str, None),
+            "estrategia": (str, "rebase"), "tentativas_push": (int, 4)},
+    "desempenho": {"cache_alteracoes": (bool, False), "lote_stage": (int, 1000),
+                   "arquivos_por_commit": (int, 0), "mb_por_commit": (float, 0.0)},
+    "ssh": {"reusar_conexao": (bool, False), "persistir": (int, 60)},
+    "cache": {"espelhos": (bool, False), "pasta": (str, None), "tamanho_maximo_mb": (float, 2048.0),
+              "validade": (float, 10.0)},
+    "watch": {"mensagem": (str, "Auto-commit"), "debounce": (float, 2.0),
+              "intervalo_push": (float, 60.0), "lote_push": (int, 10)},
+    "workspace": {"repos": (str, "")},
+    "prefetch": {"intervalo": (float, 300.0), "validade": (float, 300.0)},
+    "arquivos_grandes": {"limite_mb": (float, 0.0), "padroes": (str, ""), "acao": (str, "lfs")},
+    "manutencao": {"a_cada_pushes": (int, 0), "expirar_prune": (str, "2.weeks.ago")},
+}
+
+def caminho_config_global():
+    """Config global do usuário: $GIT_AUTOMATE_CONFIG ou ~/.config/git_automate/config.ini."""
+    return os.environ.get("GIT_AUTOMATE_CONFIG") or \
+        os.path.join(os.path.expanduser("~"), ".config", "git_automate", "config.ini")
+
+@functools.lru_cache(maxsize=64)
+def _ler_ini(caminho_absoluto, mtime_ns, tamanho):
+    config = configparser.ConfigParser()
+    config.read(caminho_absoluto, encoding="utf-8")
+    return {secao: dict(config[secao]) for secao in config.sections()}
+
+def _secoes_do_arquivo(caminho_config):
+    """Seções de um .ini, interpretado uma única vez enquanto o arquivo não mudar (mtime/tamanho)."""
+    caminho_absoluto = os.path.abspath(caminho_config)
+    try:
+        info = os.stat(caminho_absoluto)
+    except OSError:
+        return {}
+    return _ler_ini(caminho_absoluto, info.st_mtime_ns, info.st_size)
+
+def _config_do_ambiente():
+    """Sobrescritas por variável de ambiente: GIT_AUTOMATE_<SECAO>_<CHAVE> (ex.: GIT_AUTOMATE_GIT_BRANCH)."""
+    secoes = {}
+    for secao, chaves in ESQUEMA_CONFIG.items():
+        for chave in chaves:
+            valor = os.environ.get(f"GIT_AUTOMATE_{secao}_{chave}".upper())
+            if valor is not None:
+                secoes.setdefault(secao, {})[chave] = valor
+    return secoes
+
 def carregar_config(caminho_config="config.ini"):
-    """Lê as configurações do arquivo .ini (caso exista)."""
+    """Lê as configurações do arquivo .ini (caso exista). Só o arquivo, sem as demais camadas."""
     config = configparser.ConfigParser()
-    if os.path.exists(caminho_config):
-        config.read(caminho_config, encoding="utf-8")
+    config.read_dict(_secoes_do_arquivo(caminho_config))
+    return config
+
+def config_efetiva(*caminhos_config, base=None):
+    """
+    Junta as camadas de configuração, da menor para a maior prioridade:
+    config global (ou 'base', se informada) -> arquivos em 'caminhos_config'
+    (ex.: workspace, repositório) -> variáveis de ambiente GIT_AUTOMATE_<SECAO>_<CHAVE>.
+    Cada chave sobrescreve apenas a mesma chave das camadas anteriores.
+    """
+    config = configparser.ConfigParser()
+    if base is not None:
+        config.read_dict(base)
+    else:
+        config.read_dict(_secoes_do_arquivo(caminho_config_global()))
+    for caminho in caminhos_config:
+        config.read_dict(_secoes_do_arquivo(caminho))
+    config.read_dict(_config_do_ambiente())
     return config
 
+def opcao(config, secao, chave):
+    """Lê uma opção do ESQUEMA_CONFIG já convertida para o tipo dela (ou o valor padrão)."""
+    tipo, padrao = ESQUEMA_CONFIG[secao][chave]
+    if not config.has_option(secao, chave):
+        return padrao
+    try:
+        if tipo is bool:
+            return config.getboolean(secao, chave)
+        return tipo(config.get(secao, chave))
+    except ValueError:
+        raise ValueError(f"Valor inválido para '{chave}' na seção [{secao}]: {config.get(secao, chave)!r}")
+
+def validar_config(config):
+    """Confere o tipo de todas as opções conhecidas (gera ValueError na primeira inválida)."""
+    for secao, chaves in ESQUEMA_CONFIG.items():
+        for chave in chaves:
+            opcao(config, secao, chave)
+
+@functools.lru_cache(maxsize=16)
+def _entradas_gitignore(caminho_absoluto, mtime_ns, tamanho):
+    with open(caminho_absoluto, encoding="utf-8") as f:
+        return frozenset(linha.strip() for linha in f)
+
 def salvar_config(config, caminho_config="config.ini"):
     """Salva (sobrescreve) o arquivo de configuração config.ini."""
     with open(caminho_config, 'w', encoding='utf-8') as f:
         config.write(f)
+    _ler_ini.cache_clear()
 
-    # Adicionar 'config.ini' ao .gitignore, se ainda não existir
-    gitignore_path = os.path.join(os.path.dirname(caminho_config), '.gitignore')
-    if os.path.exists(gitignore_path):
-        with open(gitignore_path, 'r+', encoding='utf-8') as f:
-            linhas = f.read().splitlines()
-            if 'config.ini' not in linhas:
-                f.write('\nconfig.ini\n.gitignore\ngit.py\n')
-    else:
-        with open(gitignore_path, 'w', encoding='utf-8') as f:
-            f.write('config.ini\n.gitignore\ngit.py\n')
+    # Adicionar os arquivos locais ao .gitignore, se ainda não estiverem lá
+    pasta = os.path.dirname(os.path.abspath(caminho_config))
+    gitignore_path = os.path.join(pasta, '.gitignore')
+    try:
+        info = os.stat(gitignore_path)
+        existentes = _entradas_gitignore(gitignore_path, info.st_mtime_ns, info.st_size)
+    except FileNotFoundError:
+        existentes = frozenset()
+    faltando = [nome for nome in ARQUIVOS_LOCAIS if nome not in existentes]
+    if faltando:
+        with open(gitignore_path, 'ab+') as f:
+            # Só quebra a linha se o arquivo existente não terminar com '\n'
+            quebra = False
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                quebra = f.read(1) != b"\n"
+            f.write((("\n" if quebra else "") + "".join(f"{nome}\n" for nome in faltando)).encode("utf-8"))
+
+    # Verifica se o repositório Git está inicializado e se os arquivos locais estão no índice
+    if os.path.isdir(os.path.join(pasta, ".git")):
+        # ':<arquivo>' resolve só essas entradas do índice (uma consulta para os três),
+        # sem listar todos os arquivos rastreados
+        resultados = _backend.consultar_objetos(pasta, [f":{nome}" for nome in ARQUIVOS_LOCAIS])
+        rastreados = [nome for nome, resultado in zip(ARQUIVOS_LOCAIS, resultados) if resultado is not None]
+        if "config.ini" in rastreados:
+            # Remove os arquivos locais do índice do Git com um único 'git rm'
+            executar_git(["rm", "-r", "--cached", "--quiet", "--ignore-unmatch", "--", *rastreados],
+                         cwd=pasta, check=True)
 
-    # Verifica se o repositório Git está inicializado e se há arquivos rastreados teste
-    if os.path.isdir(".git"):
-        result = subprocess.run(["git", "ls-files"], capture_output=True, text=True)
-        if result.stdout.strip():
-            # Verifica se config.ini está sendo rastreado pelo Git
-            if "config.ini" in result.stdout:
-                # Remove config.ini do índice do Git
-                subprocess.run(["git", "rm", "-r", "--cached", "git.py"], check=True)
-                subprocess.run(["git", "rm", "-r", "--cached", "config.ini"], check=True)
-                subprocess.run(["git", "rm", "-r", "--cached", ".gitignore"], check=True)
+# ===========================================
+# Saída estruturada (status/log/diff)
+# ===========================================
+def _ler_campos_nul(stream, tamanho_bloco=65536):
+    """Lê 'stream' em blocos e gera os campos separados por NUL, sem carregar tudo em memória."""
+    resto = b""
+    while True:
+        bloco = stream.read1(tamanho_bloco)
+        if not bloco:
+            break
+        _registrar_bytes(len(bloco))
+        partes = (resto + bloco).split(b"\0")
+        resto = partes.pop()
+        for parte in partes:
+            yield parte.decode("utf-8", "surrogateescape")
+    if resto:
+        yield resto.decode("utf-8", "surrogateescape")
+
+def _iterar_saida_git(args, caminho_projeto):
+    """
+    Executa 'git <args>' e gera os campos (separados por NUL) da saída conforme chegam.
+    Se o consumidor parar antes do fim, o processo git é encerrado.
+    """
+    processo = abrir_git(args, cwd=caminho_projeto, stdout=subprocess.PIPE)
+    concluido = False
+    try:
+        yield from _ler_campos_nul(processo.stdout)
+        concluido = True
+    finally:
+        if processo.poll() is None and not concluido:
+            processo.kill()
+        processo.stdout.close()
+        retorno = processo.wait()
+    if retorno != 0:
+        raise subprocess.CalledProcessError(retorno, ["git", *args])
+
+def iterar_status(caminho_projeto, branch=False, ignorados=False, nao_rastreados=None):
+    """
+    Gera as entradas de 'git status --porcelain=v2 -z' como dicionários, uma por vez.
+    Tipos: 'cabecalho' (com branch=True), 'alterado', 'renomeado', 'conflito',
+    'nao_rastreado' e 'ignorado' (com ignorados=True).
+    'nao_rastreados' repassa --untracked-files (ex.: 'all' lista cada arquivo das pastas novas).
+    """
+    return interpretar_status(_iterar_saida_git(_args_status(branch, ignorados, nao_rastreados), caminho_projeto))
+
+def _args_status(branch=False, ignorados=False, nao_rastreados=None):
+    args = ["status", "--porcelain=v2", "-z"]
+    if branch:
+        args.append("--branch")
+    if ignorados:
+        args.append("--ignored")
+    if nao_rastreados:
+        args.append(f"--untracked-files={nao_rastreados}")
+    return args
+
+def interpretar_status(campos):
+    """Converte os campos (separados por NUL) do 'git status --porcelain=v2 -z' em dicionários."""
+    campos = iter(campos)
+    for campo in campos:
+        tipo = campo[:1]
+        if tipo == "#":
+            chave, _, valor = campo[2:].partition(" ")
+            yield {"tipo": "cabecalho", "chave": chave, "valor": valor}
+        elif tipo == "1":
+            _, xy, sub, m_head, m_index, m_worktree, h_head, h_index, caminho = campo.split(" ", 8)
+            yield {"tipo": "alterado", "xy": xy, "caminho": caminho, "submodulo": sub,
+                   "modos": [m_head, m_index, m_worktree], "hashes": [h_head, h_index]}
+        elif tipo == "2":
+            _, xy, sub, m_head, m_index, m_worktree, h_head, h_index, score, caminho = campo.split(" ", 9)
+            # Em renomeações/cópias o caminho de origem vem no campo seguinte
+            origem = next(campos)
+            yield {"tipo": "renomeado", "xy": xy, "caminho": caminho, "origem": origem,
+                   "score": score, "submodulo": sub,
+                   "modos": [m_head, m_index, m_worktree], "hashes": [h_head, h_index]}
+        elif tipo == "u":
+            _, xy, sub, m1, m2, m3, m_worktree, h1, h2, h3, caminho = campo.split(" ", 10)
+            yield {"tipo": "conflito", "xy": xy, "caminho": caminho, "submodulo": sub,
+                   "modos": [m1, m2, m3, m_worktree], "hashes": [h1, h2, h3]}
+        elif tipo == "?":
+            yield {"tipo": "nao_rastreado", "caminho": campo[2:]}
+        elif tipo == "!":
+            yield {"tipo": "ignorado", "caminho": campo[2:]}
+
+# Campos do log separados por \x1f (unit separator); commits separados por NUL (-z)
+_FORMATO_LOG = "%H%x1f%P%x1f%an%x1f%ae%x1f%aI%x1f%s"
+
+def iterar_log(caminho_projeto, limit=None, intervalo=None):
+    """
+    Gera os commits de 'git log -z' como dicionários, um por vez (memória constante).
+    'intervalo' é uma faixa de revisões (ex.: 'HEAD..origin/main'); padrão: HEAD.
+    """
+    for campo in _iterar_saida_git(_args_log(limit, intervalo), caminho_projeto):
+        yield interpretar_commit(campo)
+
+def _args_log(limit=None, intervalo=None):
+    args = ["log", "-z", f"--format={_FORMATO_LOG}"]
+    if limit:
+        args += ["-n", str(limit)]
+    if intervalo:
+        args.append(intervalo)
+    return args
+
+def interpretar_commit(campo):
+    """Converte um registro do 'git log -z --format=_FORMATO_LOG' em dicionário."""
+    sha, pais, autor, email, data, assunto = campo.lstrip("\n").split("\x1f", 5)
+    return {"sha": sha, "pais": pais.split(), "autor": autor, "email": email,
+            "data": data, "assunto": assunto}
+
+def iterar_diff(caminho_projeto):
+    """Gera as alterações de 'git diff --numstat -z' (linhas adicionadas/removidas por arquivo)."""
+    return interpretar_diff(_iterar_saida_git(["diff", "--numstat", "-z"], caminho_projeto))
+
+def interpretar_diff(campos):
+    """Converte os campos do 'git diff --numstat -z' em dicionários."""
+    campos = iter(campos)
+    for campo in campos:
+        adicionadas, removidas, caminho = campo.split("\t", 2)
+        registro = {
+            # Arquivos binários aparecem como '-'
+            "adicionadas": None if adicionadas == "-" else int(adicionadas),
+            "removidas": None if removidas == "-" else int(removidas),
+        }
+        if caminho:
+            registro["caminho"] = caminho
+        else:
+            # Renomeação: origem e destino vêm nos dois campos seguintes
+            registro["origem"] = next(campos)
+            registro["caminho"] = next(campos)
+        yield registro
+
+def ha_alteracoes(caminho_projeto):
+    """Retorna True se houver qualquer alteração (para no primeiro registro encontrado)."""
+    return next(iterar_status(caminho_projeto), None) is not None
+
+def emitir_registros(registros, formato, saida=None):
+    """
+    Escreve os registros em 'saida' (padrão: stdout) à medida que são gerados.
+    - formato 'json': um array JSON.
+    - formato 'ndjson': um objeto JSON por linha.
+    """
+    saida = saida or sys.stdout
+    if formato == "ndjson":
+        for registro in registros:
+            saida.write(json.dumps(registro) + "\n")
+        return
+    saida.write("[")
+    for i, registro in enumerate(registros):
+        saida.write((",\n" if i else "\n") + json.dumps(registro))
+    saida.write("\n]\n")
 
 # ===========================================
 # Funções Git
 # ===========================================
+@medir_etapa
 def git_init(caminho_projeto):
     """Inicializa repositório Git no caminho especificado (git init)."""
-    subprocess.run(["git", "init"], cwd=caminho_projeto, check=True)
+    executar_git(["init"], cwd=caminho_projeto, check=True)
     print(f"[OK] Repositório Git inicializado em {caminho_projeto}")
 
+@medir_etapa
 def git_connect(caminho_projeto, url_remota, branch="main"):
     if not os.path.isdir(os.path.join(caminho_projeto, ".git")):
         git_init(caminho_projeto)
 
-    subprocess.run(["git", "branch", "-M", branch], cwd=caminho_projeto, check=True)
+    executar_git(["branch", "-M", branch], cwd=caminho_projeto, check=True)
 
     # Tenta adicionar origin
-    result = subprocess.run(["git", "remote", "add", "origin", url_remota],
-                            cwd=caminho_projeto,
-                            text=True,
-                            capture_output=True)
+    result = executar_git(["remote", "add", "origin", url_remota],
+                          cwd=caminho_projeto,
+                          text=True,
+                          capture_output=True)
 
     if result.returncode != 0:
         # Verifica se o erro foi "remote origin already exists"
@@ -74,78 +715,2222 @@ def git_connect(caminho_projeto, url_remota, branch="main"):
     else:
         print(f"[OK] Remote origin adicionado: {url_remota} (branch: {branch})")
 
-def git_add(caminho_projeto):
-    """Adiciona todos os arquivos ao stage (equivalente a 'git add .')."""
-    subprocess.run(["git", "add", "."], cwd=caminho_projeto, check=True)
+@medir_etapa
+def git_add(caminho_projeto, rapido=False):
+    """
+    Adiciona todos os arquivos ao stage (equivalente a 'git add .').
+    Com 'rapido=True' usa o snapshot da última sincronização e adiciona
+    apenas os caminhos alterados (ver git_add_incremental).
+    """
+    if rapido:
+        return git_add_incremental(caminho_projeto)
+    git_add_tudo(caminho_projeto)
     print("[OK] Arquivos adicionados ao stage.")
 
-def git_commit(caminho_projeto, mensagem="Update"):
-    # Verifica se há algo para commitar
-    status_result = subprocess.run(
-        ["git", "status", "--porcelain"],
-        cwd=caminho_projeto, capture_output=True, text=True
-    )
-    if not status_result.stdout.strip():
+@medir_etapa
+def git_commit(caminho_projeto, mensagem="Update", rapido=False):
+    if not _commitar(caminho_projeto, mensagem, rapido):
         print("[OK] Nada para commitar.")
-        return
-
-    subprocess.run(["git", "commit", "-m", mensagem], cwd=caminho_projeto, check=True)
+        return False
     print(f"[OK] Commit realizado: {mensagem}")
+    return True
+
+def _commitar(caminho_projeto, mensagem, rapido=False):
+    """Faz o commit se houver algo para commitar; retorna True se ele foi criado (também usado pela API assíncrona)."""
+    # No modo rápido o git_add incremental já deixou o stage igual à árvore de
+    # trabalho: basta comparar índice e HEAD. O mesmo vale com a política de
+    # arquivos grandes, que deixa os recusados fora do stage.
+    if rapido or _politica_arquivos_grandes_ativa():
+        tem_alteracoes = executar_git(["diff", "--cached", "--quiet"], cwd=caminho_projeto).returncode != 0
+    else:
+        tem_alteracoes = ha_alteracoes(caminho_projeto)
+    if not tem_alteracoes:
+        return False
+    executar_git(["commit", "-m", mensagem], cwd=caminho_projeto, check=True)
+    return True
 
+@medir_etapa
 def git_push(caminho_projeto, branch="master"):
     """Faz push (git push -u origin <branch>)."""
-    subprocess.run(["git", "push", "-u", "origin", branch], cwd=caminho_projeto, check=True)
+    executar_git(["push", "-u", "origin", branch], cwd=caminho_projeto, check=True)
     print(f"[OK] Push realizado para a branch '{branch}'")
 
-def git_status(caminho_projeto):
-    """Exibe status do repositório (equivalente a 'git status')."""
-    subprocess.run(["git", "status"], cwd=caminho_projeto, check=True)
+@medir_etapa
+def git_status(caminho_projeto, formato=None):
+    """
+    Exibe status do repositório (equivalente a 'git status') e quantos commits a
+    branch está à frente/atrás do remoto em cache (prefetch), sem acessar a rede.
+    Com 'formato' ('json' ou 'ndjson') emite as entradas estruturadas, com o
+    estado do remoto como último registro ({"tipo": "remoto", ...}).
+    """
+    if formato:
+        def registros():
+            yield from iterar_status(caminho_projeto, branch=True)
+            estado = estado_remoto(caminho_projeto)
+            if estado is not None:
+                yield estado
+        emitir_registros(registros(), formato)
+        return
+    executar_git(["status"], cwd=caminho_projeto, check=True)
+    imprimir_estado_remoto(estado_remoto(caminho_projeto))
 
+@medir_etapa
 def git_checkout(caminho_projeto, branch):
     """
     Faz checkout em uma determinada branch (git checkout <branch>).
     Se a branch não existir, cria com 'git checkout -b <branch>'.
     """
-    resultado = subprocess.run(["git", "checkout", branch], cwd=caminho_projeto)
+    resultado = executar_git(["checkout", branch], cwd=caminho_projeto)
     if resultado.returncode != 0:
-        subprocess.run(["git", "checkout", "-b", branch], cwd=caminho_projeto, check=True)
+        executar_git(["checkout", "-b", branch], cwd=caminho_projeto, check=True)
         print(f"[OK] Branch '{branch}' criada e selecionada.")
 
-def git_pull(caminho_projeto, branch="master"):
-    """Faz pull (git pull origin <branch>)."""
+@medir_etapa
+def git_pull(caminho_projeto, branch="master", sair_em_erro=True, forcar_espelho=False):
+    """
+    Faz pull (git pull origin <branch>).
+    Com 'sair_em_erro=False' a exceção é repassada ao chamador em vez de
+    encerrar o processo (usado no modo workspace).
+    'forcar_espelho' atualiza o espelho mesmo dentro da validade (serviços de longa duração).
+    """
     try:
-        subprocess.run(["git", "pull", "origin", branch, "--allow-unrelated-histories"], cwd=caminho_projeto, check=True)
+        with espelho_para(url_remota(caminho_projeto) if CACHE_ESPELHOS["ativo"] else None,
+                          forcar_espelho) as espelho:
+            executar_git(_args_pull(espelho, branch), cwd=caminho_projeto, check=True)
         print(f"[OK] Pull realizado da branch '{branch}'")
     except subprocess.CalledProcessError as e:
         print(f"[ERRO] Falha ao fazer pull: {e}")
         print("Por favor, resolva os conflitos de mesclagem manualmente e tente novamente.")
+        if not sair_em_erro:
+            raise
         exit(1)
 
-def git_log(caminho_projeto, limit=10):
-    """Mostra últimos commits (git log --oneline -n <limit>)."""
-    subprocess.run(["git", "log", "--oneline", "-n", str(limit)], cwd=caminho_projeto, check=True)
+def _args_pull(espelho, branch):
+    """Argumentos do 'git pull' da branch: do origin ou do espelho local (também usado pela API assíncrona)."""
+    if espelho:
+        # Busca no espelho local, atualizando origin/<branch> como faria o pull do origin
+        return ["pull", espelho, f"+refs/heads/{branch}:refs/remotes/origin/{branch}", "--allow-unrelated-histories"]
+    return ["pull", "origin", branch, "--allow-unrelated-histories"]
 
-def git_diff(caminho_projeto):
-    """Mostra diferenças (git diff)."""
-    subprocess.run(["git", "diff"], cwd=caminho_projeto, check=True)
+@medir_etapa
+def git_log(caminho_projeto, limit=10, formato=None, remoto=False):
+    """
+    Mostra últimos commits (git log --oneline -n <limit>).
+    Com 'formato' ('json' ou 'ndjson') emite os commits estruturados; limit=0 mostra todos.
+    Com 'remoto=True' mostra os commits do remoto em cache (prefetch) que a
+    branch atual ainda não tem, sem acessar a rede.
+    """
+    intervalo = None
+    if remoto:
+        branch = _branch_atual(caminho_projeto)
+        ref = branch and remoto_em_cache(caminho_projeto, branch)[0]
+        if not ref:
+            print("[AVISO] Nenhum estado do remoto em cache; rode 'prefetch' (ou pull) antes.")
+            return
+        intervalo = f"HEAD..{ref}"
+    if formato:
+        emitir_registros(iterar_log(caminho_projeto, limit, intervalo), formato)
+        return
+    executar_git(["log", "--oneline", "-n", str(limit), *([intervalo] if intervalo else [])],
+                 cwd=caminho_projeto, check=True)
+
+@medir_etapa
+def git_diff(caminho_projeto, formato=None):
+    """
+    Mostra diferenças (git diff).
+    Com 'formato' ('json' ou 'ndjson') emite o resumo por arquivo (git diff --numstat).
+    """
+    if formato:
+        emitir_registros(iterar_diff(caminho_projeto), formato)
+        return
+    executar_git(["diff"], cwd=caminho_projeto, check=True)
 
-def git_clone(url_remota, caminho_destino="."):
+@medir_etapa
+def git_clone(url_remota, caminho_destino=".", profundidade=None, filtro=None, esparso=None,
+              referencia=None, dissociar=False, branch=None, silencioso=False):
     """
     Clona um repositório (git clone <url> <destino>).
     Se 'destino' não for especificado, clona na pasta atual.
+    Opções para reduzir o download:
+    - 'profundidade': clone raso (--depth N), só os últimos N commits;
+    - 'filtro': clone parcial (--filter=blob:none ou tree:0); o que faltar é
+      baixado sob demanda pelo git;
+    - 'esparso': lista de padrões do sparse-checkout; só essas pastas vão para a
+      árvore de trabalho (com filtro, só os blobs delas são baixados);
+    - 'referencia': repositório local já clonado cujos objetos são reaproveitados
+      (--reference-if-able); com 'dissociar' os objetos são copiados e o clone
+      deixa de depender dele. Com o cache de espelhos ativo, o espelho da URL é
+      usado como referência (com --dissociate).
+    """
+    with espelho_para(url_remota if CACHE_ESPELHOS["ativo"] and not referencia else None) as espelho:
+        if espelho:
+            referencia, dissociar = espelho, True
+        _clonar(url_remota, caminho_destino, profundidade, filtro, esparso, referencia, dissociar,
+                branch, silencioso)
+    if not silencioso:
+        print(f"[OK] Repositório clonado de {url_remota} para {caminho_destino}")
+
+def _clonar(url_remota, caminho_destino, profundidade, filtro, esparso, referencia, dissociar, branch, silencioso):
+    args = ["clone"]
+    if profundidade:
+        args += ["--depth", str(profundidade)]
+    if filtro:
+        args.append(f"--filter={filtro}")
+    if referencia:
+        args += ["--reference-if-able", referencia]
+        if dissociar:
+            args.append("--dissociate")
+    if branch:
+        args += ["--branch", branch]
+    if esparso:
+        # Sem checkout inicial: o checkout é feito uma única vez, já com os padrões
+        args.append("--no-checkout")
+    # Em modo silencioso (clones em paralelo) o stderr é capturado para o resumo
+    saida = {"stderr": subprocess.PIPE, "text": True} if silencioso else {}
+    if silencioso:
+        args.append("--quiet")
+    executar_git(args + ["--", url_remota, caminho_destino], check=True, **saida)
+    if esparso:
+        _aplicar_sparse_checkout(caminho_destino, esparso, saida)
+
+def _aplicar_sparse_checkout(caminho_projeto, padroes, saida=None):
+    """Define os padrões do sparse-checkout e faz o checkout (modo cone se forem só pastas)."""
+    cone = not any(c in padrao for padrao in padroes for c in "*?[!") and \
+        not any(padrao.startswith("/") for padrao in padroes)
+    executar_git(["sparse-checkout", "set", "--cone" if cone else "--no-cone", *padroes],
+                 cwd=caminho_projeto, check=True, **(saida or {}))
+    executar_git(["checkout", "--quiet"], cwd=caminho_projeto, check=True, **(saida or {}))
+
+# ===========================================
+# Operações remotas em lote (várias branches, uma conexão)
+# ===========================================
+def _eh_glob(nome):
+    return any(c in nome for c in "*?[")
+
+def _listar_refs(caminho_projeto, padroes):
+    """Lista (nome curto) as refs que casam com os padrões (git for-each-ref aceita globs)."""
+    result = executar_git(["for-each-ref", "--format=%(refname)", *padroes], cwd=caminho_projeto,
+                          capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+def expandir_branches_locais(caminho_projeto, branches):
+    """Expande globs (ex.: 'feature/*') contra as branches locais; nomes sem glob ficam como estão."""
+    globs = [f"refs/heads/{b}" for b in branches if _eh_glob(b)]
+    expandidas = [b for b in branches if not _eh_glob(b)]
+    if globs:
+        expandidas += [ref[len("refs/heads/"):] for ref in _listar_refs(caminho_projeto, globs)]
+    return list(dict.fromkeys(expandidas))
+
+@medir_etapa
+def git_push_varias(caminho_projeto, branches):
+    """
+    Envia várias branches (ou globs) em um único 'git push', com uma só conexão:
+    git push -u origin <b1> <b2> ...
+    """
+    nomes = expandir_branches_locais(caminho_projeto, branches)
+    if not nomes:
+        print("[AVISO] Nenhuma branch local corresponde aos padrões informados.")
+        return []
+    executar_git(["push", "-u", "origin", *nomes], cwd=caminho_projeto, check=True)
+    print(f"[OK] Push realizado para {len(nomes)} branch(es): {', '.join(nomes)}")
+    return nomes
+
+def _branch_atual(caminho_projeto):
+    return _backend.branch_atual(caminho_projeto)
+
+@medir_etapa
+def git_pull_varias(caminho_projeto, branches, sair_em_erro=True):
+    """
+    Recebe várias branches (ou globs com '*') com um único 'git fetch' e várias refspecs.
+    Depois, sem acessar a rede:
+    - a branch atual é mesclada com origin/<branch> (como no git_pull);
+    - as demais são atualizadas por fast-forward a partir de origin/<branch>
+      (ou criadas, se não existirem localmente) com um 'git fetch .' local.
+    """
+    refspecs = [f"+refs/heads/{b}:refs/remotes/origin/{b}" for b in branches]
+    with espelho_para(url_remota(caminho_projeto) if CACHE_ESPELHOS["ativo"] else None) as espelho:
+        executar_git(["fetch", espelho or "origin", *refspecs], cwd=caminho_projeto, check=True)
+
+    remotas = [ref[len("refs/remotes/origin/"):]
+               for ref in _listar_refs(caminho_projeto, [f"refs/remotes/origin/{b}" for b in branches])]
+    atual = _branch_atual(caminho_projeto)
+    outras = [b for b in remotas if b != atual]
+    if outras:
+        result = executar_git(["fetch", ".", *[f"refs/remotes/origin/{b}:refs/heads/{b}" for b in outras]],
+                              cwd=caminho_projeto, capture_output=True, text=True)
+        if result.returncode != 0:
+            print("[AVISO] Algumas branches não puderam ser atualizadas por fast-forward:")
+            print(result.stderr.strip())
+    if atual in remotas:
+        try:
+            executar_git(["merge", f"refs/remotes/origin/{atual}", "--allow-unrelated-histories", "--no-edit"],
+                         cwd=caminho_projeto, check=True)
+        except subprocess.CalledProcessError as e:
+            print(f"[ERRO] Falha ao mesclar a branch '{atual}': {e}")
+            print("Por favor, resolva os conflitos de mesclagem manualmente e tente novamente.")
+            if not sair_em_erro:
+                raise
+            exit(1)
+    print(f"[OK] Pull realizado de {len(remotas)} branch(es) com um único fetch: {', '.join(remotas)}")
+    return remotas
+
+def configurar_reuso_ssh(persistir=60):
+    """
+    Reaproveita a conexão SSH entre os comandos git desta sessão (ControlMaster do OpenSSH):
+    a primeira conexão fica aberta por 'persistir' segundos e as seguintes a reutilizam.
+    Não altera nada se GIT_SSH_COMMAND já estiver definido ou no Windows (sem ControlMaster).
+    """
+    if os.environ.get("GIT_SSH_COMMAND") or os.name == "nt":
+        return False
+    pasta = os.path.join(tempfile.gettempdir(), f"git_automate_ssh_{os.getuid()}")
+    os.makedirs(pasta, mode=0o700, exist_ok=True)
+    os.environ["GIT_SSH_COMMAND"] = (
+        f"ssh -o ControlMaster=auto -o ControlPath={os.path.join(pasta, '%C')} "
+        f"-o ControlPersist={int(persistir)}"
+    )
+    return True
+
+# ===========================================
+# Cache de espelhos (mirror local por URL remota)
+# ===========================================
+# Um 'git clone --mirror' por URL, compartilhado entre repositórios e execuções:
+# clones usam o espelho como --reference (com --dissociate) e pulls buscam nele.
+CACHE_ESPELHOS = {"ativo": False, "pasta": None, "tamanho_maximo": 0, "validade": 10.0}
+_espelhos_atualizados = {}  # chave -> time.monotonic() da última atualização neste processo
+_travas_espelhos = {}
+_trava_espelhos = threading.Lock()
+
+def pasta_cache_padrao():
+    """Pasta padrão do cache de espelhos (~/.cache/git_automate/espelhos ou %LOCALAPPDATA%)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", base)
+    return os.path.join(base, "git_automate", "espelhos")
+
+def configurar_cache_espelhos(pasta=None, tamanho_maximo_mb=2048, validade=10.0):
+    """
+    Ativa o cache de espelhos; 'tamanho_maximo_mb' <= 0 desativa a limpeza automática.
+    Um espelho atualizado há menos de 'validade' segundos é reaproveitado sem novo fetch.
+    """
+    pasta = os.path.abspath(os.path.expanduser(pasta or pasta_cache_padrao()))
+    os.makedirs(pasta, exist_ok=True)
+    CACHE_ESPELHOS.update(ativo=True, pasta=pasta, tamanho_maximo=int(tamanho_maximo_mb * 1024 * 1024),
+                          validade=validade)
+
+def _chave_espelho(url):
+    normalizada = url.strip().rstrip("/")
+    if normalizada.endswith(".git"):
+        normalizada = normalizada[:-4]
+    return hashlib.sha256(normalizada.encode("utf-8")).hexdigest()[:24]
+
+@contextlib.contextmanager
+def trava_arquivo(caminho, compartilhada=False, bloquear=True, espera_maxima=600):
+    """
+    Trava entre processos (e threads) baseada em arquivo.
+    - Com fcntl (Linux/macOS): flock compartilhada (leitura) ou exclusiva (escrita),
+      liberada automaticamente se o processo morrer.
+    - Sem fcntl (Windows): arquivo '<caminho>.excl' criado com O_CREAT|O_EXCL, sempre
+      exclusiva; uma trava mais antiga que 'espera_maxima' segundos é tida como abandonada.
+    Com bloquear=False gera BlockingIOError se a trava estiver ocupada.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    if fcntl is not None:
+        with open(caminho, "a+b") as f:
+            modo = fcntl.LOCK_SH if compartilhada else fcntl.LOCK_EX
+            fcntl.flock(f, modo if bloquear else modo | fcntl.LOCK_NB)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return
+
+    exclusivo = caminho + ".excl"
+    limite = time.monotonic() + espera_maxima
+    while True:
+        try:
+            os.close(os.open(exclusivo, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(exclusivo) > espera_maxima:
+                    os.remove(exclusivo)
+                    continue
+            except OSError:
+                continue
+            if not bloquear or time.monotonic() > limite:
+                raise BlockingIOError(f"Trava ocupada: {caminho}")
+            esperar(0.1)
+    try:
+        yield
+    finally:
+        os.remove(exclusivo)
+
+def _meta_espelho(espelho):
+    return os.path.join(espelho, "git_automate.json")
+
+def atualizar_espelho(url, forcar=False):
+    """
+    Cria (git clone --mirror) ou atualiza (git fetch --prune) o espelho da URL e
+    retorna o caminho dele. Sem 'forcar', um espelho atualizado por este processo
+    há menos de CACHE_ESPELHOS["validade"] segundos é reaproveitado; com 'forcar',
+    só é reaproveitado se outra thread o atualizou enquanto esta esperava a trava.
+    A criação usa uma pasta temporária renomeada no final: um clone interrompido
+    nunca deixa um espelho pela metade.
+    """
+    pasta = CACHE_ESPELHOS["pasta"]
+    chave = _chave_espelho(url)
+    espelho = os.path.join(pasta, chave + ".git")
+    pedido = time.monotonic()
+    with _trava_espelhos:
+        trava_local = _travas_espelhos.setdefault(chave, threading.Lock())
+    with trava_local:
+        ultima = _espelhos_atualizados.get(chave)
+        if ultima is not None and os.path.isdir(espelho) and \
+                (ultima >= pedido or (not forcar and time.monotonic() - ultima < CACHE_ESPELHOS["validade"])):
+            return espelho
+        with trava_arquivo(espelho + ".lock"):
+            if os.path.isdir(espelho):
+                executar_git(["fetch", "--prune", "--quiet", "origin"], cwd=espelho, check=True)
+            else:
+                temporario = tempfile.mkdtemp(prefix=f".{chave}.", dir=pasta)
+                try:
+                    executar_git(["clone", "--mirror", "--quiet", "--", url, temporario], check=True)
+                    os.replace(temporario, espelho)
+                except BaseException:
+                    shutil.rmtree(temporario, ignore_errors=True)
+                    raise
+            tamanho = sum(os.lstat(os.path.join(raiz, nome)).st_size
+                          for raiz, _, nomes in os.walk(espelho) for nome in nomes)
+            with open(_meta_espelho(espelho), "w", encoding="utf-8") as f:
+                json.dump({"url": url, "tamanho": tamanho}, f)
+        _espelhos_atualizados[chave] = time.monotonic()
+    limpar_cache_espelhos(manter={espelho})
+    return espelho
+
+@contextlib.contextmanager
+def espelho_para(url, forcar=False):
+    """
+    Atualiza o espelho da URL ('forcar' ignora a validade) e o mantém travado para
+    leitura durante o bloco 'with' (a limpeza do cache não remove espelhos em uso).
+    Fornece o caminho do espelho, ou None se o cache estiver desativado ou
+    indisponível (nesse caso o chamador usa o remoto diretamente).
     """
-    subprocess.run(["git", "clone", url_remota, caminho_destino], check=True)
-    print(f"[OK] Repositório clonado de {url_remota} para {caminho_destino}")
+    if not CACHE_ESPELHOS["ativo"] or not url:
+        yield None
+        return
+    try:
+        espelho = atualizar_espelho(url, forcar)
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"[AVISO] Cache de espelhos indisponível para {url} ({e}); usando o remoto diretamente.")
+        yield None
+        return
+    with trava_arquivo(espelho + ".lock", compartilhada=True):
+        if not os.path.isdir(espelho):
+            yield None  # Removido por outro processo entre a atualização e a trava
+            return
+        try:
+            agora = time.time()  # Explícito: utime(None) usa o relógio grosso do kernel
+            os.utime(_meta_espelho(espelho), (agora, agora))  # Último uso (ordem do LRU)
+        except OSError:
+            pass
+        yield espelho
+
+def listar_espelhos():
+    """Lista os espelhos do cache: dicionários com caminho, url, tamanho (bytes) e uso (timestamp)."""
+    pasta = CACHE_ESPELHOS["pasta"] or pasta_cache_padrao()
+    espelhos = []
+    try:
+        nomes = os.listdir(pasta)
+    except FileNotFoundError:
+        return espelhos
+    for nome in nomes:
+        espelho = os.path.join(pasta, nome)
+        if nome.startswith(".") or not nome.endswith(".git") or not os.path.isdir(espelho):
+            continue
+        try:
+            with open(_meta_espelho(espelho), encoding="utf-8") as f:
+                meta = json.load(f)
+            uso = os.path.getmtime(_meta_espelho(espelho))
+        except (OSError, ValueError):
+            meta, uso = {}, os.path.getmtime(espelho)
+        espelhos.append({"caminho": espelho, "url": meta.get("url", "?"),
+                         "tamanho": meta.get("tamanho", 0), "uso": uso})
+    return espelhos
+
+def limpar_cache_espelhos(tamanho_maximo=None, manter=()):
+    """
+    Remove os espelhos usados há mais tempo (LRU) até o total caber em
+    'tamanho_maximo' bytes (padrão: o configurado). Espelhos em uso por outro
+    processo (travados) e os de 'manter' são preservados. Retorna os removidos.
+    """
+    if tamanho_maximo is None:
+        tamanho_maximo = CACHE_ESPELHOS["tamanho_maximo"]
+        if tamanho_maximo <= 0:
+            return []
+    espelhos = sorted(listar_espelhos(), key=lambda e: e["uso"])
+    total = sum(e["tamanho"] for e in espelhos)
+    removidos = []
+    for espelho in espelhos:
+        if total <= tamanho_maximo:
+            break
+        if espelho["caminho"] in manter:
+            continue
+        try:
+            with trava_arquivo(espelho["caminho"] + ".lock", bloquear=False):
+                shutil.rmtree(espelho["caminho"])
+        except BlockingIOError:
+            continue
+        total -= espelho["tamanho"]
+        removidos.append(espelho)
+    return removidos
+
+def imprimir_espelhos(espelhos):
+    linhas = [(e["url"], f"{e['tamanho'] / 1024 / 1024:.1f}",
+               time.strftime("%Y-%m-%d %H:%M", time.localtime(e["uso"])), os.path.basename(e["caminho"]))
+              for e in sorted(espelhos, key=lambda e: e["uso"], reverse=True)]
+    imprimir_tabela(("URL", "Tamanho (MB)", "Último uso", "Pasta"), linhas)
+
+# ===========================================
+# Prefetch (estado do remoto em cache, sem rede no status/log)
+# ===========================================
+# Mesmo namespace do 'git maintenance run --task=prefetch': não mexe em origin/* nem nas branches locais
+PREFIXO_PREFETCH = "refs/prefetch/remotes/origin/"
+
+@medir_etapa
+def git_prefetch(caminho_projeto):
+    """
+    Busca todas as branches do origin em refs/prefetch/remotes/origin/* (no espelho
+    local se o cache estiver ativo). Como não altera a árvore, o índice, as branches
+    locais nem origin/*, pode rodar em segundo plano a qualquer momento.
+    O horário do último prefetch fica em .git/git_automate/prefetch.json.
+    Com o cache ativo, o espelho é sempre atualizado: o prefetch existe para trazer o estado novo.
+    """
+    arquivo = os.path.join(dir_estado(caminho_projeto), "prefetch.json")
+    if not os.path.exists(arquivo):
+        # Primeiro prefetch: as refs de prefetch não devem poluir as decorações do 'git log'.
+        # --replace-all com o valor exato não duplica a entrada (ex.: já criada pelo 'git maintenance')
+        executar_git(["config", "--replace-all", "log.excludeDecoration", "refs/prefetch/", "^refs/prefetch/$"],
+                     cwd=caminho_projeto)
+    with espelho_para(url_remota(caminho_projeto) if CACHE_ESPELHOS["ativo"] else None, forcar=True) as espelho:
+        executar_git(["fetch", "--quiet", "--prune", "--no-tags", "--no-write-fetch-head", espelho or "origin",
+                      f"+refs/heads/*:{PREFIXO_PREFETCH}*"], cwd=caminho_projeto, check=True)
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump({"quando": time.time()}, f)
+
+def idade_prefetch(caminho_projeto):
+    """Segundos desde o último prefetch deste repositório (None se nunca rodou)."""
+    try:
+        with open(os.path.join(dir_estado(caminho_projeto), "prefetch.json"), encoding="utf-8") as f:
+            return max(0.0, time.time() - json.load(f)["quando"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def git_prefetch_varios(repositorios, max_jobs=8):
+    """Prefetch de vários repositórios em paralelo. Retorna quantos terminaram sem erro."""
+    def prefetch(caminho):
+        try:
+            git_prefetch(caminho)
+            return True
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"[AVISO] [{caminho}] Falha no prefetch: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_jobs, len(repositorios) or 1))) as executor:
+        return sum(executor.map(prefetch, repositorios))
+
+def remoto_em_cache(caminho_projeto, branch):
+    """
+    Estado mais recente conhecido de origin/<branch> sem acessar a rede: a ref de
+    prefetch ou refs/remotes/origin/<branch>, a que estiver à frente (depois de um
+    push, origin/<branch> passa o prefetch). Retorna (ref, sha) ou (None, None).
+    """
+    return _remoto_em_cache(caminho_projeto, branch)[:2]
+
+def _remoto_em_cache(caminho_projeto, branch):
+    """Como remoto_em_cache, mas também retorna o sha do HEAD (resolvido na mesma consulta)."""
+    prefetch, rastreada = PREFIXO_PREFETCH + branch, f"refs/remotes/origin/{branch}"
+    obj_prefetch, obj_rastreada, obj_head = _backend.consultar_objetos(caminho_projeto, [prefetch, rastreada, "HEAD"])
+    head = obj_head and obj_head[0]
+    if obj_prefetch is None and obj_rastreada is None:
+        return None, None, head
+    if obj_prefetch is None:
+        return rastreada, obj_rastreada[0], head
+    if obj_rastreada is not None and obj_prefetch[0] != obj_rastreada[0] and \
+            _eh_ancestral(caminho_projeto, obj_prefetch[0], obj_rastreada[0]):
+        return rastreada, obj_rastreada[0], head
+    return prefetch, obj_prefetch[0], head
+
+def estado_remoto(caminho_projeto):
+    """
+    Commits à frente/atrás da branch atual em relação ao remoto em cache (sem rede).
+    Retorna {"tipo": "remoto", "branch", "ref", "a_frente", "atras", "idade_prefetch"}
+    ou None (HEAD destacado ou nenhum estado do remoto conhecido).
+    """
+    branch = _branch_atual(caminho_projeto)
+    ref, sha, head = _remoto_em_cache(caminho_projeto, branch) if branch else (None, None, None)
+    if not ref:
+        return None
+    if head == sha:
+        # Caso comum depois de sincronizar: sem commits de diferença, dispensa o rev-list
+        a_frente, atras = 0, 0
+    else:
+        result = executar_git(["rev-list", "--left-right", "--count", f"HEAD...{ref}"], cwd=caminho_projeto,
+                              capture_output=True, text=True)
+        if result.returncode != 0:
+            return None  # Ex.: repositório sem nenhum commit
+        a_frente, atras = (int(n) for n in result.stdout.split())
+    return {"tipo": "remoto", "branch": branch, "ref": ref, "a_frente": a_frente, "atras": atras,
+            "idade_prefetch": idade_prefetch(caminho_projeto)}
+
+def _descrever_idade(segundos):
+    if segundos is None:
+        return "sem prefetch"
+    if segundos < 60:
+        return f"prefetch há {segundos:.0f} s"
+    if segundos < 3600:
+        return f"prefetch há {segundos / 60:.0f} min"
+    return f"prefetch há {segundos / 3600:.1f} h"
+
+def imprimir_estado_remoto(estado):
+    if estado is None:
+        return
+    print(f"[OK] origin/{estado['branch']} em cache ({_descrever_idade(estado['idade_prefetch'])}): "
+          f"{estado['a_frente']} commit(s) à frente, {estado['atras']} atrás.")
+
+def _prefetch_recente(caminho_projeto, validade):
+    idade = idade_prefetch(caminho_projeto)
+    return bool(validade) and idade is not None and idade <= validade
 
 # ===========================================
 # Função pushfull (add + commit + push)
 # ===========================================
-def git_pushfull(caminho_projeto, mensagem, config):
-    branch_config = config.get('git', 'branch', fallback='main')
-    git_add(caminho_projeto)
-    git_commit(caminho_projeto, mensagem)
-    git_pull(caminho_projeto, branch=branch_config)
-    git_push(caminho_projeto, branch=branch_config)
+@medir_etapa
+def git_pushfull(caminho_projeto, mensagem, config, rapido=None, sair_em_erro=True, semaforo_host=None,
+                 estrategia=None):
+    """
+    Executa add + commit + sincronização com o remoto (sincronizar_branch) e
+    retorna True se algum commit foi criado.
+    - 'rapido' (padrão: [desempenho] cache_alteracoes do config.ini) usa o cache de
+      alterações; se nada mudou e não há commits locais pendentes, não acessa a rede.
+    - 'semaforo_host' limita as etapas de rede (usado no modo workspace).
+    - 'estrategia' (padrão: [git] estrategia) decide entre rebase e merge quando
+      local e remoto avançaram.
+    """
+    branch_config = opcao(config, 'git', 'branch')
+    if rapido is None:
+        rapido = opcao(config, 'desempenho', 'cache_alteracoes')
+    git_add(caminho_projeto, rapido=rapido)
+    commitou = git_commit(caminho_projeto, mensagem, rapido=rapido)
+    if rapido and not commitou and not _commits_pendentes(caminho_projeto, branch_config):
+        print("[OK] Nada a fazer: nenhum arquivo alterado e nenhum commit pendente.")
+        return False
+    _sincronizar_pushfull(caminho_projeto, config, sair_em_erro, semaforo_host, estrategia)
+    return commitou
+
+def _sincronizar_pushfull(caminho_projeto, config, sair_em_erro=True, semaforo_host=None, estrategia=None):
+    """Etapa de rede do pushfull (sincronizar_branch) com as mensagens e o tratamento de erro dele."""
+    branch_config = opcao(config, 'git', 'branch')
+    # Apenas as etapas de rede respeitam o limite por host
+    with semaforo_host or threading.Lock():
+        try:
+            passos = sincronizar_branch(caminho_projeto, branch_config, estrategia or opcao(config, 'git', 'estrategia'),
+                                        opcao(config, 'git', 'tentativas_push'),
+                                        opcao(config, 'prefetch', 'validade'))
+        except (subprocess.CalledProcessError, RuntimeError) as e:
+            print(f"[ERRO] Falha ao sincronizar a branch '{branch_config}': {e}")
+            imprimir_saida_erro(e)
+            if _tem_conflitos(caminho_projeto):
+                print("Por favor, resolva os conflitos de mesclagem manualmente e tente novamente.")
+            if not sair_em_erro:
+                raise
+            exit(1)
+    print(f"[OK] Branch '{branch_config}' sincronizada ({' -> '.join(passos) or 'nada a fazer'}).")
+    if "push" in passos:
+        registrar_push(caminho_projeto, opcao(config, 'manutencao', 'a_cada_pushes'),
+                       opcao(config, 'manutencao', 'expirar_prune'))
+
+def _sha(caminho_projeto, nome):
+    resultado = _backend.consultar_objeto(caminho_projeto, nome)
+    return resultado[0] if resultado else None
+
+def _eh_ancestral(caminho_projeto, ancestral, descendente):
+    """True se 'ancestral' for ancestral de (ou igual a) 'descendente'."""
+    result = executar_git(["merge-base", "--is-ancestor", ancestral, descendente], cwd=caminho_projeto)
+    return result.returncode == 0
+
+@medir_etapa
+def git_fetch_branch(caminho_projeto, branch, forcar_espelho=False):
+    """
+    Busca só a branch (atualizando origin/<branch>), no espelho local se o cache estiver ativo.
+    'forcar_espelho' atualiza o espelho antes (ex.: o push foi recusado, o remoto já avançou).
+    """
+    with espelho_para(url_remota(caminho_projeto) if CACHE_ESPELHOS["ativo"] else None,
+                      forcar_espelho) as espelho:
+        executar_git(["fetch", "--quiet", espelho or "origin", f"+refs/heads/{branch}:refs/remotes/origin/{branch}"],
+                     cwd=caminho_projeto, check=True)
+
+@medir_etapa
+def git_push_tentativa(caminho_projeto, branch):
+    """
+    Tenta o push da branch (git push --porcelain). Retorna True se foi aceito e
+    False se foi recusado porque o remoto avançou; outras falhas geram CalledProcessError.
+    """
+    args = ["push", "--porcelain", "-u", "origin", f"refs/heads/{branch}:refs/heads/{branch}"]
+    result = executar_git(args, cwd=caminho_projeto, capture_output=True, text=True)
+    if result.returncode == 0:
+        return True
+    # Linha da ref recusada: "!<TAB>origem:destino<TAB>[rejected] (fetch first|non-fast-forward)".
+    # Pushes simultâneos também podem perder a trava da ref no servidor:
+    # "[remote rejected] (failed to update ref)" / "cannot lock ref" - o remoto avançou do mesmo jeito.
+    for linha in result.stdout.splitlines():
+        if linha.startswith("!") and ("[rejected]" in linha or any(
+                motivo in linha for motivo in ("failed to update ref", "cannot lock ref", "incorrect old value"))):
+            return False
+    raise subprocess.CalledProcessError(result.returncode, ["git", *args], result.stdout, result.stderr.strip())
+
+def _integrar(caminho_projeto, remoto, estrategia):
+    """Integra os commits locais com os do remoto (rebase ou merge) e retorna o passo executado."""
+    base = executar_git(["merge-base", "HEAD", remoto], cwd=caminho_projeto, capture_output=True)
+    if estrategia == "rebase" and base.returncode == 0:
+        rebase = executar_git(["rebase", "--quiet", remoto], cwd=caminho_projeto, capture_output=True, text=True)
+        if rebase.returncode == 0:
+            return "rebase"
+        if operacao_em_andamento(caminho_projeto) == "rebase":
+            # Conflito: desfaz o rebase e mescla, deixando os conflitos na árvore como no pull
+            executar_git(["rebase", "--abort"], cwd=caminho_projeto, check=True)
+        else:
+            # O rebase nem começou (ex.: alterações fora do stage em arquivos rastreados, como os
+            # recusados pela política de arquivos grandes); o merge só exige que elas não conflitem
+            motivo = next(iter(rebase.stderr.strip().splitlines()), f"código {rebase.returncode}")
+            print(f"[AVISO] Rebase não iniciado ({motivo}); usando merge.")
+    # Sem ancestral comum (ex.: repositório novo conectado a um remoto já existente) sempre mescla
+    executar_git(["merge", "--quiet", "--no-edit", "--allow-unrelated-histories", remoto],
+                 cwd=caminho_projeto, check=True)
+    return "merge"
+
+def sincronizar_branch(caminho_projeto, branch, estrategia="rebase", tentativas=4, validade_prefetch=0):
+    """
+    Planejador do pushfull: deixa a branch local e a remota no mesmo commit com o
+    mínimo de idas à rede (em vez de sempre fazer pull + push).
+    - Há commits locais que origin/<branch> não tem: tenta o push direto. Se o
+      remoto não mudou (o caso comum), essa é a única ida à rede.
+    - Nada local para enviar (ou push recusado porque o remoto avançou): um fetch
+      da branch e, conforme os commits, nada, fast-forward, rebase ou merge
+      ('estrategia'); depois tenta o push de novo.
+    - Push recusado de novo (outro processo enviou antes): espera crescente e
+      limitada antes de repetir, até 'tentativas' pushes.
+    - Nada local para enviar e prefetch com menos de 'validade_prefetch' segundos:
+      usa a ref de prefetch no lugar do fetch (nada a fazer ou fast-forward sem rede).
+    Retorna a lista de passos executados (ex.: ['push'] ou ['fetch', 'fast-forward']).
+    """
+    if estrategia not in ("rebase", "merge"):
+        raise ValueError(f"Estratégia inválida '{estrategia}' (use rebase ou merge).")
+    rastreada = f"refs/remotes/origin/{branch}"
+    passos = []
+    recusas = 0
+    while True:
+        local = _sha(caminho_projeto, "HEAD")
+        remoto = _sha(caminho_projeto, rastreada)
+        tem_commits_locais = local is not None and local != remoto and \
+            (remoto is None or not _eh_ancestral(caminho_projeto, local, remoto))
+        if tem_commits_locais:
+            if git_push_tentativa(caminho_projeto, branch):
+                passos.append("push")
+                return passos
+            passos.append("push recusado")
+            recusas += 1
+            if recusas >= tentativas:
+                raise RuntimeError(f"push recusado {recusas} vezes; o remoto continua avançando")
+            if recusas > 1:
+                esperar(min(0.5 * 2 ** (recusas - 2), 8.0) * random.uniform(0.5, 1.5))
+        elif _prefetch_recente(caminho_projeto, validade_prefetch):
+            prefetch = _sha(caminho_projeto, PREFIXO_PREFETCH + branch)
+            if prefetch is not None and local is not None and _eh_ancestral(caminho_projeto, prefetch, local):
+                passos.append("em dia (prefetch)")
+                return passos
+            if prefetch is not None and (local is None or _eh_ancestral(caminho_projeto, local, prefetch)):
+                executar_git(["update-ref", rastreada, prefetch], cwd=caminho_projeto, check=True)
+                executar_git(["merge", "--quiet", "--ff-only", rastreada], cwd=caminho_projeto, check=True)
+                passos.append("fast-forward (prefetch)")
+                return passos
+
+        # Depois de uma recusa o espelho (se houver) certamente está velho
+        git_fetch_branch(caminho_projeto, branch, forcar_espelho=recusas > 0)
+        passos.append("fetch")
+        remoto = _sha(caminho_projeto, rastreada)
+        if remoto is None or remoto == local or (local and _eh_ancestral(caminho_projeto, remoto, local)):
+            if not tem_commits_locais:
+                return passos  # Nada novo em nenhum dos lados
+            continue  # O remoto não tem nada novo: só falta o push
+        if local is None or _eh_ancestral(caminho_projeto, local, remoto):
+            executar_git(["merge", "--quiet", "--ff-only", rastreada], cwd=caminho_projeto, check=True)
+            passos.append("fast-forward")
+            return passos
+        passos.append(_integrar(caminho_projeto, rastreada, estrategia))
+
+def _commits_pendentes(caminho_projeto, branch):
+    """Compara HEAD com refs/remotes/origin/<branch> (sem acessar a rede)."""
+    head, remoto = _backend.consultar_objetos(caminho_projeto, ["HEAD", f"refs/remotes/origin/{branch}"])
+    return head is None or remoto is None or head[0] != remoto[0]
+
+# ===========================================
+# Pushfull em lotes (árvores de trabalho com muitas alterações)
+# ===========================================
+def caminhos_para_stage(caminho_projeto):
+    """
+    Gera os caminhos que o 'git add .' enviaria ao stage: alterados ou removidos na
+    árvore de trabalho, em conflito e não rastreados (arquivo a arquivo).
+    """
+    for entrada in iterar_status(caminho_projeto, nao_rastreados="all"):
+        if entrada["tipo"] in ("cabecalho", "ignorado"):
+            continue
+        if entrada["tipo"] in ("alterado", "renomeado") and entrada["xy"][1] == ".":
+            continue  # Já está no stage
+        # Repositório git aninhado aparece como 'pasta/': entra como gitlink, igual ao 'git add'
+        yield entrada["caminho"].rstrip("/")
+
+def agrupar_caminhos(caminho_projeto, caminhos, max_arquivos=0, max_bytes=0):
+    """Divide os caminhos em grupos de até 'max_arquivos' arquivos e 'max_bytes' bytes (0 = sem limite)."""
+    grupo, tamanho = [], 0
+    for rel in caminhos:
+        bytes_arquivo = 0
+        if max_bytes:
+            try:
+                bytes_arquivo = os.lstat(os.path.join(caminho_projeto, rel)).st_size
+            except OSError:
+                pass  # Arquivo removido
+        if grupo and ((max_arquivos and len(grupo) >= max_arquivos) or
+                      (max_bytes and tamanho + bytes_arquivo > max_bytes)):
+            yield grupo
+            grupo, tamanho = [], 0
+        grupo.append(rel)
+        tamanho += bytes_arquivo
+    if grupo:
+        yield grupo
+
+def stage_em_lotes(caminho_projeto, caminhos, lote=1000, progresso=None):
+    """
+    Envia os caminhos ao 'git update-index --add --remove -z --stdin' em lotes de
+    'lote' caminhos: cada processo segura a trava do índice só durante o próprio
+    lote. 'progresso(n)' é chamado depois de cada lote.
+    """
+    for inicio in range(0, len(caminhos), lote):
+        parte = caminhos[inicio:inicio + lote]
+        entrada = b"".join(rel.encode("utf-8", "surrogateescape") + b"\0" for rel in parte)
+        executar_git(["update-index", "--add", "--remove", "-z", "--stdin"], cwd=caminho_projeto,
+                     input=entrada, check=True)
+        if progresso:
+            progresso(len(parte))
+
+# Arquivos que o git mantém em .git durante uma operação interrompida (conflito, rebase...)
+_OPERACOES_GIT = {"MERGE_HEAD": "merge", "rebase-merge": "rebase", "rebase-apply": "rebase",
+                  "CHERRY_PICK_HEAD": "cherry-pick", "REVERT_HEAD": "revert"}
+
+def operacao_em_andamento(caminho_projeto):
+    """Nome da operação em andamento no repositório (merge, rebase, cherry-pick, revert) ou None."""
+    args = ["rev-parse"]
+    for nome in _OPERACOES_GIT:
+        args += ["--git-path", nome]
+    result = executar_git(args, cwd=caminho_projeto,
+                          capture_output=True, text=True, check=True)
+    for nome, caminho in zip(_OPERACOES_GIT.values(), result.stdout.splitlines()):
+        if os.path.exists(os.path.join(caminho_projeto, caminho)):
+            return nome
+    return None
+
+def _commit_do_indice(caminho_projeto, mensagem):
+    """
+    Cria um commit com o conteúdo atual do índice (write-tree -> commit-tree -> update-ref),
+    sem o 'git commit' reler a árvore de trabalho inteira. Retorna o sha do commit.
+    Atenção: os hooks de commit (pre-commit, commit-msg...) não são executados e o
+    commit tem só HEAD como pai (quem chama recusa merges em andamento).
+    """
+    arvore = executar_git(["write-tree"], cwd=caminho_projeto,
+                          capture_output=True, text=True, check=True).stdout.strip()
+    pai = _sha(caminho_projeto, "HEAD")
+    args = ["commit-tree", arvore, "-m", mensagem] + (["-p", pai] if pai else [])
+    commit = executar_git(args, cwd=caminho_projeto, capture_output=True, text=True, check=True).stdout.strip()
+    executar_git(["update-ref", "-m", f"commit: {mensagem}", "HEAD", commit] + ([pai] if pai else []),
+                 cwd=caminho_projeto, check=True)
+    return commit
+
+def _progresso_stage(total):
+    """Retorna a função de progresso do stage em lotes (uma linha atualizada no terminal)."""
+    feitos = 0
+    inicio = time.perf_counter()
+    no_terminal = sys.stdout.isatty()
+
+    def avancar(quantidade):
+        nonlocal feitos
+        feitos += quantidade
+        taxa = feitos / max(time.perf_counter() - inicio, 1e-9)
+        print(f"{chr(13) if no_terminal else ''}[..] {feitos}/{total} arquivos no stage "
+              f"({feitos * 100 // total}%, {taxa:.0f} arquivos/s)", end="" if no_terminal else "\n", flush=True)
+    return avancar
+
+@medir_etapa
+def git_pushfull_em_lotes(caminho_projeto, mensagem, config, lote=None, arquivos_por_commit=None,
+                          mb_por_commit=None, sair_em_erro=True, semaforo_host=None, estrategia=None):
+    """
+    Pushfull para árvores de trabalho com muitas alterações (ex.: milhares de arquivos gerados):
+    - os caminhos alterados são listados uma vez (git status -z) e enviados ao
+      índice em lotes de 'lote' caminhos (git update-index), com progresso;
+    - com 'arquivos_por_commit' e/ou 'mb_por_commit', as alterações viram vários
+      commits ('<mensagem> (parte i/n)'), cada um enviado antes de preparar o
+      próximo, o que limita o tamanho de cada push.
+    Os padrões vêm da seção [desempenho] (lote_stage, arquivos_por_commit, mb_por_commit).
+    Os commits são criados direto do índice: os hooks de commit não são executados, e
+    um merge/rebase em andamento é recusado (conclua-o com o pushfull normal).
+    Retorna a quantidade de commits criados.
+    """
+    operacao = operacao_em_andamento(caminho_projeto)
+    if operacao:
+        print(f"[ERRO] Há um {operacao} em andamento; o --chunked não o concluiria corretamente.")
+        print("Conclua com 'pushfull' sem --chunked (ou git commit / git rebase --continue) e tente novamente.")
+        if not sair_em_erro:
+            raise RuntimeError(f"{operacao} em andamento")
+        exit(1)
+    lote = lote or opcao(config, 'desempenho', 'lote_stage')
+    arquivos_por_commit = arquivos_por_commit if arquivos_por_commit is not None else \
+        opcao(config, 'desempenho', 'arquivos_por_commit')
+    mb_por_commit = mb_por_commit if mb_por_commit is not None else opcao(config, 'desempenho', 'mb_por_commit')
+
+    caminhos = filtrar_arquivos_grandes(caminho_projeto, list(caminhos_para_stage(caminho_projeto)))
+    grupos = list(agrupar_caminhos(caminho_projeto, caminhos, arquivos_por_commit, int(mb_por_commit * 1024 * 1024)))
+    if not grupos:
+        print("[OK] Nada para commitar.")
+    progresso = _progresso_stage(len(caminhos))
+    for numero, grupo in enumerate(grupos, 1):
+        stage_em_lotes(caminho_projeto, grupo, lote, progresso)
+        if sys.stdout.isatty():
+            print()
+        titulo = mensagem if len(grupos) == 1 else f"{mensagem} (parte {numero}/{len(grupos)})"
+        _commit_do_indice(caminho_projeto, titulo)
+        print(f"[OK] Commit realizado: {titulo} ({len(grupo)} arquivos)")
+        if len(grupos) > 1:
+            _sincronizar_pushfull(caminho_projeto, config, sair_em_erro, semaforo_host, estrategia)
+    if len(grupos) <= 1:
+        _sincronizar_pushfull(caminho_projeto, config, sair_em_erro, semaforo_host, estrategia)
+    return len(grupos)
+
+# ===========================================
+# Arquivos grandes (Git LFS ou recusa antes do stage)
+# ===========================================
+# Política aplicada antes de qualquer envio ao stage (desativada com limite 0 e sem padrões)
+ARQUIVOS_GRANDES = {"limite": 0, "padroes": (), "acao": "lfs"}
+ACOES_ARQUIVOS_GRANDES = ("lfs", "recusar")
+_ATRIBUTOS_LFS = "filter=lfs diff=lfs merge=lfs -text"
+
+def configurar_arquivos_grandes(limite_mb=0, padroes="", acao="lfs"):
+    """
+    Define a política de arquivos grandes: arquivos com mais de 'limite_mb' MB ou que
+    casam com um dos globs de 'padroes' (separados por vírgula ou espaço) vão para o
+    Git LFS ('acao=lfs', se o git-lfs estiver instalado) ou ficam fora do stage ('recusar').
+    """
+    if acao not in ACOES_ARQUIVOS_GRANDES:
+        raise ValueError(f"Ação inválida '{acao}' para arquivos grandes (use {' ou '.join(ACOES_ARQUIVOS_GRANDES)}).")
+    ARQUIVOS_GRANDES.update(limite=int(limite_mb * 1024 * 1024), acao=acao,
+                            padroes=tuple(p for p in padroes.replace(",", " ").split() if p))
+
+def _politica_arquivos_grandes_ativa():
+    return bool(ARQUIVOS_GRANDES["limite"] or ARQUIVOS_GRANDES["padroes"])
+
+def _casa_padrao(rel, padroes):
+    """Primeiro glob que casa (sem '/': nome do arquivo; com '/': caminho relativo), como no .gitattributes."""
+    nome = rel.rsplit("/", 1)[-1]
+    for padrao in padroes:
+        if fnmatch.fnmatchcase(rel if "/" in padrao else nome, padrao.lstrip("/")):
+            return padrao
+    return None
+
+def _caminhos_no_lfs(caminho_projeto, caminhos):
+    """Caminhos que o .gitattributes já manda para o LFS (filter=lfs), com um único 'git check-attr'."""
+    result = executar_git(["check-attr", "-z", "--stdin", "filter"], cwd=caminho_projeto,
+                          input="\0".join(caminhos).encode("utf-8", "surrogateescape"),
+                          capture_output=True, check=True)
+    campos = result.stdout.decode("utf-8", "surrogateescape").split("\0")
+    return {campos[i] for i in range(0, len(campos) - 2, 3) if campos[i + 2] == "lfs"}
+
+def encontrar_arquivos_grandes(caminho_projeto, caminhos, limite_bytes=0, padroes=()):
+    """
+    Retorna [(caminho, tamanho, padrao)] dos arquivos de 'caminhos' com mais de
+    'limite_bytes' ou que casam com um glob de 'padroes' (padrao=None quando foi só
+    pelo tamanho). Arquivos que já vão para o LFS pelo .gitattributes ficam de fora.
+    """
+    grandes = []
+    for rel in caminhos:
+        padrao = _casa_padrao(rel, padroes) if padroes else None
+        if padrao is None and not limite_bytes:
+            continue
+        try:
+            info = os.lstat(os.path.join(caminho_projeto, rel))
+        except OSError:
+            continue  # Arquivo removido
+        if stat.S_ISREG(info.st_mode) and (padrao is not None or info.st_size > limite_bytes):
+            grandes.append((rel, info.st_size, padrao))
+    if grandes:
+        no_lfs = _caminhos_no_lfs(caminho_projeto, [rel for rel, _, _ in grandes])
+        grandes = [g for g in grandes if g[0] not in no_lfs]
+    return grandes
+
+@functools.lru_cache(maxsize=1)
+def lfs_disponivel():
+    """True se o git-lfs estiver instalado (consultado uma vez por execução)."""
+    try:
+        return executar_git(["lfs", "version"], capture_output=True).returncode == 0
+    except OSError:
+        return False
+
+def _padrao_literal(rel):
+    """Padrão do .gitattributes que casa só com este caminho (mesmo formato do 'git lfs track')."""
+    escapado = "".join("\\" + c if c in "\\*?[" else c for c in rel)
+    return "/" + escapado.replace(" ", "[[:space:]]")
+
+def _enviar_ao_lfs(caminho_projeto, grandes):
+    """
+    Acrescenta ao .gitattributes as regras do LFS (o glob configurado ou o próprio
+    caminho), para o 'git add' gravar ponteiros em vez do conteúdo. Retorna True se
+    o .gitattributes mudou.
+    """
+    filtro = executar_git(["config", "--get", "filter.lfs.clean"], cwd=caminho_projeto,
+                          capture_output=True, text=True)
+    if not filtro.stdout.strip():
+        executar_git(["lfs", "install", "--local"], cwd=caminho_projeto, capture_output=True, check=True)
+    arquivo = os.path.join(caminho_projeto, ".gitattributes")
+    conteudo = ""
+    if os.path.exists(arquivo):
+        with open(arquivo, encoding="utf-8") as f:
+            conteudo = f.read()
+    existentes = {linha.split(None, 1)[0] for linha in conteudo.splitlines() if linha.strip()}
+    regras = [r for r in dict.fromkeys(padrao or _padrao_literal(rel) for rel, _, padrao in grandes)
+              if r not in existentes]
+    if not regras:
+        return False
+    with open(arquivo, "a", encoding="utf-8") as f:
+        if conteudo and not conteudo.endswith("\n"):
+            f.write("\n")
+        f.writelines(f"{regra} {_ATRIBUTOS_LFS}\n" for regra in regras)
+    return True
+
+def filtrar_arquivos_grandes(caminho_projeto, caminhos):
+    """
+    Aplica a política de arquivos grandes aos caminhos que vão para o stage.
+    - 'lfs' com git-lfs instalado: registra os arquivos no LFS e devolve os caminhos
+      mais o .gitattributes (o 'git add' grava só os ponteiros no histórico).
+    - 'recusar' (ou git-lfs ausente): devolve os caminhos sem os arquivos grandes.
+    Informa quantos bytes ficaram fora do histórico.
+    """
+    if not _politica_arquivos_grandes_ativa():
+        return caminhos
+    grandes = encontrar_arquivos_grandes(caminho_projeto, caminhos, ARQUIVOS_GRANDES["limite"],
+                                         ARQUIVOS_GRANDES["padroes"])
+    if not grandes:
+        return caminhos
+    megabytes = sum(tamanho for _, tamanho, _ in grandes) / 1024 / 1024
+    if ARQUIVOS_GRANDES["acao"] == "lfs":
+        if lfs_disponivel():
+            alterou = _enviar_ao_lfs(caminho_projeto, grandes)
+            print(f"[OK] {len(grandes)} arquivo(s) grande(s) enviados ao Git LFS "
+                  f"({megabytes:.1f} MB fora do histórico do git).")
+            return caminhos + [".gitattributes"] if alterou and ".gitattributes" not in caminhos else caminhos
+        print("[AVISO] git-lfs não encontrado; os arquivos grandes serão recusados.")
+    recusados = {rel for rel, _, _ in grandes}
+    print(f"[AVISO] {len(grandes)} arquivo(s) grande(s) fora do stage ({megabytes:.1f} MB); "
+          "use o Git LFS, o .gitignore ou ajuste [arquivos_grandes] no config.ini:")
+    for rel, tamanho, padrao in grandes:
+        print(f"  {rel} ({tamanho / 1024 / 1024:.1f} MB{', ' + padrao if padrao else ''})")
+    return [rel for rel in caminhos if rel not in recusados]
+
+def git_add_tudo(caminho_projeto):
+    """'git add .' aplicando antes a política de arquivos grandes (recusados ficam de fora via pathspec)."""
+    recusados = []
+    if _politica_arquivos_grandes_ativa():
+        caminhos = list(caminhos_para_stage(caminho_projeto))
+        aceitos = set(filtrar_arquivos_grandes(caminho_projeto, caminhos))
+        recusados = [rel for rel in caminhos if rel not in aceitos]
+    if not recusados:
+        executar_git(["add", "."], cwd=caminho_projeto, check=True)
+        return
+    entrada = "\0".join([".", *(f":(exclude,literal){rel}" for rel in recusados)])
+    executar_git(["add", "-A", "--pathspec-from-file=-", "--pathspec-file-nul"], cwd=caminho_projeto,
+                 input=entrada.encode("utf-8", "surrogateescape"), check=True)
+
+# ===========================================
+# Cache de alterações (add incremental)
+# ===========================================
+def dir_estado(caminho_projeto):
+    """Pasta onde o git.py guarda seus dados por repositório (.git/git_automate)."""
+    git_dir = os.path.join(caminho_projeto, ".git")
+    if not os.path.isdir(git_dir):
+        # Worktrees e submódulos usam um arquivo .git apontando para a pasta real
+        result = executar_git(["rev-parse", "--absolute-git-dir"], cwd=caminho_projeto,
+                              capture_output=True, text=True, check=True)
+        git_dir = result.stdout.strip()
+    pasta = os.path.join(git_dir, "git_automate")
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+def _assinatura(info):
+    return [info.st_mtime_ns, info.st_size, info.st_ino]
+
+def _relativo(caminho):
+    return caminho.replace(os.sep, "/")
+
+def carregar_snapshot(caminho_projeto):
+    """Lê o snapshot da última sincronização (ou None se não existir/for inválido)."""
+    try:
+        with open(os.path.join(dir_estado(caminho_projeto), "snapshot.json"), encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get("versao") != 1:
+        return None
+    return snapshot
+
+def salvar_snapshot(caminho_projeto, snapshot):
+    caminho = os.path.join(dir_estado(caminho_projeto), "snapshot.json")
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(temporario, caminho)
+
+def _varrer_pastas(caminho_projeto, rel_inicial=""):
+    """Gera (pasta_relativa, mtime_ns, [arquivos_relativos]) para cada pasta abaixo de rel_inicial (ignora .git)."""
+    pendentes = [rel_inicial]
+    while pendentes:
+        rel = pendentes.pop()
+        absoluto = os.path.join(caminho_projeto, rel) if rel else caminho_projeto
+        try:
+            mtime = os.lstat(absoluto).st_mtime_ns
+            arquivos = []
+            with os.scandir(absoluto) as entradas:
+                for entrada in entradas:
+                    if entrada.name == ".git":
+                        continue
+                    rel_entrada = f"{rel}/{entrada.name}" if rel else entrada.name
+                    if entrada.is_dir(follow_symlinks=False):
+                        pendentes.append(rel_entrada)
+                    else:
+                        arquivos.append(rel_entrada)
+        except OSError:
+            continue
+        yield rel, mtime, arquivos
+
+def criar_snapshot(caminho_projeto):
+    """
+    Registra (mtime, tamanho, inode) de cada arquivo do índice e o mtime de cada pasta.
+    Deve ser chamado logo após um 'git add .', quando índice e árvore de trabalho coincidem.
+    """
+    result = executar_git(["ls-files", "-z"], cwd=caminho_projeto, capture_output=True, check=True)
+    arquivos = {}
+    for rel in result.stdout.decode("utf-8", "surrogateescape").split("\0"):
+        if not rel:
+            continue
+        try:
+            arquivos[rel] = _assinatura(os.lstat(os.path.join(caminho_projeto, rel)))
+        except OSError:
+            continue
+    pastas = {rel: mtime for rel, mtime, _ in _varrer_pastas(caminho_projeto)}
+    snapshot = {"versao": 1, "arquivos": arquivos, "pastas": pastas}
+    salvar_snapshot(caminho_projeto, snapshot)
+    return snapshot
+
+def detectar_alteracoes(caminho_projeto, snapshot):
+    """
+    Compara a árvore de trabalho com o snapshot usando apenas stat:
+    - arquivos conhecidos cuja assinatura mudou ou que sumiram;
+    - arquivos novos, procurados só nas pastas cujo mtime mudou.
+    Retorna (alterados, novos_candidatos, pastas_atualizadas).
+    """
+    alterados = []
+    for rel, assinatura in snapshot["arquivos"].items():
+        try:
+            info = os.lstat(os.path.join(caminho_projeto, rel))
+        except OSError:
+            alterados.append(rel)
+            continue
+        if _assinatura(info) != assinatura:
+            alterados.append(rel)
+
+    candidatos = []
+    pastas_atualizadas = {}
+    conhecidas = snapshot["pastas"]
+    for rel_pasta, mtime in conhecidas.items():
+        absoluto = os.path.join(caminho_projeto, rel_pasta) if rel_pasta else caminho_projeto
+        try:
+            mtime_atual = os.lstat(absoluto).st_mtime_ns
+        except OSError:
+            continue
+        if mtime_atual == mtime:
+            continue
+        pastas_atualizadas[rel_pasta] = mtime_atual
+        with os.scandir(absoluto) as entradas:
+            for entrada in entradas:
+                if entrada.name == ".git":
+                    continue
+                rel = f"{rel_pasta}/{entrada.name}" if rel_pasta else entrada.name
+                if entrada.is_dir(follow_symlinks=False):
+                    if rel not in conhecidas:
+                        # Pasta nova: todo o conteúdo é candidato
+                        for rel_sub, mtime_sub, arquivos in _varrer_pastas(caminho_projeto, rel):
+                            pastas_atualizadas[rel_sub] = mtime_sub
+                            candidatos.extend(arquivos)
+                elif rel not in snapshot["arquivos"]:
+                    candidatos.append(rel)
+    return alterados, candidatos, pastas_atualizadas
+
+def _filtrar_ignorados(caminho_projeto, caminhos):
+    """Remove de 'caminhos' os que o .gitignore exclui (git check-ignore --stdin)."""
+    if not caminhos:
+        return []
+    result = executar_git(["check-ignore", "-z", "--stdin"], cwd=caminho_projeto,
+                          input="\0".join(caminhos).encode("utf-8", "surrogateescape"),
+                          capture_output=True)
+    ignorados = set(result.stdout.decode("utf-8", "surrogateescape").split("\0"))
+    return [c for c in caminhos if c not in ignorados]
+
+@medir_etapa
+def git_add_incremental(caminho_projeto):
+    """
+    Adiciona ao stage apenas os caminhos alterados desde a última sincronização.
+    - Sem snapshot: executa 'git add .', ativa o untracked cache do git e cria o snapshot.
+    - Com snapshot: detecta as alterações só com stat e passa os caminhos para
+      'git add -A --pathspec-from-file', sem varrer a árvore inteira.
+    Retorna a quantidade de caminhos enviados ao stage (None no caminho completo).
+    """
+    snapshot = carregar_snapshot(caminho_projeto)
+    if snapshot is None:
+        executar_git(["config", "core.untrackedCache", "true"], cwd=caminho_projeto, check=True)
+        git_add_tudo(caminho_projeto)
+        criar_snapshot(caminho_projeto)
+        print("[OK] Arquivos adicionados ao stage (snapshot de alterações criado).")
+        return None
+
+    alterados, candidatos, pastas_atualizadas = detectar_alteracoes(caminho_projeto, snapshot)
+    novos = _filtrar_ignorados(caminho_projeto, candidatos)
+    caminhos = alterados + novos
+    if not caminhos:
+        if pastas_atualizadas:
+            snapshot["pastas"].update(pastas_atualizadas)
+            salvar_snapshot(caminho_projeto, snapshot)
+        print("[OK] Nada mudou desde a última sincronização.")
+        return 0
+
+    adicionados = adicionar_caminhos(caminho_projeto, caminhos, snapshot, pastas_atualizadas)
+    if adicionados is None:
+        return None
+    print(f"[OK] {adicionados} caminho(s) alterado(s) adicionados ao stage.")
+    return adicionados
+
+def adicionar_caminhos(caminho_projeto, caminhos, snapshot=None, pastas_atualizadas=None):
+    """
+    Envia ao stage só os 'caminhos' informados (git add -A --pathspec-from-file) e
+    atualiza o snapshot de alterações, se houver. Em caso de falha (ex.: arquivo
+    removido do índice por fora do git.py), volta ao 'git add .' e recria o snapshot.
+    Retorna a quantidade de caminhos enviados (None quando caiu no caminho completo).
+    """
+    caminhos = filtrar_arquivos_grandes(caminho_projeto, caminhos)
+    if not caminhos:
+        return 0
+    entrada = "\0".join(f":(literal){c}" for c in caminhos).encode("utf-8", "surrogateescape")
+    result = executar_git(["add", "-A", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                          cwd=caminho_projeto, input=entrada, capture_output=True)
+    if result.returncode != 0:
+        git_add_tudo(caminho_projeto)
+        criar_snapshot(caminho_projeto)
+        print("[OK] Arquivos adicionados ao stage (snapshot de alterações recriado).")
+        return None
+
+    if snapshot is None:
+        snapshot = carregar_snapshot(caminho_projeto)
+        if snapshot is None:
+            return len(caminhos)
+    pastas_atualizadas = pastas_atualizadas or {}
+    for rel in caminhos:
+        try:
+            snapshot["arquivos"][rel] = _assinatura(os.lstat(os.path.join(caminho_projeto, rel)))
+        except OSError:
+            snapshot["arquivos"].pop(rel, None)
+    for rel_pasta in [p for p in snapshot["pastas"] if p not in pastas_atualizadas]:
+        if not os.path.isdir(os.path.join(caminho_projeto, rel_pasta)):
+            del snapshot["pastas"][rel_pasta]
+    snapshot["pastas"].update(pastas_atualizadas)
+    salvar_snapshot(caminho_projeto, snapshot)
+    return len(caminhos)
+
+# ===========================================
+# Manutenção (repack incremental, commit-graph, multi-pack-index)
+# ===========================================
+# Comandos medidos antes/depois da manutenção (os mesmos do status/log do git.py)
+COMANDOS_MEDIDOS = {"status": ["status", "--porcelain"], "log": ["log", "--oneline", "-n", "1000"]}
+
+@functools.lru_cache(maxsize=1)
+def fsmonitor_disponivel():
+    """True se este git tiver o fsmonitor embutido (Windows/macOS, git >= 2.36)."""
+    result = executar_git(["version", "--build-options"], capture_output=True, text=True)
+    return "fsmonitor--daemon" in result.stdout
+
+def contar_objetos(caminho_projeto):
+    """Objetos soltos e packs do repositório (git count-objects -v)."""
+    result = executar_git(["count-objects", "-v"], cwd=caminho_projeto, capture_output=True, text=True, check=True)
+    valores = dict(linha.split(": ", 1) for linha in result.stdout.splitlines() if ": " in linha)
+    return int(valores.get("count", 0)), int(valores.get("packs", 0))
+
+def _tempo_comando(caminho_projeto, args, repeticoes=3):
+    """Melhor tempo (s) de 'git <args>' em 'repeticoes' execuções (a primeira aquece o cache do SO)."""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar_git(args, cwd=caminho_projeto, capture_output=True)
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor
+
+def _medir_repositorio(caminho_projeto):
+    soltos, packs = contar_objetos(caminho_projeto)
+    medidas = {"soltos": soltos, "packs": packs}
+    for nome, args in COMANDOS_MEDIDOS.items():
+        medidas[nome] = _tempo_comando(caminho_projeto, args)
+    return medidas
+
+def _tamanho_lote_midx(caminho_projeto):
+    """
+    Tamanho do lote do 'multi-pack-index repack', como no 'git maintenance' (incremental-repack):
+    um pouco maior que o segundo maior pack, juntando os pequenos sem reescrever o maior.
+    """
+    pasta = executar_git(["rev-parse", "--git-path", "objects/pack"], cwd=caminho_projeto,
+                         capture_output=True, text=True, check=True).stdout.strip()
+    try:
+        tamanhos = sorted((entrada.stat().st_size for entrada in os.scandir(os.path.join(caminho_projeto, pasta))
+                           if entrada.name.endswith(".pack")), reverse=True)
+    except OSError:
+        return 0
+    return tamanhos[1] + 1 if len(tamanhos) > 2 else 0
+
+@medir_etapa
+def git_manutencao(caminho_projeto, medir=True, expirar_prune="2.weeks.ago"):
+    """
+    Manutenção de um repositório de longa duração:
+    - core.untrackedCache (e core.fsmonitor, se o git tiver o fsmonitor embutido);
+    - repack incremental: só os objetos soltos viram um pack novo (sem reescrever os existentes);
+    - multi-pack-index: grava o índice único dos packs, expira os packs já absorvidos e
+      junta os pequenos em lotes;
+    - commit-graph incremental (--split) com filtros de caminhos alterados;
+    - pack-refs e prune dos objetos soltos inalcançáveis mais antigos que 'expirar_prune'.
+    Com 'medir=True' mede o status e o log antes e depois.
+    Retorna {"etapas": [...], "antes": {...}, "depois": {...}, "segundos": s}.
+    """
+    inicio = time.perf_counter()
+    resultado = {"etapas": [], "antes": _medir_repositorio(caminho_projeto) if medir else None}
+    with trava_arquivo(os.path.join(dir_estado(caminho_projeto), "manutencao.lock"), bloquear=False):
+        executar_git(["config", "core.untrackedCache", "true"], cwd=caminho_projeto, check=True)
+        resultado["etapas"].append("untracked-cache")
+        if fsmonitor_disponivel():
+            executar_git(["config", "core.fsmonitor", "true"], cwd=caminho_projeto, check=True)
+            resultado["etapas"].append("fsmonitor")
+
+        executar_git(["repack", "-d", "-q", "--no-write-bitmap-index"], cwd=caminho_projeto, check=True)
+        resultado["etapas"].append("repack")
+        if contar_objetos(caminho_projeto)[1]:  # Repositório sem nenhum pack (ex.: vazio) não tem o que indexar
+            executar_git(["multi-pack-index", "write", "--no-progress"], cwd=caminho_projeto, check=True)
+            executar_git(["multi-pack-index", "expire", "--no-progress"], cwd=caminho_projeto, check=True)
+            lote = _tamanho_lote_midx(caminho_projeto)
+            if lote:
+                executar_git(["multi-pack-index", "repack", "--no-progress", f"--batch-size={lote}"],
+                             cwd=caminho_projeto, check=True)
+            resultado["etapas"].append("multi-pack-index")
+
+        executar_git(["commit-graph", "write", "--reachable", "--split", "--changed-paths", "--no-progress"],
+                     cwd=caminho_projeto, check=True)
+        resultado["etapas"].append("commit-graph")
+        executar_git(["pack-refs", "--all"], cwd=caminho_projeto, check=True)
+        executar_git(["prune", f"--expire={expirar_prune}"], cwd=caminho_projeto, check=True)
+        resultado["etapas"].append("prune")
+
+    resultado["depois"] = _medir_repositorio(caminho_projeto) if medir else None
+    resultado["segundos"] = time.perf_counter() - inicio
+    return resultado
+
+def git_manutencao_varios(repositorios, max_jobs=4, medir=True, expirar_prune="2.weeks.ago"):
+    """Manutenção de vários repositórios em paralelo. Retorna [(caminho, resultado ou exceção)]."""
+    def manter(caminho):
+        try:
+            return caminho, git_manutencao(caminho, medir, expirar_prune)
+        except (subprocess.CalledProcessError, OSError) as e:
+            return caminho, e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_jobs, len(repositorios) or 1))) as executor:
+        return list(executor.map(manter, repositorios))
+
+def imprimir_manutencao(resultados):
+    """Tabela com objetos soltos, packs e tempos do status/log antes -> depois de cada repositório."""
+    def antes_depois(resultado, chave, formato):
+        if resultado["antes"] is None:
+            return "-"
+        return f"{formato(resultado['antes'][chave])} -> {formato(resultado['depois'][chave])}"
+
+    def ms(segundos):
+        return f"{segundos * 1000:.0f}"
+
+    linhas = []
+    for caminho, resultado in resultados:
+        if isinstance(resultado, BaseException):
+            linhas.append((caminho, "falhou", "", "", "", "", str(resultado).splitlines()[0] if str(resultado) else ""))
+            continue
+        linhas.append((caminho, "ok", antes_depois(resultado, "soltos", str), antes_depois(resultado, "packs", str),
+                       antes_depois(resultado, "status", ms), antes_depois(resultado, "log", ms),
+                       f"{resultado['segundos']:.1f}s"))
+    imprimir_tabela(("Repositório", "Resultado", "Soltos", "Packs", "status (ms)", "log (ms)", "Tempo"), linhas)
+
+def registrar_push(caminho_projeto, a_cada=0, expirar_prune="2.weeks.ago"):
+    """
+    Conta os pushes do repositório (.git/git_automate/manutencao.json) e, a cada
+    'a_cada' pushes (0 = desativado), executa a manutenção sem as medições.
+    """
+    if not a_cada:
+        return
+    arquivo = os.path.join(dir_estado(caminho_projeto), "manutencao.json")
+    try:
+        with open(arquivo, encoding="utf-8") as f:
+            estado = json.load(f)
+    except (OSError, ValueError):
+        estado = {}
+    estado["pushes"] = estado.get("pushes", 0) + 1
+    if estado["pushes"] >= a_cada:
+        try:
+            resultado = git_manutencao(caminho_projeto, medir=False, expirar_prune=expirar_prune)
+        except BlockingIOError:
+            pass  # Outra manutenção em andamento neste repositório: tenta no próximo push
+        except subprocess.CalledProcessError as e:
+            print(f"[AVISO] Falha na manutenção automática: {e}")
+        else:
+            print(f"[OK] Manutenção automática após {estado['pushes']} push(es) ({resultado['segundos']:.1f}s).")
+            estado = {"pushes": 0, "ultima": time.time()}
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+
+# ===========================================
+# Modo watch (auto-commit com debounce)
+# ===========================================
+# Eventos do inotify (linux/inotify.h)
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_MASCARA_INOTIFY = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+class ObservadorInotify:
+    """
+    Observa as pastas de um repositório com inotify (Linux, via ctypes) e entrega
+    os caminhos alterados para 'notificar(caminhos, completo)'. A pasta .git e as
+    pastas ignoradas pelo .gitignore não são observadas. Se a fila do kernel
+    estourar, 'completo=True' pede uma nova varredura.
+    """
+
+    def __init__(self, caminho_projeto, notificar):
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify indisponível neste sistema")
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.caminho = caminho_projeto
+        self._notificar = notificar
+        self._pastas = {}
+        self._observar_arvore("")
+
+    def _observar_arvore(self, rel_inicial):
+        """Observa 'rel_inicial' e suas subpastas (nível a nível) e retorna os arquivos encontrados."""
+        if rel_inicial and not _filtrar_ignorados(self.caminho, [rel_inicial]):
+            return []
+        arquivos = []
+        nivel = [rel_inicial]
+        while nivel:
+            subpastas = []
+            for rel in nivel:
+                absoluto = os.path.join(self.caminho, rel) if rel else self.caminho
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(absoluto), _MASCARA_INOTIFY)
+                if wd < 0:
+                    continue
+                self._pastas[wd] = rel
+                try:
+                    with os.scandir(absoluto) as entradas:
+                        for entrada in entradas:
+                            if entrada.name == ".git":
+                                continue
+                            rel_entrada = f"{rel}/{entrada.name}" if rel else entrada.name
+                            if entrada.is_dir(follow_symlinks=False):
+                                subpastas.append(rel_entrada)
+                            else:
+                                arquivos.append(rel_entrada)
+                except OSError:
+                    continue
+            # Um único check-ignore por nível evita observar node_modules, build/, etc.
+            nivel = _filtrar_ignorados(self.caminho, subpastas)
+        return arquivos
+
+    def iniciar(self, loop):
+        loop.add_reader(self._fd, self._ler_eventos)
+
+    def fechar(self, loop):
+        loop.remove_reader(self._fd)
+        os.close(self._fd)
+
+    def _ler_eventos(self):
+        try:
+            dados = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        caminhos = []
+        completo = False
+        posicao = 0
+        while posicao + 16 <= len(dados):
+            wd, mascara, _, tamanho = struct.unpack_from("iIII", dados, posicao)
+            nome = dados[posicao + 16:posicao + 16 + tamanho].rstrip(b"\0")
+            posicao += 16 + tamanho
+            if mascara & _IN_Q_OVERFLOW:
+                completo = True
+                continue
+            if mascara & _IN_IGNORED:
+                self._pastas.pop(wd, None)
+                continue
+            pasta = self._pastas.get(wd)
+            if pasta is None or not nome or nome == b".git":
+                continue
+            nome = os.fsdecode(nome)
+            rel = f"{pasta}/{nome}" if pasta else nome
+            if mascara & _IN_ISDIR and mascara & (_IN_CREATE | _IN_MOVED_TO):
+                # Pasta nova: passa a ser observada e todo o conteúdo conta como alterado
+                caminhos.extend(self._observar_arvore(rel))
+            elif mascara & _IN_ISDIR:
+                # Pasta removida/movida: a barra final indica que é uma pasta
+                caminhos.append(rel + "/")
+            else:
+                caminhos.append(rel)
+        self._notificar(caminhos, completo)
+
+class ServicoWatch:
+    """
+    Serviço asyncio que observa um repositório e:
+    - junta as alterações de uma rajada de salvamentos (debounce) em um único commit,
+      enviando ao stage apenas os caminhos alterados;
+    - a cada 'intervalo_push' segundos ou a cada 'lote_push' commits, sincroniza com o
+      remoto como o pushfull (_sincronizar_pushfull: push direto quando possível,
+      rebase/merge conforme [git] estrategia e manutenção a cada N pushes);
+    - com 'intervalo_prefetch', faz prefetch do origin periodicamente (git_prefetch),
+      para o status/log mostrarem o remoto sem acessar a rede.
+    'config' (padrão: a configuração efetiva do repositório) define branch, estratégia,
+    tentativas de push e manutenção. Usa inotify quando disponível; caso contrário (ou com 'intervalo_poll'),
+    verifica o snapshot de alterações periodicamente.
+    """
+
+    def __init__(self, caminho_projeto, config=None, mensagem="Auto-commit", debounce=2.0,
+                 intervalo_push=60.0, lote_push=10, intervalo_poll=None, intervalo_prefetch=None):
+        self.caminho = os.path.abspath(caminho_projeto)
+        self.config = config if config is not None else config_efetiva(os.path.join(self.caminho, "config.ini"))
+        self.mensagem = mensagem
+        self.debounce = debounce
+        self.intervalo_push = intervalo_push
+        self.lote_push = lote_push
+        self.intervalo_poll = intervalo_poll
+        self.intervalo_prefetch = intervalo_prefetch
+        self._pendentes = set()
+        self._pastas_atualizadas = {}
+        self._completo = False
+        self._commits_sem_push = 0
+        self._evento = None
+        self._trava = None
+
+    def _notificar(self, caminhos, completo=False):
+        if caminhos or completo:
+            self._pendentes.update(caminhos)
+            self._completo = self._completo or completo
+            self._evento.set()
+
+    async def executar(self):
+        self._evento = asyncio.Event()
+        self._trava = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+        await asyncio.to_thread(self._sincronizar_inicial)
+
+        observador = None
+        if self.intervalo_poll is None:
+            try:
+                observador = ObservadorInotify(self.caminho, self._notificar)
+                observador.iniciar(loop)
+            except (OSError, AttributeError) as e:
+                print(f"[AVISO] [{self.caminho}] inotify indisponível ({e}); usando verificação periódica.")
+        tarefas = [asyncio.create_task(self._debounce()), asyncio.create_task(self._agendar_push())]
+        if observador is None:
+            tarefas.append(asyncio.create_task(self._verificar_periodicamente(self.intervalo_poll or 5.0)))
+        if self.intervalo_prefetch:
+            tarefas.append(asyncio.create_task(self._prefetch_periodico()))
+        print(f"[OK] Observando {self.caminho} ({'inotify' if observador else 'polling'}).")
+        try:
+            await asyncio.gather(*tarefas)
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+            if observador is not None:
+                observador.fechar(loop)
+
+    def _sincronizar_inicial(self):
+        """Comita o que já estiver pendente e garante o snapshot de alterações."""
+        git_add_incremental(self.caminho)
+        self._commitar_stage()
+
+    async def _verificar_periodicamente(self, intervalo):
+        ultima = frozenset()
+        while True:
+            await asyncio.sleep(intervalo)
+            snapshot = carregar_snapshot(self.caminho)
+            if snapshot is None:
+                self._notificar([], completo=True)
+                continue
+            alterados, candidatos, pastas = await asyncio.to_thread(detectar_alteracoes, self.caminho, snapshot)
+            atual = frozenset(alterados + candidatos)
+            # Só conta como evento novo se o conjunto de alterações mudou desde a última verificação
+            if atual and atual != ultima:
+                self._pastas_atualizadas.update(pastas)
+                self._notificar(list(atual))
+            ultima = atual
+
+    async def _debounce(self):
+        while True:
+            await self._evento.wait()
+            while True:
+                self._evento.clear()
+                try:
+                    await asyncio.wait_for(self._evento.wait(), self.debounce)
+                except asyncio.TimeoutError:
+                    break
+            async with self._trava:
+                caminhos, self._pendentes = sorted(self._pendentes), set()
+                pastas, self._pastas_atualizadas = self._pastas_atualizadas, {}
+                completo, self._completo = self._completo, False
+                try:
+                    commitou = await asyncio.to_thread(self._commitar_caminhos, caminhos, pastas, completo)
+                except Exception as e:
+                    # Uma rajada com falha não pode encerrar o serviço: a próxima faz o add
+                    # incremental completo, para nenhuma alteração desta se perder
+                    print(f"[AVISO] [{self.caminho}] Falha ao commitar ({e}); nova tentativa na próxima alteração.")
+                    self._completo = True
+                    continue
+                if commitou:
+                    self._commits_sem_push += 1
+                    if self._commits_sem_push >= self.lote_push:
+                        await self._push()
+
+    def _commitar_caminhos(self, caminhos, pastas, completo):
+        if completo:
+            git_add_incremental(self.caminho)
+        else:
+            caminhos = _filtrar_ignorados(self.caminho, caminhos)
+            # Arquivos temporários criados e apagados antes do commit não existem no índice
+            ausentes = [c for c in caminhos
+                        if not c.endswith("/") and not os.path.lexists(os.path.join(self.caminho, c))]
+            if ausentes:
+                no_indice = _backend.consultar_objetos(self.caminho, [f":{c}" for c in ausentes])
+                descartar = {c for c, obj in zip(ausentes, no_indice) if obj is None}
+                caminhos = [c for c in caminhos if c not in descartar]
+            caminhos = [c.rstrip("/") for c in caminhos]
+            if caminhos:
+                adicionar_caminhos(self.caminho, caminhos, pastas_atualizadas=pastas)
+        return self._commitar_stage()
+
+    def _commitar_stage(self):
+        if executar_git(["diff", "--cached", "--quiet"], cwd=self.caminho).returncode == 0:
+            return False
+        executar_git(["commit", "-q", "-m", self.mensagem], cwd=self.caminho, check=True)
+        print(f"[OK] [{self.caminho}] Commit realizado: {self.mensagem}")
+        return True
+
+    async def _agendar_push(self):
+        while True:
+            await asyncio.sleep(self.intervalo_push)
+            async with self._trava:
+                if self._commits_sem_push:
+                    await self._push()
+
+    async def _prefetch_periodico(self):
+        # Sem a trava: o prefetch só grava em refs/prefetch/*, não disputa o índice com os commits
+        while True:
+            try:
+                await asyncio.to_thread(git_prefetch, self.caminho)
+            except (subprocess.CalledProcessError, OSError) as e:
+                print(f"[AVISO] [{self.caminho}] Falha no prefetch ({e}); nova tentativa no próximo intervalo.")
+            await asyncio.sleep(self.intervalo_prefetch)
+
+    async def _push(self):
+        """Sincroniza com o remoto como o pushfull (chamado com a trava do repositório já adquirida)."""
+        try:
+            await asyncio.to_thread(_sincronizar_pushfull, self.caminho, self.config, False)
+        except (subprocess.CalledProcessError, RuntimeError):
+            # O _sincronizar_pushfull já mostrou o erro
+            if _tem_conflitos(self.caminho):
+                print(f"[ERRO] [{self.caminho}] Conflito ao integrar o remoto; o watch deste repositório foi encerrado.")
+                raise
+            print(f"[AVISO] [{self.caminho}] Nova tentativa de sincronizar no próximo intervalo.")
+            return
+        self._commits_sem_push = 0
+
+async def observar_repositorios(servicos):
+    """Executa vários ServicoWatch no mesmo processo (um loop asyncio para todos)."""
+    resultados = await asyncio.gather(*(servico.executar() for servico in servicos), return_exceptions=True)
+    for servico, resultado in zip(servicos, resultados):
+        if isinstance(resultado, Exception):
+            print(f"[ERRO] [{servico.caminho}] Watch encerrado: {resultado}")
+
+# ===========================================
+# API assíncrona (asyncio)
+# ===========================================
+class RepositorioAsync:
+    """
+    API assíncrona para um repositório, baseada em asyncio.create_subprocess_exec.
+    - Uma trava por instância serializa as operações que alteram o repositório
+      (add, commit, pull, push, checkout, pushfull); consultas não esperam pela trava.
+    - add, commit e pushfull executam, em uma thread, as mesmas funções da linha
+      de comando (política de arquivos grandes, cache de alterações, planejador do
+      pushfull...), para as duas formas de uso não divergirem.
+    - 'timeout' (segundos) encerra o processo git que demorar demais (em add, commit
+      e pushfull, a operação inteira); cancelar a tarefa também encerra o processo.
+      Nas operações em thread, a trava só é liberada depois que a thread termina.
+    Exemplo:
+        repo = RepositorioAsync("/caminho/do/projeto")
+        await repo.add()
+        if await repo.commit("Mensagem"):
+            await repo.push("main")
+    """
+
+    def __init__(self, caminho_projeto, timeout=None):
+        self.caminho = caminho_projeto
+        self.timeout = timeout
+        self._trava = asyncio.Lock()
+
+    async def executar(self, args, check=True, entrada=None, timeout=None, ao_receber_linha=None):
+        """
+        Executa 'git <args>' e retorna um subprocess.CompletedProcess (saídas em bytes).
+        'ao_receber_linha' (opcional) recebe cada linha do stdout assim que chega.
+        Com check=True, código de saída diferente de zero gera CalledProcessError.
+        """
+        _contar_processo()
+        processo = await asyncio.create_subprocess_exec(
+            "git", *args, cwd=self.caminho,
+            stdin=subprocess.PIPE if entrada is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                self._comunicar(processo, entrada, ao_receber_linha), timeout or self.timeout)
+        except BaseException:
+            # Timeout ou cancelamento: não deixa o processo git órfão
+            if processo.returncode is None:
+                processo.kill()
+                await processo.wait()
+            raise
+        _registrar_saida(stdout, stderr)
+        if check and processo.returncode != 0:
+            raise subprocess.CalledProcessError(processo.returncode, ["git", *args], stdout, stderr)
+        return subprocess.CompletedProcess(["git", *args], processo.returncode, stdout, stderr)
+
+    @staticmethod
+    async def _comunicar(processo, entrada, ao_receber_linha):
+        if ao_receber_linha is None:
+            return await processo.communicate(entrada)
+        if entrada is not None:
+            processo.stdin.write(entrada)
+            await processo.stdin.drain()
+            processo.stdin.close()
+        erros = asyncio.ensure_future(processo.stderr.read())
+        linhas = []
+        async for linha in processo.stdout:
+            linhas.append(linha)
+            ao_receber_linha(linha.decode("utf-8", "replace"))
+        await processo.wait()
+        return b"".join(linhas), await erros
+
+    async def iterar_campos(self, args):
+        """
+        Gera, de forma assíncrona, os campos separados por NUL da saída de 'git <args>'.
+        Lida a saída inteira, código de saída diferente de zero gera CalledProcessError
+        (como no _iterar_saida_git).
+        """
+        _contar_processo()
+        processo = await asyncio.create_subprocess_exec(
+            "git", *args, cwd=self.caminho, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        lido_ate_o_fim = False
+        try:
+            resto = b""
+            while True:
+                bloco = await processo.stdout.read(65536)
+                if not bloco:
+                    lido_ate_o_fim = True
+                    break
+                _registrar_bytes(len(bloco))
+                partes = (resto + bloco).split(b"\0")
+                resto = partes.pop()
+                for parte in partes:
+                    yield parte.decode("utf-8", "surrogateescape")
+            if resto:
+                yield resto.decode("utf-8", "surrogateescape")
+        finally:
+            # Só encerra o git se o consumidor parou antes do fim da saída
+            # (matar um processo que já terminou disputa o wait com o asyncio)
+            if not lido_ate_o_fim and processo.returncode is None:
+                processo.kill()
+            await processo.wait()
+        if processo.returncode != 0:
+            raise subprocess.CalledProcessError(processo.returncode, ["git", *args])
+
+    # ---- Consultas ----
+    @medir_etapa
+    async def status(self, branch=True):
+        """Lista as entradas do 'git status --porcelain=v2' (mesmo formato de iterar_status)."""
+        campos = [campo async for campo in self.iterar_campos(_args_status(branch))]
+        return list(interpretar_status(campos))
+
+    async def tem_alteracoes(self):
+        """Retorna True no primeiro registro do status (não espera o git terminar)."""
+        campos = self.iterar_campos(_args_status())
+        try:
+            async for _ in campos:
+                return True
+            return False
+        finally:
+            await campos.aclose()
+
+    async def iterar_log(self, limit=None):
+        """Gera os commits (mesmo formato de iterar_log) conforme são lidos."""
+        async for campo in self.iterar_campos(_args_log(limit)):
+            yield interpretar_commit(campo)
+
+    @medir_etapa
+    async def log(self, limit=10):
+        return [commit async for commit in self.iterar_log(limit)]
+
+    @medir_etapa
+    async def diff(self):
+        campos = [campo async for campo in self.iterar_campos(["diff", "--numstat", "-z"])]
+        return list(interpretar_diff(campos))
+
+    # ---- Operações (com trava por repositório) ----
+    async def _em_thread(self, funcao, *args):
+        """
+        Executa uma função síncrona da linha de comando em uma thread. Com timeout ou
+        cancelamento, o processo git em andamento é encerrado e a thread é aguardada
+        antes de repassar o erro: quem chama continua com a trava até ela terminar.
+        """
+        cancelamento = Cancelamento()
+
+        def executar():
+            _cancelamento_atual.set(cancelamento)
+            return funcao(*args)
+
+        tarefa = asyncio.ensure_future(asyncio.to_thread(executar))
+        try:
+            return await asyncio.wait_for(asyncio.shield(tarefa), self.timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            cancelamento.cancelar()
+            while not tarefa.done():
+                # Outro cancelamento enquanto espera não libera a trava antes da hora
+                with contextlib.suppress(BaseException):
+                    await asyncio.shield(tarefa)
+            raise
+
+    @medir_etapa
+    async def add(self, caminhos=None):
+        """git add . (git_add_tudo) ou apenas os caminhos informados (adicionar_caminhos)."""
+        async with self._trava:
+            if caminhos is None:
+                await self._em_thread(git_add_tudo, self.caminho)
+            else:
+                await self._em_thread(adicionar_caminhos, self.caminho, list(caminhos))
+
+    @medir_etapa
+    async def commit(self, mensagem="Update", rapido=False):
+        """Faz commit se houver alterações (como o git_commit); retorna True se o commit foi criado."""
+        async with self._trava:
+            return await self._em_thread(_commitar, self.caminho, mensagem, rapido)
+
+    @medir_etapa
+    async def pull(self, branch="master", ao_receber_linha=None):
+        """Mesmo pull do git_pull (inclusive pelo cache de espelhos, se ativo)."""
+        async with self._trava:
+            async with self._espelho() as espelho:
+                await self.executar(_args_pull(espelho, branch), ao_receber_linha=ao_receber_linha)
+
+    @contextlib.asynccontextmanager
+    async def _espelho(self):
+        """espelho_para do repositório; a atualização do espelho e as travas rodam em uma thread."""
+        if not CACHE_ESPELHOS["ativo"]:
+            yield None
+            return
+        gerenciador = espelho_para(await asyncio.to_thread(url_remota, self.caminho))
+        espelho = await asyncio.to_thread(gerenciador.__enter__)
+        try:
+            yield espelho
+        finally:
+            await asyncio.to_thread(gerenciador.__exit__, None, None, None)
+
+    @medir_etapa
+    async def push(self, branch="master", ao_receber_linha=None):
+        async with self._trava:
+            await self.executar(["push", "-u", "origin", branch], ao_receber_linha=ao_receber_linha)
+
+    @medir_etapa
+    async def checkout(self, branch):
+        """Checkout na branch; cria com -b se ela não existir."""
+        async with self._trava:
+            if (await self.executar(["checkout", branch], check=False)).returncode != 0:
+                await self.executar(["checkout", "-b", branch])
+
+    @medir_etapa
+    async def pushfull(self, mensagem="Update", config=None, rapido=None, estrategia=None):
+        """
+        O git_pushfull da linha de comando (add + commit + sincronizar_branch, com o modo
+        rápido, o atalho do prefetch e a manutenção a cada N pushes), sem liberar a trava.
+        'config' é a configuração base (padrão: a global), com o config.ini do repositório
+        por cima. Falhas geram CalledProcessError ou RuntimeError. Retorna True se algum
+        commit foi criado.
+        """
+        async with self._trava:
+            return await self._em_thread(self._pushfull, mensagem, config, rapido, estrategia)
+
+    def _pushfull(self, mensagem, config, rapido, estrategia):
+        config_repo = config_efetiva(os.path.join(self.caminho, "config.ini"), base=config)
+        return git_pushfull(self.caminho, mensagem, config_repo, rapido=rapido, sair_em_erro=False,
+                            estrategia=estrategia)
+
+async def em_lote(caminhos, operacao, limite=16, timeout=None):
+    """
+    Executa 'await operacao(RepositorioAsync(caminho))' em vários repositórios,
+    com no máximo 'limite' ao mesmo tempo. Retorna {caminho: resultado ou exceção}.
+    """
+    semaforo = asyncio.Semaphore(limite)
+
+    async def executar(caminho):
+        async with semaforo:
+            return await operacao(RepositorioAsync(caminho, timeout=timeout))
+
+    resultados = await asyncio.gather(*(executar(c) for c in caminhos), return_exceptions=True)
+    return dict(zip(caminhos, resultados))
+
+async def status_em_lote(caminhos, limite=16, timeout=None):
+    """Status de vários repositórios com um único gather (sem uma thread por repositório)."""
+    return await em_lote(caminhos, lambda repo: repo.status(), limite, timeout)
+
+def imprimir_status_em_lote(resultados, formato=None):
+    """Imprime o resultado do status_em_lote como tabela ou JSON/NDJSON."""
+    registros = []
+    for caminho, resultado in resultados.items():
+        if isinstance(resultado, Exception):
+            registros.append({"repo": caminho, "erro": str(resultado)})
+            continue
+        cabecalho = {e["chave"]: e["valor"] for e in resultado if e["tipo"] == "cabecalho"}
+        entradas = [e for e in resultado if e["tipo"] != "cabecalho"]
+        registros.append({"repo": caminho, "branch": cabecalho.get("branch.head"),
+                          "ahead_behind": cabecalho.get("branch.ab"), "entradas": entradas})
+    if formato:
+        emitir_registros(registros, formato)
+        return
+    linhas = [(r["repo"], r.get("branch") or "-", "erro" if "erro" in r else str(len(r["entradas"])),
+               r.get("erro") or r.get("ahead_behind") or "") for r in registros]
+    imprimir_tabela(("Repositório", "Branch", "Alterações", "Detalhe"), linhas)
+
+# ===========================================
+# Workspace (pushfull em vários repositórios)
+# ===========================================
+def descobrir_repositorios(diretorio_base, profundidade=3):
+    """
+    Procura repositórios Git (pastas que contêm '.git') abaixo de 'diretorio_base'.
+    Não desce dentro de um repositório já encontrado.
+    """
+    encontrados = []
+    pendentes = [(os.path.abspath(diretorio_base), 0)]
+    while pendentes:
+        pasta, nivel = pendentes.pop()
+        if os.path.exists(os.path.join(pasta, ".git")):
+            encontrados.append(pasta)
+            continue
+        if nivel >= profundidade:
+            continue
+        try:
+            with os.scandir(pasta) as entradas:
+                for entrada in entradas:
+                    if entrada.is_dir(follow_symlinks=False) and not entrada.name.startswith("."):
+                        pendentes.append((entrada.path, nivel + 1))
+        except OSError:
+            continue
+    return sorted(encontrados)
+
+def repositorios_do_config(config):
+    """Lê a lista de repositórios da seção [workspace] do config.ini (chave 'repos', um por linha)."""
+    repos = opcao(config, 'workspace', 'repos')
+    return [linha.strip() for linha in repos.splitlines() if linha.strip()]
+
+def host_remoto(caminho_projeto):
+    """Retorna o host do remoto 'origin' (ex.: github.com) ou 'local' se não houver."""
+    return host_da_url(url_remota(caminho_projeto))
+
+def url_remota(caminho_projeto):
+    """URL do remoto 'origin' (a mesma gravada a partir do config.ini) ou '' se não houver."""
+    result = executar_git(["remote", "get-url", "origin"],
+                          cwd=caminho_projeto, capture_output=True, text=True)
+    return result.stdout.strip()
+
+def host_da_url(url):
+    """Extrai o host de uma URL git (https, ssh ou formato scp) ou 'local'."""
+    if not url:
+        return "local"
+    if "://" in url:
+        return urlparse(url).hostname or "local"
+    # Formato scp (git@github.com:usuario/repo.git)
+    if ":" in url and not os.path.exists(url):
+        return url.split(":", 1)[0].split("@")[-1]
+    return "local"
+
+def _tem_conflitos(caminho_projeto):
+    """Verifica se há arquivos em conflito (não mesclados) no repositório."""
+    result = executar_git(["diff", "--name-only", "--diff-filter=U"],
+                          cwd=caminho_projeto, capture_output=True, text=True)
+    return bool(result.stdout.strip())
+
+def _pushfull_repo(caminho_projeto, mensagem, config, semaforo_host, rapido=None, estrategia=None, em_lotes=None):
+    """Executa add + commit + sincronização em um repositório e devolve (resultado, detalhe)."""
+    # O config.ini do próprio repositório (se existir) tem prioridade sobre o do workspace
+    config_repo = config_efetiva(os.path.join(caminho_projeto, "config.ini"), base=config)
+    try:
+        if em_lotes is not None:
+            commitou = git_pushfull_em_lotes(caminho_projeto, mensagem, config_repo, sair_em_erro=False,
+                                             semaforo_host=semaforo_host, estrategia=estrategia, **em_lotes) > 0
+        else:
+            commitou = git_pushfull(caminho_projeto, mensagem, config_repo, rapido=rapido,
+                                    sair_em_erro=False, semaforo_host=semaforo_host, estrategia=estrategia)
+    except (subprocess.CalledProcessError, RuntimeError) as e:
+        if _tem_conflitos(caminho_projeto):
+            return "conflito", f"resolva os conflitos em {caminho_projeto}"
+        return "falhou", _resumo_erro(e)
+    except OSError as e:
+        return "falhou", str(e)
+    return ("ok" if commitou else "nada para commitar"), ""
+
+def git_pushfull_workspace(repositorios, mensagem, config, max_jobs=8, max_por_host=4, rapido=None,
+                           estrategia=None, em_lotes=None):
+    """
+    Executa o pushfull em vários repositórios ao mesmo tempo.
+    - 'max_jobs' limita quantos repositórios são processados em paralelo.
+    - 'max_por_host' limita quantos pull/push simultâneos vão para o mesmo host remoto.
+    Ao final imprime uma tabela com o resultado de cada repositório e
+    retorna a lista de tuplas (repo, resultado, detalhe).
+    """
+    semaforos = {}
+    trava = threading.Lock()
+
+    def semaforo_para(caminho):
+        host = host_remoto(caminho)
+        with trava:
+            if host not in semaforos:
+                semaforos[host] = threading.BoundedSemaphore(max_por_host)
+            return semaforos[host]
+
+    def executar(caminho):
+        return _pushfull_repo(caminho, mensagem, config, semaforo_para(caminho), rapido, estrategia, em_lotes)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_jobs)) as executor:
+        resultados = list(executor.map(executar, repositorios))
+
+    linhas = [(repo, resultado, detalhe) for repo, (resultado, detalhe) in zip(repositorios, resultados)]
+    imprimir_resumo_workspace(linhas)
+    return linhas
+
+def imprimir_resumo_workspace(linhas):
+    """Imprime a tabela de resumo (repo / resultado / detalhe) do modo workspace."""
+    largura = max([len("Repositório")] + [len(repo) for repo, _, _ in linhas])
+    print("\n*** Resumo do workspace ***")
+    print(f"{'Repositório'.ljust(largura)}  {'Resultado'.ljust(18)}  Detalhe")
+    print(f"{'-' * largura}  {'-' * 18}  -------")
+    for repo, resultado, detalhe in linhas:
+        print(f"{repo.ljust(largura)}  {resultado.ljust(18)}  {detalhe}")
+
+# ===========================================
+# Clone de vários repositórios (--from-list)
+# ===========================================
+def _texto_saida(saida):
+    """Saída capturada de um processo (bytes, str ou None) como texto."""
+    if isinstance(saida, bytes):
+        return saida.decode("utf-8", "replace")
+    return saida or ""
+
+def _linhas_erro(erro):
+    """Linhas de erro capturadas do git: o stderr e as refs recusadas ('!') do push --porcelain."""
+    if not isinstance(erro, subprocess.CalledProcessError):
+        return [], []
+    recusadas = [linha.replace("\t", " ") for linha in _texto_saida(erro.stdout).splitlines() if linha.startswith("!")]
+    return _texto_saida(erro.stderr).strip().splitlines(), recusadas
+
+def imprimir_saida_erro(erro):
+    """Mostra o que o git escreveu ao falhar (hooks 'remote: ...', autenticação, ref recusada)."""
+    linhas, recusadas = _linhas_erro(erro)
+    for linha in linhas + recusadas:
+        print(f"  {linha}")
+
+def _resumo_erro(erro):
+    """
+    Linha que explica a falha (resumos do workspace e do clone --from-list): a primeira
+    'fatal:' do stderr (as seguintes costumam ser dicas genéricas, ex.: 'Please make sure
+    you have the correct access rights'), a ref recusada no push, a primeira 'error:'
+    ou, sem elas, a última linha do stderr.
+    """
+    linhas, recusadas = _linhas_erro(erro)
+    for linha in [l for l in linhas if l.startswith("fatal:")] + recusadas + \
+            [l for l in linhas if l.startswith("error:")]:
+        return linha
+    return linhas[-1] if linhas else str(erro)
+
+def ler_lista_clones(caminho_lista, pasta_base="."):
+    """
+    Lê um arquivo com uma URL por linha, opcionalmente seguida da pasta de destino
+    ('url [destino]'). Linhas vazias e iniciadas por '#' são ignoradas.
+    Sem destino, usa o nome do repositório (sem '.git') dentro de 'pasta_base'.
+    Retorna a lista de tuplas (url, destino).
+    """
+    entradas = []
+    with open(caminho_lista, encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            url, _, destino = linha.partition(" ")
+            if not destino.strip():
+                nome = url.rstrip("/").rsplit("/", 1)[-1].rsplit(":", 1)[-1]
+                destino = nome[:-4] if nome.endswith(".git") else nome
+            entradas.append((url, os.path.join(pasta_base, destino.strip())))
+    return entradas
+
+def git_clone_varios(entradas, opcoes=None, max_jobs=8, max_por_host=4):
+    """
+    Clona vários repositórios ao mesmo tempo.
+    - 'entradas': lista de tuplas (url, destino);
+    - 'opcoes': argumentos nomeados repassados ao git_clone (profundidade, filtro, ...);
+    - 'max_jobs' limita os clones em paralelo e 'max_por_host' os simultâneos no mesmo host.
+    Imprime uma tabela com o resultado e retorna a lista (url, resultado, detalhe).
+    """
+    opcoes = dict(opcoes or {}, silencioso=True)
+    semaforos = {}
+    trava = threading.Lock()
+
+    def clonar(entrada):
+        url, destino = entrada
+        host = host_da_url(url)
+        with trava:
+            semaforo = semaforos.setdefault(host, threading.BoundedSemaphore(max_por_host))
+        inicio = time.perf_counter()
+        try:
+            with semaforo:
+                git_clone(url, destino, **opcoes)
+        except subprocess.CalledProcessError as e:
+            return url, "falhou", _resumo_erro(e)
+        except OSError as e:
+            return url, "falhou", str(e)
+        return url, "ok", f"{destino} ({time.perf_counter() - inicio:.1f}s)"
+
+    with ThreadPoolExecutor(max_workers=max(1, max_jobs)) as executor:
+        linhas = list(executor.map(clonar, entradas))
+
+    print("\n*** Resumo dos clones ***")
+    imprimir_tabela(("Repositório", "Resultado", "Detalhe"), linhas)
+    return linhas
+
+# ===========================================
+# Novo projeto (estrutura + init + conectar + primeiro push)
+# ===========================================
+def git_commit_arquivos(caminho_projeto, arquivos, mensagem, branch):
+    """
+    Cria um commit em refs/heads/<branch> diretamente a partir da lista de arquivos,
+    sem varrer a árvore de trabalho com 'git add .':
+    hash-object -w --stdin-paths -> update-index --index-info -> write-tree -> commit-tree.
+    O índice fica preenchido com os mesmos arquivos do commit. Retorna o sha do commit.
+    """
+    arquivos = sorted(set(arquivos))
+    result = executar_git(["hash-object", "-w", "--stdin-paths"], cwd=caminho_projeto,
+                          input="".join(f"{a}\n" for a in arquivos), capture_output=True, text=True, check=True)
+    entradas = []
+    for arquivo, sha in zip(arquivos, result.stdout.split()):
+        executavel = os.stat(os.path.join(caminho_projeto, arquivo)).st_mode & 0o111
+        entradas.append(f"{'100755' if executavel else '100644'} {sha}\t{arquivo}\0")
+    executar_git(["update-index", "--add", "-z", "--index-info"], cwd=caminho_projeto,
+                 input="".join(entradas), text=True, check=True)
+    arvore = executar_git(["write-tree"], cwd=caminho_projeto,
+                          capture_output=True, text=True, check=True).stdout.strip()
+    commit = executar_git(["commit-tree", arvore, "-m", mensagem], cwd=caminho_projeto,
+                          capture_output=True, text=True, check=True).stdout.strip()
+    executar_git(["update-ref", f"refs/heads/{branch}", commit], cwd=caminho_projeto, check=True)
+    return commit
+
+@medir_etapa
+def git_novo_projeto(raiz_projeto, template, variaveis, url_remota=None, branch="main",
+                     mensagem="Commit inicial"):
+    """
+    Cria a estrutura do projeto (estrutura.py), inicializa o repositório já na
+    branch desejada, cria o primeiro commit a partir dos arquivos gerados,
+    conecta ao remoto e faz o push. Sem 'url_remota', para após o commit.
+    """
+    if os.path.exists(os.path.join(raiz_projeto, ".git")):
+        raise FileExistsError(f"Já existe um repositório Git em {raiz_projeto}")
+    import estrutura
+
+    arquivos = estrutura.gerar_projeto(template, raiz_projeto, variaveis)
+    executar_git(["init", "-q", f"--initial-branch={branch}"], cwd=raiz_projeto, check=True)
+    commit = git_commit_arquivos(raiz_projeto, arquivos, mensagem, branch)
+    print(f"[OK] Projeto criado em {raiz_projeto} (commit {commit[:7]}, {len(arquivos)} arquivos)")
+    if not url_remota:
+        print("[AVISO] Nenhuma URL remota informada: o projeto não foi conectado nem enviado.")
+        return False
+    executar_git(["remote", "add", "origin", url_remota], cwd=raiz_projeto, check=True)
+    git_push(raiz_projeto, branch=branch)
+    return True
+
+def git_novos_projetos(diretorio_base, nomes, config, url_modelo=None, caminho_template=None,
+                       variaveis=None, branch=None, max_jobs=8):
+    """
+    Executa o git_novo_projeto para vários nomes em paralelo.
+    'url_modelo' pode conter {nome} (ex.: git@github.com:org/{nome}.git).
+    O template é compilado uma única vez e compartilhado entre os projetos.
+    Retorna as linhas do resumo (repo, resultado, detalhe).
+    """
+    try:
+        import estrutura
+    except ImportError:
+        print("[ERRO] O comando novo-projeto precisa do estrutura.py na mesma pasta do git.py.")
+        sys.exit(1)
+    template = estrutura.carregar_template(caminho_template)
+    branch = branch or opcao(config, 'git', 'branch')
+    url_modelo = url_modelo or opcao(config, 'git', 'url')
+
+    def executar(nome):
+        raiz = os.path.join(diretorio_base, nome)
+        url = url_modelo.replace("{nome}", nome) if url_modelo else None
+        try:
+            enviado = git_novo_projeto(raiz, template, dict(variaveis or {}, nome=nome), url, branch)
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"[ERRO] Falha ao criar o projeto '{nome}': {e}")
+            return raiz, "falhou", str(e)
+        return raiz, "ok" if enviado else "sem remoto", ""
+
+    with ThreadPoolExecutor(max_workers=max(1, max_jobs)) as executor:
+        linhas = list(executor.map(executar, nomes))
+    if len(linhas) > 1:
+        imprimir_resumo_workspace(linhas)
+    return linhas
 
 # ===========================================
 # Subcomando config (interativo + conectar)
@@ -230,10 +3015,29 @@ def git_config_interativo(args, caminho_config="config.ini"):
 # ===========================================
 # main() - argparse
 # ===========================================
+def adicionar_opcoes_formato(subparser):
+    """Adiciona as opções --json / --ndjson (saída estruturada) a um subcomando."""
+    grupo = subparser.add_mutually_exclusive_group()
+    grupo.add_argument("--json", dest="formato", action="store_const", const="json",
+                       help="Saída em JSON (array).")
+    grupo.add_argument("--ndjson", dest="formato", action="store_const", const="ndjson",
+                       help="Saída em NDJSON (um objeto por linha, em streaming).")
+
 def main():
     parser = argparse.ArgumentParser(
         description="Gerenciador de comandos Git via Python, incluindo 'pushfull' e 'config' que conecta."
     )
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="subprocess",
+                        help="Backend das consultas somente-leitura (padrão: subprocess).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Mede cada etapa (tempo, processos, bytes, código de saída) e imprime o resumo ao final.")
+    parser.add_argument("--metricas", help="Acrescenta as medições neste arquivo (um JSON por linha).")
+    parser.add_argument("--metricas-formato", choices=["jsonl", "otel"], default="jsonl",
+                        help="Formato do arquivo de métricas: registros simples ou spans OpenTelemetry (padrão: jsonl).")
+    parser.add_argument("--ssh-reuso", action="store_true",
+                        help="Reaproveita a conexão SSH entre os comandos (ControlMaster). Padrão: [ssh] reusar_conexao.")
+    parser.add_argument("--cache", action="store_true",
+                        help="Usa o cache local de espelhos por URL remota em clone/pull/pushfull. Padrão: [cache] espelhos.")
     subparsers = parser.add_subparsers(dest="acao", help="Escolha qual subcomando executar.")
 
     # git init
@@ -249,6 +3053,7 @@ def main():
     # git adicionar
     p_add = subparsers.add_parser("adicionar", help="Adiciona arquivos ao stage (git add .).")
     p_add.add_argument("--caminho", default=".", help="Caminho do repositório local (padrão: .)")
+    p_add.add_argument("--rapido", action="store_true", help="Adiciona só o que mudou desde a última sincronização (cache de alterações).")
 
     # git commit
     p_commit = subparsers.add_parser("commit", help="Faz commit (git commit -m ...).")
@@ -258,11 +3063,15 @@ def main():
     # git push
     p_push = subparsers.add_parser("push", help="Faz push para o remoto (git push -u origin <branch>).")
     p_push.add_argument("--caminho", default=".", help="Caminho do repositório local.")
-    p_push.add_argument("--branch", default="master", help="Branch a enviar (padrão: master).")
+    p_push.add_argument("--branch", nargs="+", default=["master"],
+                        help="Branch(es) ou globs (ex.: 'feature/*') a enviar em um único push (padrão: master).")
 
     # git status
     p_status = subparsers.add_parser("status", help="Exibe status do repositório (git status).")
     p_status.add_argument("--caminho", default=".", help="Caminho do repositório local.")
+    p_status.add_argument("--workspace", help="Status de todos os repositórios desta pasta (asyncio, em paralelo).")
+    p_status.add_argument("--jobs", default=16, type=int, help="Consultas simultâneas com --workspace (padrão: 16).")
+    adicionar_opcoes_formato(p_status)
 
     # git checkout
     p_checkout = subparsers.add_parser("checkout", help="Faz checkout em uma branch (ou cria se não existir).")
@@ -272,21 +3081,41 @@ def main():
     # git pull
     p_pull = subparsers.add_parser("pull", help="Faz pull da branch (git pull origin <branch>).")
     p_pull.add_argument("--caminho", default=".", help="Caminho do repositório local.")
-    p_pull.add_argument("--branch", default="master", help="Branch a receber (padrão: master).")
+    p_pull.add_argument("--branch", nargs="+", default=["master"],
+                        help="Branch(es) ou globs com '*' a receber em um único fetch (padrão: master).")
 
     # git log
     p_log = subparsers.add_parser("log", help="Mostra últimos commits (git log --oneline -n <limit>).")
     p_log.add_argument("--caminho", default=".", help="Caminho do repositório local.")
-    p_log.add_argument("--limit", default=10, type=int, help="Quantidade de commits a exibir (padrão: 10).")
+    p_log.add_argument("--limit", default=10, type=int, help="Quantidade de commits a exibir (padrão: 10; 0 = todos com --json/--ndjson).")
+    p_log.add_argument("--remoto", action="store_true",
+                       help="Mostra os commits do origin (em cache pelo prefetch) que a branch atual ainda não tem.")
+    adicionar_opcoes_formato(p_log)
 
     # git diff
     p_diff = subparsers.add_parser("diff", help="Mostra diferenças (git diff).")
     p_diff.add_argument("--caminho", default=".", help="Caminho do repositório local.")
+    adicionar_opcoes_formato(p_diff)
 
     # git clone
     p_clone = subparsers.add_parser("clone", help="Clona um repositório remoto (git clone <url> <destino>).")
-    p_clone.add_argument("url", help="URL do repositório remoto (HTTPS ou SSH).")
-    p_clone.add_argument("--destino", default=".", help="Pasta de destino (padrão: atual).")
+    p_clone.add_argument("url", nargs="?", help="URL do repositório remoto (HTTPS ou SSH).")
+    p_clone.add_argument("--destino", default=".",
+                         help="Pasta de destino (padrão: atual). Com --from-list, pasta base dos clones.")
+    p_clone.add_argument("--depth", type=int, help="Clone raso: baixa só os últimos N commits.")
+    p_clone.add_argument("--filter", dest="filtro", help="Clone parcial (ex.: blob:none, tree:0).")
+    p_clone.add_argument("--sparse", dest="esparso", nargs="+", metavar="PADRAO",
+                         help="Sparse-checkout: só estas pastas/padrões vão para a árvore de trabalho.")
+    p_clone.add_argument("--reference", dest="referencia",
+                         help="Repositório local cujos objetos são reaproveitados (alternates).")
+    p_clone.add_argument("--dissociate", dest="dissociar", action="store_true",
+                         help="Com --reference, copia os objetos e não depende mais do repositório de referência.")
+    p_clone.add_argument("--branch", help="Branch a clonar (padrão: a do remoto).")
+    p_clone.add_argument("--from-list", dest="lista",
+                         help="Arquivo com uma URL por linha ('url [destino]') para clonar vários repositórios.")
+    p_clone.add_argument("--jobs", default=8, type=int, help="Clones em paralelo com --from-list (padrão: 8).")
+    p_clone.add_argument("--por-host", default=4, type=int,
+                         help="Clones simultâneos para o mesmo host com --from-list (padrão: 4).")
 
     # Subcomando config (interativo + conectar opcional)
     p_conf = subparsers.add_parser("config", help="Config interativo para definir config.ini e conectar.")
@@ -300,56 +3129,241 @@ def main():
     p_pushfull = subparsers.add_parser("pushfull", help="Adiciona, comita e faz push de uma só vez.")
     p_pushfull.add_argument("--caminho", default=".", help="Caminho do repositório local.")
     p_pushfull.add_argument("--mensagem", "-m", default="Update", help="Mensagem do commit (padrão: 'Update').")
+    p_pushfull.add_argument("--workspace", help="Pasta com vários repositórios: executa o pushfull em todos em paralelo.")
+    p_pushfull.add_argument("--jobs", default=8, type=int, help="Repositórios processados em paralelo no modo workspace (padrão: 8).")
+    p_pushfull.add_argument("--por-host", default=4, type=int, help="Pull/push simultâneos por host remoto (padrão: 4).")
+    p_pushfull.add_argument("--rapido", action="store_true", default=None, help="Usa o cache de alterações (padrão: [desempenho] cache_alteracoes).")
+    p_pushfull.add_argument("--estrategia", choices=["rebase", "merge"],
+                            help="Como integrar quando local e remoto avançaram (padrão: [git] estrategia ou rebase).")
+    p_pushfull.add_argument("--chunked", action="store_true",
+                            help="Stage em lotes (git update-index) com progresso, para muitas alterações.")
+    p_pushfull.add_argument("--lote", type=int, help="Com --chunked: caminhos por lote (padrão: [desempenho] lote_stage ou 1000).")
+    p_pushfull.add_argument("--arquivos-por-commit", type=int,
+                            help="Com --chunked: divide em commits de até N arquivos, com um push por commit.")
+    p_pushfull.add_argument("--mb-por-commit", type=float,
+                            help="Com --chunked: divide em commits de até N MB, com um push por commit.")
+
+    # Subcomando watch
+    p_watch = subparsers.add_parser("watch", help="Observa o(s) repositório(s) e faz commit/push automático.")
+    p_watch.add_argument("--caminho", nargs="+", default=["."], help="Repositório(s) a observar (padrão: .).")
+    p_watch.add_argument("--workspace", help="Observa todos os repositórios encontrados nesta pasta.")
+    p_watch.add_argument("--mensagem", "-m", help="Mensagem dos commits automáticos (padrão: 'Auto-commit').")
+    p_watch.add_argument("--debounce", type=float, help="Segundos sem alterações antes do commit (padrão: 2).")
+    p_watch.add_argument("--intervalo-push", type=float, help="Segundos entre pushes (padrão: 60).")
+    p_watch.add_argument("--lote-push", type=int, help="Faz push a cada N commits (padrão: 10).")
+    p_watch.add_argument("--polling", type=float, metavar="SEGUNDOS",
+                         help="Usa verificação periódica em vez de inotify.")
+    p_watch.add_argument("--prefetch", type=float, metavar="SEGUNDOS", nargs="?", const=0,
+                         help="Faz prefetch do origin a cada N segundos (sem valor: [prefetch] intervalo, padrão 300).")
+
+    # Subcomando prefetch
+    p_prefetch = subparsers.add_parser("prefetch", help="Busca o origin em refs/prefetch/* (status/log sem rede).")
+    p_prefetch.add_argument("--caminho", nargs="+", default=["."], help="Repositório(s) (padrão: .).")
+    p_prefetch.add_argument("--workspace", help="Faz prefetch de todos os repositórios encontrados nesta pasta.")
+    p_prefetch.add_argument("--intervalo", type=float, metavar="SEGUNDOS", nargs="?", const=0,
+                            help="Repete a cada N segundos até Ctrl+C (sem valor: [prefetch] intervalo, padrão 300).")
+    p_prefetch.add_argument("--jobs", default=8, type=int, help="Repositórios buscados em paralelo (padrão: 8).")
+
+    # Subcomando manutencao
+    p_manut = subparsers.add_parser("manutencao",
+                                    help="Repack incremental, commit-graph, multi-pack-index e prune do(s) repositório(s).")
+    p_manut.add_argument("--caminho", nargs="+", default=["."], help="Repositório(s) (padrão: .).")
+    p_manut.add_argument("--workspace", help="Mantém todos os repositórios encontrados nesta pasta.")
+    p_manut.add_argument("--jobs", default=4, type=int, help="Repositórios mantidos em paralelo (padrão: 4).")
+    p_manut.add_argument("--sem-medir", action="store_true",
+                         help="Não mede o status/log antes e depois (mais rápido).")
+
+    # Subcomando novo-projeto
+    p_novo = subparsers.add_parser("novo-projeto", help="Cria a estrutura, inicializa, comita e faz o primeiro push.")
+    p_novo.add_argument("nomes", nargs="+", help="Nome(s) do(s) projeto(s).")
+    p_novo.add_argument("--destino", default=".", help="Diretório base onde os projetos são criados (padrão: .).")
+    p_novo.add_argument("--url", help="URL remota; use {nome} para vários projetos (padrão: url do config.ini).")
+    p_novo.add_argument("--branch", help="Branch principal (padrão: branch do config.ini ou main).")
+    p_novo.add_argument("--template", help="Template JSON/TOML/YAML do estrutura.py (padrão: estrutura embutida).")
+    p_novo.add_argument("--var", action="append", default=[], help="Variável do template (chave=valor).")
+    p_novo.add_argument("--jobs", default=8, type=int, help="Projetos criados em paralelo (padrão: 8).")
+
+    # Subcomando cache (espelhos locais por URL remota)
+    p_cache = subparsers.add_parser("cache", help="Lista ou limpa o cache de espelhos (mirror local por URL remota).")
+    p_cache.add_argument("--limpar", type=float, metavar="MB", nargs="?", const=0,
+                         help="Remove os espelhos menos usados até o cache caber em MB (sem valor: remove todos os que não estão em uso).")
 
     # Processa argumentos
     args = parser.parse_args()
+    definir_backend(args.backend)
+
+    if args.profile or args.metricas:
+        ativar_perfil()
+    try:
+        despachar(parser, args)
+    finally:
+        if args.profile:
+            imprimir_perfil()
+        if args.metricas:
+            gravar_metricas(args.metricas, args.metricas_formato)
+
+def despachar(parser, args):
+    """Executa o subcomando escolhido em 'args'."""
+    # Carrega a configuração (global + config.ini + ambiente), usada no pushfull, watch, conectar...
+    config = config_efetiva("config.ini")
+    try:
+        validar_config(config)
+        configurar_arquivos_grandes(opcao(config, 'arquivos_grandes', 'limite_mb'),
+                                    opcao(config, 'arquivos_grandes', 'padroes'),
+                                    opcao(config, 'arquivos_grandes', 'acao'))
+    except ValueError as e:
+        print(f"[ERRO] {e}")
+        sys.exit(1)
 
-    # Carrega config.ini (usado no pushfull e no conectar se faltar --url)
-    config = carregar_config()
+    if args.ssh_reuso or opcao(config, 'ssh', 'reusar_conexao'):
+        configurar_reuso_ssh(opcao(config, 'ssh', 'persistir'))
+    if args.cache or opcao(config, 'cache', 'espelhos') or args.acao == "cache":
+        configurar_cache_espelhos(opcao(config, 'cache', 'pasta'), opcao(config, 'cache', 'tamanho_maximo_mb'),
+                                  opcao(config, 'cache', 'validade'))
 
     # Despacha subcomandos
     if args.acao == "init":
         git_init(args.caminho)
 
     elif args.acao == "conectar":
-        url = args.url if args.url else config["git"].get("url", None) if "git" in config else None
+        url = args.url or opcao(config, 'git', 'url')
         if not url:
             print("[ERRO] É necessário fornecer uma URL do repositório remoto (--url) ou config.ini.")
             sys.exit(1)
         git_connect(args.caminho, url, args.branch)
 
     elif args.acao == "adicionar":
-        git_add(args.caminho)
+        git_add(args.caminho, rapido=args.rapido or opcao(config, 'desempenho', 'cache_alteracoes'))
 
     elif args.acao == "commit":
         git_commit(args.caminho, args.mensagem)
 
     elif args.acao == "push":
-        git_push(args.caminho, args.branch)
+        if len(args.branch) == 1 and not _eh_glob(args.branch[0]):
+            git_push(args.caminho, args.branch[0])
+        else:
+            git_push_varias(args.caminho, args.branch)
 
     elif args.acao == "status":
-        git_status(args.caminho)
+        if args.workspace:
+            resultados = asyncio.run(status_em_lote(descobrir_repositorios(args.workspace), args.jobs))
+            imprimir_status_em_lote(resultados, args.formato)
+        else:
+            git_status(args.caminho, args.formato)
 
     elif args.acao == "checkout":
         git_checkout(args.caminho, args.branch)
 
     elif args.acao == "pull":
-        git_pull(args.caminho, args.branch)
+        if len(args.branch) == 1 and not _eh_glob(args.branch[0]):
+            git_pull(args.caminho, args.branch[0])
+        else:
+            git_pull_varias(args.caminho, args.branch)
 
     elif args.acao == "log":
-        git_log(args.caminho, args.limit)
+        git_log(args.caminho, args.limit, args.formato, remoto=args.remoto)
 
     elif args.acao == "diff":
-        git_diff(args.caminho)
+        git_diff(args.caminho, args.formato)
 
     elif args.acao == "clone":
-        git_clone(args.url, args.destino)
+        opcoes = {"profundidade": args.depth, "filtro": args.filtro, "esparso": args.esparso,
+                  "referencia": args.referencia, "dissociar": args.dissociar, "branch": args.branch}
+        if args.lista:
+            linhas = git_clone_varios(ler_lista_clones(args.lista, args.destino), opcoes,
+                                      max_jobs=args.jobs, max_por_host=args.por_host)
+            if any(resultado != "ok" for _, resultado, _ in linhas):
+                sys.exit(1)
+        elif args.url:
+            git_clone(args.url, args.destino, **opcoes)
+        else:
+            parser.error("informe a URL ou --from-list.")
 
     elif args.acao == "config":
         git_config_interativo(args)
 
     elif args.acao == "pushfull":
-        git_pushfull(args.caminho, args.mensagem, config)
+        em_lotes = None
+        if args.chunked:
+            em_lotes = {"lote": args.lote, "arquivos_por_commit": args.arquivos_por_commit,
+                        "mb_por_commit": args.mb_por_commit}
+        repositorios = repositorios_do_config(config)
+        if args.workspace:
+            repositorios = descobrir_repositorios(args.workspace)
+        if repositorios:
+            linhas = git_pushfull_workspace(repositorios, args.mensagem, config,
+                                            max_jobs=args.jobs, max_por_host=args.por_host,
+                                            rapido=args.rapido, estrategia=args.estrategia, em_lotes=em_lotes)
+            if any(resultado in ("conflito", "falhou") for _, resultado, _ in linhas):
+                sys.exit(1)
+        elif em_lotes is not None:
+            git_pushfull_em_lotes(args.caminho, args.mensagem, config, estrategia=args.estrategia, **em_lotes)
+        else:
+            git_pushfull(args.caminho, args.mensagem, config, rapido=args.rapido, estrategia=args.estrategia)
+
+    elif args.acao == "watch":
+        caminhos = descobrir_repositorios(args.workspace) if args.workspace else args.caminho
+        servicos = []
+        for caminho in caminhos:
+            config_repo = config_efetiva(os.path.join(caminho, "config.ini"), base=config)
+            servicos.append(ServicoWatch(
+                caminho,
+                config=config_repo,
+                mensagem=args.mensagem or opcao(config_repo, 'watch', 'mensagem'),
+                debounce=args.debounce or opcao(config_repo, 'watch', 'debounce'),
+                intervalo_push=args.intervalo_push or opcao(config_repo, 'watch', 'intervalo_push'),
+                lote_push=args.lote_push or opcao(config_repo, 'watch', 'lote_push'),
+                intervalo_poll=args.polling,
+                intervalo_prefetch=(args.prefetch or opcao(config_repo, 'prefetch', 'intervalo'))
+                if args.prefetch is not None else None,
+            ))
+        try:
+            asyncio.run(observar_repositorios(servicos))
+        except KeyboardInterrupt:
+            print("\n[OK] Watch encerrado.")
+
+    elif args.acao == "prefetch":
+        repositorios = descobrir_repositorios(args.workspace) if args.workspace else args.caminho
+        intervalo = None
+        if args.intervalo is not None:
+            intervalo = args.intervalo or opcao(config, 'prefetch', 'intervalo')
+        try:
+            while True:
+                ok = git_prefetch_varios(repositorios, args.jobs)
+                print(f"[OK] Prefetch de {ok}/{len(repositorios)} repositório(s) concluído.")
+                if intervalo is None:
+                    break
+                time.sleep(intervalo)
+        except KeyboardInterrupt:
+            print("\n[OK] Prefetch encerrado.")
+            return
+        if ok < len(repositorios):
+            sys.exit(1)
+
+    elif args.acao == "manutencao":
+        repositorios = descobrir_repositorios(args.workspace) if args.workspace else args.caminho
+        resultados = git_manutencao_varios(repositorios, args.jobs, medir=not args.sem_medir,
+                                           expirar_prune=opcao(config, 'manutencao', 'expirar_prune'))
+        imprimir_manutencao(resultados)
+        if any(isinstance(resultado, BaseException) for _, resultado in resultados):
+            sys.exit(1)
+
+    elif args.acao == "novo-projeto":
+        variaveis = dict(par.split("=", 1) for par in args.var if "=" in par)
+        linhas = git_novos_projetos(args.destino, args.nomes, config, args.url, args.template,
+                                    variaveis, args.branch, args.jobs)
+        if any(resultado == "falhou" for _, resultado, _ in linhas):
+            sys.exit(1)
+
+    elif args.acao == "cache":
+        if args.limpar is not None:
+            removidos = limpar_cache_espelhos(int(args.limpar * 1024 * 1024))
+            print(f"[OK] {len(removidos)} espelho(s) removido(s) do cache.")
+        espelhos = listar_espelhos()
+        if espelhos:
+            imprimir_espelhos(espelhos)
+        else:
+            print(f"[OK] Nenhum espelho no cache ({CACHE_ESPELHOS['pasta']}).")
 
     else:
         parser.print_help()
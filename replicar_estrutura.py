@@ -1,42 +1,503 @@
+import argparse
+import fnmatch
+import hashlib
+import json
 import os
 import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def replicar_estrutura(origem, destino):
+# Ações possíveis para cada arquivo
+COPIAR = "copiar"      # copia o conteúdo integralmente
+TRUNCAR = "truncar"    # cria o arquivo vazio
+PULAR = "pular"        # não cria o arquivo no destino
+LINK = "link"          # cria um link simbólico apontando para o arquivo de origem
+ESPARSO = "esparso"    # cria um arquivo esparso do mesmo tamanho (sem ocupar blocos no disco)
+PONTEIRO = "ponteiro"  # grava um ponteiro Git LFS (oid sha256 + tamanho) no lugar do conteúdo
+ACOES = (COPIAR, TRUNCAR, PULAR, LINK, ESPARSO, PONTEIRO)
+
+# Ações cujo resultado depende do conteúdo/tamanho da origem (guardam tamanho + mtime no manifesto)
+_COM_ASSINATURA = (COPIAR, ESPARSO, PONTEIRO)
+
+# Regras padrão: apenas o requirements.txt é copiado, o resto é criado vazio
+REGRAS_PADRAO = [("requirements.txt", COPIAR)]
+ACAO_PADRAO = TRUNCAR
+
+# Arquivos enviados para cada tarefa do pool de threads
+TAMANHO_LOTE = 256
+
+# Manifesto do modo sincronização, gravado na raiz do destino
+NOME_MANIFESTO = ".replicar_estrutura.json"
+
+# ioctl FICLONE do Linux (reflink em btrfs/xfs)
+_FICLONE = 0x40049409
+
+def interpretar_regra(texto):
+    """Converte 'padrao=acao' (ex.: '*.csv=pular') em (padrao, acao)."""
+    padrao, sep, acao = texto.rpartition("=")
+    if not sep or not padrao or acao not in ACOES:
+        raise ValueError(f"Regra inválida '{texto}'. Use padrao=acao, com acao em {', '.join(ACOES)}.")
+    return padrao, acao
+
+def escolher_acao(caminho_relativo, regras, acao_padrao=ACAO_PADRAO):
+    """
+    Retorna a ação da primeira regra cujo glob casa com o arquivo.
+    Padrões sem '/' são comparados com o nome do arquivo; com '/', com o
+    caminho relativo. A comparação não diferencia maiúsculas de minúsculas.
+    """
+    caminho_relativo = caminho_relativo.replace(os.sep, "/").lower()
+    nome = caminho_relativo.rsplit("/", 1)[-1]
+    for padrao, acao in regras:
+        alvo = caminho_relativo if "/" in padrao else nome
+        if fnmatch.fnmatchcase(alvo, padrao.lower()):
+            return acao
+    return acao_padrao
+
+def acao_do_arquivo(caminho_relativo, tamanho, regras, acao_padrao=ACAO_PADRAO, grandes=None):
+    """
+    Como escolher_acao, mas com a regra de arquivos grandes: com grandes=(limite_bytes, acao),
+    um arquivo que seria copiado e tem mais de limite_bytes recebe 'acao' (ex.: esparso).
+    """
+    acao = escolher_acao(caminho_relativo, regras, acao_padrao)
+    if acao == COPIAR and grandes and tamanho > grandes[0]:
+        return grandes[1]
+    return acao
+
+def ponteiro_lfs(origem):
+    """Conteúdo do ponteiro Git LFS (spec v1) do arquivo, lido em blocos."""
+    sha = hashlib.sha256()
+    tamanho = 0
+    with open(origem, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloco)
+            tamanho += len(bloco)
+    return f"version https://git-lfs.github.com/spec/v1\noid sha256:{sha.hexdigest()}\nsize {tamanho}\n"
+
+def bytes_economizados(acao, tamanho):
+    """Bytes que deixam de ser gravados no destino com 'esparso' ou 'ponteiro' em vez de copiar."""
+    if acao == ESPARSO:
+        return tamanho
+    if acao == PONTEIRO:
+        # O ponteiro tem tamanho fixo, exceto pelos dígitos do tamanho: não é preciso ler o arquivo
+        return max(0, tamanho - len(f"version https://git-lfs.github.com/spec/v1\noid sha256:{'0' * 64}\n"
+                                     f"size {tamanho}\n"))
+    return 0
+
+def _copiar_conteudo(origem, destino, tamanho):
+    """
+    Copia o conteúdo de 'origem' para 'destino' usando o caminho mais rápido disponível:
+    reflink (FICLONE) -> os.copy_file_range -> os.sendfile -> shutil.copyfileobj.
+    """
+    with open(origem, "rb") as fsrc, open(destino, "wb") as fdst:
+        if tamanho == 0:
+            return
+        try:
+            import fcntl
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return
+        except (ImportError, OSError):
+            pass
+        for copiar in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+            if copiar is None:
+                continue
+            try:
+                copiados = 0
+                while copiados < tamanho:
+                    if copiar is os.sendfile:
+                        n = os.sendfile(fdst.fileno(), fsrc.fileno(), copiados, tamanho - copiados)
+                    else:
+                        n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), tamanho - copiados,
+                                               copiados, copiados)
+                    if n == 0:
+                        break
+                    copiados += n
+                return
+            except OSError:
+                # Sistema de arquivos sem suporte: recomeça com o próximo método
+                fdst.seek(0)
+                fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst)
+
+def _processar_lote(lote):
+    """Cria os arquivos de um lote e retorna (arquivos_criados, bytes_copiados)."""
+    criados = 0
+    copiados = 0
+    for acao, origem, destino, tamanho in lote:
+        if os.path.islink(destino):
+            # Não escrever através de um link existente (ex.: de uma execução com 'link'):
+            # o arquivo apontado, muitas vezes o da própria origem, seria sobrescrito
+            os.remove(destino)
+        if acao == COPIAR:
+            _copiar_conteudo(origem, destino, tamanho)
+            shutil.copystat(origem, destino)
+            copiados += tamanho
+        elif acao == LINK:
+            os.symlink(os.path.abspath(origem), destino)
+        elif acao == ESPARSO:
+            with open(destino, "wb") as f:
+                f.truncate(tamanho)
+            shutil.copystat(origem, destino)
+        elif acao == PONTEIRO:
+            conteudo = ponteiro_lfs(origem)
+            with open(destino, "w", encoding="ascii", newline="\n") as f:
+                f.write(conteudo)
+            shutil.copystat(origem, destino)
+        else:
+            # Criar arquivo vazio (sem conteúdo)
+            os.close(os.open(destino, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666))
+        criados += 1
+    return criados, copiados
+
+def _sem_conteudo(acao):
+    """Ação para um link quebrado na origem: sem conteúdo para ler, copiar/esparso/ponteiro viram 'truncar'."""
+    return TRUNCAR if acao in _COM_ASSINATURA else acao
+
+def _varrer(origem):
+    """
+    Percorre 'origem' com os.scandir e gera (pasta_relativa, [(nome, tamanho)], [subpastas]).
+    Links quebrados entram com tamanho None.
+    """
+    pendentes = [""]
+    while pendentes:
+        rel = pendentes.pop()
+        arquivos = []
+        subpastas = []
+        with os.scandir(os.path.join(origem, rel)) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir():
+                    subpastas.append(os.path.join(rel, entrada.name))
+                    # Como no os.walk, links para pastas são criados mas não percorridos
+                    if not entrada.is_symlink():
+                        pendentes.append(subpastas[-1])
+                else:
+                    try:
+                        tamanho = entrada.stat().st_size
+                    except OSError:
+                        tamanho = None  # Link quebrado
+                    arquivos.append((entrada.name, tamanho))
+        yield rel, arquivos, subpastas
+
+def replicar_estrutura(origem, destino, regras=None, workers=None, acao_padrao=ACAO_PADRAO, grandes=None):
     """
     Lê a estrutura de 'origem' e recria a mesma hierarquia em 'destino'.
-    - Todos os arquivos serão criados vazios, EXCETO o 'requirements.txt',
-      cujo conteúdo será copiado integralmente.
-    """
-    for raiz, diretorios, arquivos in os.walk(origem):
-        # Caminho relativo da pasta atual em relação à origem
-        caminho_relativo = os.path.relpath(raiz, origem)
-        
-        # Caminho correspondente no destino
-        destino_atual = os.path.join(destino, caminho_relativo)
-        
-        # Cria a pasta se ainda não existir
-        os.makedirs(destino_atual, exist_ok=True)
-        
-        for nome_arquivo in arquivos:
-            caminho_origem_arquivo = os.path.join(raiz, nome_arquivo)
-            caminho_destino_arquivo = os.path.join(destino_atual, nome_arquivo)
-            
-            if nome_arquivo.lower() == "requirements.txt":
-                # Copiar o conteúdo do requirements.txt
-                shutil.copy2(caminho_origem_arquivo, caminho_destino_arquivo)
+    - Cada arquivo recebe a ação da primeira regra (glob, ação) que casar;
+      por padrão todos são criados vazios, EXCETO o 'requirements.txt',
+      cujo conteúdo é copiado integralmente.
+    - Com grandes=(limite_bytes, acao), arquivos a copiar maiores que o limite
+      recebem 'acao' (ex.: esparso ou ponteiro); os bytes que deixaram de ser
+      gravados ficam em estatisticas["economizados"].
+    - As pastas são criadas conforme a varredura avança e os arquivos são
+      criados em lotes por um pool de threads.
+    Retorna um dicionário com arquivos, pastas, bytes copiados e tempo gasto.
+    """
+    regras = REGRAS_PADRAO if regras is None else regras
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    inicio = time.perf_counter()
+    estatisticas = {"arquivos": 0, "pastas": 0, "bytes": 0, "pulados": 0, "economizados": 0}
+
+    os.makedirs(destino, exist_ok=True)
+    futuros = []
+    lote = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for rel, arquivos, subpastas in _varrer(origem):
+            # Cria de uma vez as subpastas da pasta atual (a pasta pai já existe)
+            for subpasta in subpastas:
+                try:
+                    os.mkdir(os.path.join(destino, subpasta))
+                except FileExistsError:
+                    if os.path.islink(os.path.join(destino, subpasta)):
+                        # Link para pasta no destino: os arquivos seriam criados na pasta apontada
+                        os.remove(os.path.join(destino, subpasta))
+                        os.mkdir(os.path.join(destino, subpasta))
+            estatisticas["pastas"] += len(subpastas)
+
+            for nome, tamanho in arquivos:
+                rel_arquivo = os.path.join(rel, nome)
+                if tamanho is None:
+                    acao = _sem_conteudo(escolher_acao(rel_arquivo, regras, acao_padrao))
+                    tamanho = 0
+                else:
+                    acao = acao_do_arquivo(rel_arquivo, tamanho, regras, acao_padrao, grandes)
+                if acao == PULAR:
+                    estatisticas["pulados"] += 1
+                    continue
+                estatisticas["economizados"] += bytes_economizados(acao, tamanho)
+                lote.append((acao, os.path.join(origem, rel_arquivo),
+                             os.path.join(destino, rel_arquivo), tamanho))
+                if len(lote) >= TAMANHO_LOTE:
+                    futuros.append(executor.submit(_processar_lote, lote))
+                    lote = []
+        if lote:
+            futuros.append(executor.submit(_processar_lote, lote))
+
+        for futuro in futuros:
+            criados, copiados = futuro.result()
+            estatisticas["arquivos"] += criados
+            estatisticas["bytes"] += copiados
+
+    estatisticas["segundos"] = time.perf_counter() - inicio
+    return estatisticas
+
+# ===========================================
+# Modo sincronização (só altera o que difere)
+# ===========================================
+def _carregar_manifesto(destino):
+    try:
+        with open(os.path.join(destino, NOME_MANIFESTO), encoding="utf-8") as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifesto if manifesto.get("versao") == 1 else None
+
+def _salvar_manifesto(destino, manifesto):
+    caminho = os.path.join(destino, NOME_MANIFESTO)
+    with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, separators=(",", ":"))
+    os.replace(caminho + ".tmp", caminho)
+
+def _difere(acao, entrada_destino, caminho_origem, assinatura):
+    """Verifica se o arquivo já existente no destino difere do que a replicação produziria."""
+    if acao == LINK:
+        return (not entrada_destino.is_symlink()
+                or os.readlink(entrada_destino.path) != os.path.abspath(caminho_origem))
+    if entrada_destino.is_symlink():
+        return True
+    info = entrada_destino.stat(follow_symlinks=False)
+    if acao in (COPIAR, ESPARSO):
+        # copystat preserva o mtime da origem, então tamanho + mtime identificam a cópia
+        return [info.st_size, info.st_mtime_ns] != assinatura
+    if acao == PONTEIRO:
+        return info.st_mtime_ns != assinatura[1]
+    return info.st_size != 0
+
+def _planejar_pasta(origem, destino, rel, regras, acao_padrao, apagar, operacoes, grandes=None):
+    """
+    Lista a pasta 'rel' na origem e no destino e acrescenta em 'operacoes'
+    o que precisa ser criado, atualizado ou apagado. Retorna o registro do manifesto.
+    """
+    pasta_origem = os.path.join(origem, rel)
+    arquivos = {}
+    subpastas = []
+    links = []
+    with os.scandir(pasta_origem) as entradas:
+        for entrada in entradas:
+            if entrada.is_dir():
+                subpastas.append(entrada.name)
+                if entrada.is_symlink():
+                    links.append(entrada.name)
+            elif escolher_acao(os.path.join(rel, entrada.name), regras, acao_padrao) in _COM_ASSINATURA:
+                try:
+                    info = entrada.stat()
+                    arquivos[entrada.name] = [info.st_size, info.st_mtime_ns]
+                except OSError:
+                    arquivos[entrada.name] = []  # Link quebrado: sem assinatura, criado vazio
+            else:
+                arquivos[entrada.name] = []
+
+    existentes = {}
+    pasta_destino = os.path.join(destino, rel)
+    if os.path.isdir(pasta_destino):
+        with os.scandir(pasta_destino) as entradas:
+            existentes = {e.name: e for e in entradas if not (rel == "" and e.name.startswith(NOME_MANIFESTO))}
+
+    for nome, assinatura in arquivos.items():
+        rel_arquivo = os.path.join(rel, nome)
+        tamanho = assinatura[0] if assinatura else 0
+        acao = acao_do_arquivo(rel_arquivo, tamanho, regras, acao_padrao, grandes)
+        if not assinatura:
+            acao = _sem_conteudo(acao)  # Sem assinatura com ação de conteúdo: link quebrado
+        if acao == PULAR:
+            continue
+        entrada = existentes.pop(nome, None)
+        if entrada is None:
+            operacoes.append(("criar", rel_arquivo, acao, tamanho))
+        elif entrada.is_dir(follow_symlinks=False):
+            # Há uma pasta no lugar do arquivo: só é substituída com 'apagar'
+            if apagar:
+                operacoes.append(("apagar", rel_arquivo, None, 0))
+                operacoes.append(("criar", rel_arquivo, acao, tamanho))
+        elif _difere(acao, entrada, os.path.join(origem, rel_arquivo), assinatura):
+            if entrada.is_symlink() and acao != LINK:
+                # Não escrever através de um link existente
+                operacoes.append(("apagar", rel_arquivo, None, 0))
+            operacoes.append(("atualizar", rel_arquivo, acao, tamanho))
+
+    for nome in subpastas:
+        entrada = existentes.pop(nome, None)
+        if entrada is None or not entrada.is_dir(follow_symlinks=False):
+            if entrada is not None and apagar:
+                operacoes.append(("apagar", os.path.join(rel, nome), None, 0))
+            operacoes.append(("criar_pasta", os.path.join(rel, nome), None, 0))
+
+    if apagar:
+        for nome in existentes:
+            operacoes.append(("apagar", os.path.join(rel, nome), None, 0))
+
+    return {"arquivos": arquivos, "subpastas": subpastas, "links": links}
+
+def sincronizar_estrutura(origem, destino, regras=None, workers=None, acao_padrao=ACAO_PADRAO,
+                          apagar=False, simular=False, grandes=None):
+    """
+    Sincroniza 'destino' com 'origem' alterando apenas o que difere.
+    - Cria o que falta, atualiza arquivos cujo conteúdo esperado mudou e,
+      com 'apagar=True', remove do destino o que não existe mais na origem.
+    - Um manifesto em destino/.replicar_estrutura.json guarda a listagem de
+      cada pasta: se o mtime da pasta de origem não mudou, a listagem é
+      reaproveitada e só os arquivos das regras 'copiar', 'esparso' e 'ponteiro' recebem stat.
+    - 'grandes' funciona como no replicar_estrutura.
+    - Com 'simular=True' nada é alterado; as operações apenas são retornadas.
+    Retorna (estatisticas, operacoes), com operacoes = [(tipo, caminho_relativo, acao, tamanho)].
+    """
+    regras = REGRAS_PADRAO if regras is None else regras
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    inicio = time.perf_counter()
+
+    chave = {"origem": os.path.abspath(origem), "regras": [list(r) for r in regras], "padrao": acao_padrao,
+             "grandes": list(grandes) if grandes else None}
+    manifesto = _carregar_manifesto(destino)
+    antigo = manifesto["pastas"] if manifesto and manifesto.get("chave") == chave else {}
+    novo = {}
+    operacoes = []
+
+    pendentes = [""]
+    while pendentes:
+        rel = pendentes.pop()
+        mtime = os.stat(os.path.join(origem, rel)).st_mtime_ns
+        registro = antigo.get(rel)
+        if registro and registro["mtime"] == mtime and os.path.isdir(os.path.join(destino, rel)):
+            # Pasta inalterada: reaproveita a listagem do manifesto
+            registro = dict(registro, arquivos=dict(registro["arquivos"]))
+            for nome, assinatura in registro["arquivos"].items():
+                if not assinatura:
+                    continue
+                try:
+                    info = os.stat(os.path.join(origem, rel, nome))
+                except OSError:
+                    continue
+                atual = [info.st_size, info.st_mtime_ns]
+                if atual != assinatura:
+                    registro["arquivos"][nome] = atual
+                    rel_arquivo = os.path.join(rel, nome)
+                    acao = acao_do_arquivo(rel_arquivo, info.st_size, regras, acao_padrao, grandes)
+                    if acao != PULAR:
+                        operacoes.append(("atualizar", rel_arquivo, acao, info.st_size))
+        else:
+            registro = _planejar_pasta(origem, destino, rel, regras, acao_padrao, apagar, operacoes, grandes)
+            registro["mtime"] = mtime
+        novo[rel] = registro
+        pendentes.extend(os.path.join(rel, nome) for nome in registro["subpastas"]
+                         if nome not in registro["links"])
+
+    estatisticas = {"criados": 0, "atualizados": 0, "apagados": 0, "pastas": 0, "bytes": 0, "economizados": 0}
+    for tipo, _, acao, tamanho in operacoes:
+        chave_estatistica = {"criar": "criados", "atualizar": "atualizados",
+                             "apagar": "apagados", "criar_pasta": "pastas"}[tipo]
+        estatisticas[chave_estatistica] += 1
+        if tipo in ("criar", "atualizar"):
+            estatisticas["economizados"] += bytes_economizados(acao, tamanho)
+            if acao == COPIAR:
+                estatisticas["bytes"] += tamanho
+    estatisticas["arquivos"] = estatisticas["criados"] + estatisticas["atualizados"]
+
+    if not simular:
+        os.makedirs(destino, exist_ok=True)
+        lote = []
+        for tipo, rel, acao, tamanho in operacoes:
+            caminho_destino = os.path.join(destino, rel)
+            if tipo == "apagar":
+                if os.path.isdir(caminho_destino) and not os.path.islink(caminho_destino):
+                    shutil.rmtree(caminho_destino)
+                else:
+                    os.remove(caminho_destino)
+            elif tipo == "criar_pasta":
+                os.makedirs(caminho_destino, exist_ok=True)
             else:
-                # Criar arquivo vazio (sem conteúdo)
-                with open(caminho_destino_arquivo, 'w', encoding='utf-8'):
-                    pass
+                lote.append((acao, os.path.join(origem, rel), caminho_destino, tamanho))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            lotes = [lote[i:i + TAMANHO_LOTE] for i in range(0, len(lote), TAMANHO_LOTE)]
+            list(executor.map(_processar_lote, lotes))
+        _salvar_manifesto(destino, {"versao": 1, "chave": chave, "pastas": novo})
+
+    estatisticas["segundos"] = time.perf_counter() - inicio
+    return estatisticas, operacoes
+
+def imprimir_operacoes(operacoes):
+    """Imprime o relatório de diferenças do modo --dry-run."""
+    simbolos = {"criar": "+", "atualizar": "~", "apagar": "-", "criar_pasta": "+"}
+    for tipo, rel, acao, _ in operacoes:
+        sufixo = "/" if tipo == "criar_pasta" else ""
+        detalhe = f" ({acao})" if acao else ""
+        print(f"{simbolos[tipo]} {rel}{sufixo}{detalhe}")
+
+def formatar_taxas(estatisticas):
+    """Monta a linha de resumo com arquivos/s e bytes/s."""
+    segundos = max(estatisticas["segundos"], 1e-9)
+    return (f"{estatisticas['arquivos']} arquivos e {estatisticas['pastas']} pastas em {segundos:.2f}s "
+            f"({estatisticas['arquivos'] / segundos:.0f} arquivos/s, "
+            f"{estatisticas['bytes'] / segundos / 1024 / 1024:.1f} MiB/s copiados)")
+
+def formatar_economia(estatisticas):
+    """Linha do relatório de bytes não gravados (arquivos esparsos/ponteiros), ou None."""
+    if not estatisticas.get("economizados"):
+        return None
+    return (f"{estatisticas['economizados'] / 1024 / 1024:.1f} MiB economizados "
+            f"(arquivos grandes criados como {ESPARSO}/{PONTEIRO} em vez de copiados)")
 
 def main():
+    parser = argparse.ArgumentParser(description="Replica a estrutura de pastas/arquivos de uma origem em um destino.")
     # Exemplos de caminhos de origem e destino (ajuste conforme necessário)
-    diretorio_origem = r"C:\vscode\exemplo_origem"
-    diretorio_destino = r"C:\vscode\exemplo_destino"
+    parser.add_argument("origem", nargs="?", default=r"C:\vscode\exemplo_origem", help="Pasta de origem.")
+    parser.add_argument("destino", nargs="?", default=r"C:\vscode\exemplo_destino", help="Pasta de destino.")
+    parser.add_argument("--regra", action="append", default=[],
+                        help=f"Regra 'glob=acao' ({', '.join(ACOES)}); pode ser repetida. "
+                             "A primeira que casar vale. Padrão: requirements.txt=copiar.")
+    parser.add_argument("--padrao", default=ACAO_PADRAO, choices=ACOES,
+                        help=f"Ação para arquivos sem regra (padrão: {ACAO_PADRAO}).")
+    parser.add_argument("--workers", type=int, help="Threads para criar os arquivos.")
+    parser.add_argument("--limite-mb", type=float,
+                        help="Arquivos a copiar com mais de N MB recebem a ação de --grandes.")
+    parser.add_argument("--grandes", default=ESPARSO, choices=(ESPARSO, PONTEIRO, TRUNCAR, PULAR, LINK),
+                        help=f"Ação para os arquivos acima de --limite-mb (padrão: {ESPARSO}).")
+    parser.add_argument("--sincronizar", action="store_true",
+                        help="Altera apenas o que difere no destino (usa o manifesto da última execução).")
+    parser.add_argument("--apagar", action="store_true",
+                        help="Com --sincronizar, remove do destino o que não existe na origem.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Com --sincronizar, apenas mostra as diferenças sem alterar nada.")
+    args = parser.parse_args()
+
+    try:
+        regras = [interpretar_regra(r) for r in args.regra] if args.regra else None
+    except ValueError as e:
+        print(f"[ERRO] {e}")
+        sys.exit(1)
+    grandes = (int(args.limite_mb * 1024 * 1024), args.grandes) if args.limite_mb is not None else None
+
+    if args.sincronizar:
+        estatisticas, operacoes = sincronizar_estrutura(args.origem, args.destino, regras=regras,
+                                                        workers=args.workers, acao_padrao=args.padrao,
+                                                        apagar=args.apagar, simular=args.dry_run,
+                                                        grandes=grandes)
+        if args.dry_run:
+            imprimir_operacoes(operacoes)
+        print(f"{'[SIMULAÇÃO] ' if args.dry_run else ''}Sincronização de '{args.origem}' para '{args.destino}': "
+              f"{estatisticas['criados']} criados, {estatisticas['atualizados']} atualizados, "
+              f"{estatisticas['apagados']} apagados, {estatisticas['pastas']} pastas novas.")
+        if not args.dry_run:
+            print(formatar_taxas(estatisticas))
+        if formatar_economia(estatisticas):
+            print(formatar_economia(estatisticas))
+        return
 
-    replicar_estrutura(diretorio_origem, diretorio_destino)
-    print(f"Estrutura replicada de '{diretorio_origem}' para '{diretorio_destino}' com sucesso.")
-    print("Arquivos criados vazios, exceto 'requirements.txt', que foi copiado com conteúdo.")
+    estatisticas = replicar_estrutura(args.origem, args.destino, regras=regras,
+                                      workers=args.workers, acao_padrao=args.padrao, grandes=grandes)
+    print(f"Estrutura replicada de '{args.origem}' para '{args.destino}' com sucesso.")
+    if regras is None:
+        print("Arquivos criados vazios, exceto 'requirements.txt', que foi copiado com conteúdo.")
+    print(formatar_taxas(estatisticas))
+    if formatar_economia(estatisticas):
+        print(formatar_economia(estatisticas))
 
 if __name__ == "__main__":
     main()
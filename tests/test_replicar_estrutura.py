@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+# replicar_estrutura.py fica na pasta acima deste arquivo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import replicar_estrutura  # noqa: E402
+
+@pytest.fixture
+def origem(tmp_path):
+    pasta = tmp_path / "origem"
+    (pasta / "sub").mkdir(parents=True)
+    (pasta / "a.txt").write_text("conteudo de a\n")
+    (pasta / "requirements.txt").write_text("requests==2.0\n")
+    (pasta / "sub" / "dados.bin").write_bytes(b"x" * 4096)
+    return pasta
+
+def _conteudos(pasta):
+    return {str(p.relative_to(pasta)): p.read_bytes() for p in sorted(pasta.rglob("*")) if p.is_file()}
+
+@pytest.mark.parametrize("acao", [replicar_estrutura.COPIAR, replicar_estrutura.TRUNCAR,
+                                  replicar_estrutura.ESPARSO, replicar_estrutura.PONTEIRO])
+def test_nova_execucao_nao_escreve_atraves_dos_links(tmp_path, origem, acao):
+    destino = tmp_path / "destino"
+    antes = _conteudos(origem)
+    replicar_estrutura.replicar_estrutura(str(origem), str(destino), regras=[("*", replicar_estrutura.LINK)])
+    assert os.path.islink(destino / "a.txt")
+
+    replicar_estrutura.replicar_estrutura(str(origem), str(destino), regras=[], acao_padrao=acao)
+
+    assert _conteudos(origem) == antes
+    for rel in antes:
+        assert not os.path.islink(destino / rel)
+    if acao == replicar_estrutura.COPIAR:
+        assert _conteudos(destino) == antes
+
+def test_regras_padrao_depois_de_link(tmp_path, origem):
+    destino = tmp_path / "destino"
+    antes = _conteudos(origem)
+    replicar_estrutura.replicar_estrutura(str(origem), str(destino), regras=[("*", replicar_estrutura.LINK)])
+    replicar_estrutura.replicar_estrutura(str(origem), str(destino))
+
+    assert _conteudos(origem) == antes
+    assert (destino / "requirements.txt").read_bytes() == antes["requirements.txt"]
+    assert (destino / "a.txt").read_bytes() == b""
+
+def test_link_para_pasta_no_destino_vira_pasta(tmp_path, origem):
+    destino = tmp_path / "destino"
+    destino.mkdir()
+    os.symlink(origem / "sub", destino / "sub")
+    replicar_estrutura.replicar_estrutura(str(origem), str(destino))
+
+    assert (origem / "sub" / "dados.bin").read_bytes() == b"x" * 4096
+    assert not os.path.islink(destino / "sub")
+    assert (destino / "sub" / "dados.bin").read_bytes() == b""